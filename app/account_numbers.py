@@ -0,0 +1,28 @@
+from typing import Optional
+from uuid import UUID
+
+from app.cache import TTLCache
+from app.config import settings
+from app.queries import account_by_number
+
+# account number -> uuid of the live account holding it. Numbers never change,
+# entries only go stale when the account is deleted.
+account_numbers = TTLCache(
+    "account_numbers",
+    settings.account_number_cache_size,
+    settings.account_number_cache_ttl,
+)
+
+
+async def resolve_number(conn, number: str) -> Optional[UUID]:
+    uuid = account_numbers.get(number)
+    if uuid is not None:
+        return uuid
+
+    generation = account_numbers.generation
+    result = await account_by_number.execute(conn, number)
+    uuid = result.scalar_one_or_none()
+    if uuid is not None:
+        account_numbers.set(number, uuid, generation)
+
+    return uuid
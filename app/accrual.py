@@ -0,0 +1,214 @@
+from datetime import date, datetime
+
+from sqlalchemy import (
+    Float,
+    bindparam,
+    cast,
+    func,
+    select,
+    type_coerce,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import counters
+from app.bulk import TRANSACTION_COLUMNS, copy_transactions
+from app.config import settings
+from app.dependencies import engine
+from app.models.account import Account
+from app.models.accrual import AccrualRun
+from app.models.transaction import TransactionType
+from app.rollups import rollup_row, rollup_upsert
+
+try:
+    import numpy
+except ImportError:  # only the accrual batch needs it
+    numpy = None
+
+
+account = Account.__table__
+accrual_run = AccrualRun.__table__
+
+# Account.interest is an annual rate in percent, accrued daily
+DAYS_PER_YEAR = 365
+
+# the transaction uuids are left to the column default
+COPY_COLUMNS = [column for column in TRANSACTION_COLUMNS if column != "uuid"]
+
+# every account of a chunk gets its balance change in one UPDATE ... FROM unnest()
+_deltas = (
+    func.unnest(
+        cast(bindparam("uuids"), ARRAY(UUID(as_uuid=True))),
+        cast(bindparam("deltas"), ARRAY(Float)),
+    )
+    .table_valued("uuid", "delta")
+    .render_derived(name="deltas")
+)
+update_balances = (
+    update(account)
+    .where(account.c.uuid == _deltas.c.uuid)
+    .values(balance=account.c.balance + _deltas.c.delta, updated_at=func.now())
+)
+
+
+# Interest and fee of every account at once. Interest is rounded to cents and
+# only paid on a positive balance, a fee never takes the balance below zero.
+def accrue(balances, rates, fee: float):
+    interest = numpy.where(
+        balances > 0, numpy.round(balances * rates / 100 / DAYS_PER_YEAR, 2), 0.0
+    )
+    fees = numpy.minimum(fee, numpy.maximum(balances + interest, 0.0))
+
+    return interest, fees
+
+
+def _chunk_statement(after, chunk_size: int):
+    statement = (
+        select(
+            # asyncpg already returns uuid objects, the model's GUID type would
+            # parse each of them again
+            type_coerce(account.c.uuid, UUID(as_uuid=True)).label("uuid"),
+            account.c.balance,
+            account.c.interest,
+            type_coerce(account.c.branch_uuid, UUID(as_uuid=True)).label("branch_uuid"),
+        )
+        .where(account.c.deleted_at == None)
+        .order_by(account.c.uuid)
+        .limit(chunk_size)
+        .with_for_update()
+    )
+    if after is not None:
+        statement = statement.where(account.c.uuid > after)
+
+    return statement
+
+
+# `sign` is the direction the amounts moved the balances in
+def _records(
+    uuids, amounts, type: TransactionType, details: str, now: datetime, sign: int
+):
+    values = amounts.tolist()
+
+    return [
+        (uuids[i], int(type), values[i], False, details, now, now, sign * values[i])
+        for i in numpy.flatnonzero(amounts).tolist()
+    ]
+
+
+# (branch, type) rollup rows of the chunk's postings, `branch_index` holds the
+# position in `branch_uuids` of every account's branch
+def _rollups(branch_uuids, branch_index, postings, day: date):
+    rows = []
+    for type, amounts in postings:
+        counts = numpy.bincount(
+            branch_index, weights=amounts > 0, minlength=len(branch_uuids)
+        )
+        totals = numpy.bincount(
+            branch_index, weights=amounts, minlength=len(branch_uuids)
+        )
+        rows += [
+            rollup_row(day, branch_uuids[i], type, int(counts[i]), float(totals[i]))
+            for i in numpy.flatnonzero(counts)
+        ]
+
+    return rows
+
+
+# Accrues the next chunk of accounts after the run's checkpoint. Returns the
+# number of accounts, 0 once every account has been done.
+async def _accrue_chunk(day: date, fee: float, chunk_size: int) -> int:
+    async with AsyncSession(engine) as session:
+        # holding the run row makes a second runner of the same day wait, then
+        # carry on from this chunk's checkpoint
+        statement = (
+            select(accrual_run).where(accrual_run.c.day == day).with_for_update()
+        )
+        run = (await session.execute(statement)).one()
+
+        rows = (
+            await session.execute(_chunk_statement(run.last_uuid, chunk_size))
+        ).all()
+        if not rows:
+            await session.execute(
+                update(accrual_run)
+                .where(accrual_run.c.day == day)
+                .values(finished_at=func.now())
+            )
+            await session.commit()
+            return 0
+
+        uuids = [row.uuid for row in rows]
+        balances = numpy.fromiter((row.balance for row in rows), float, len(rows))
+        rates = numpy.fromiter((row.interest for row in rows), float, len(rows))
+        interest, fees = accrue(balances, rates, fee)
+        deltas = interest - fees
+
+        changed = numpy.flatnonzero(deltas)
+        if len(changed):
+            await session.execute(
+                update_balances,
+                {
+                    "uuids": [uuids[i] for i in changed],
+                    "deltas": deltas[changed].tolist(),
+                },
+            )
+
+        now = datetime.utcnow()
+        postings = [(TransactionType.INTEREST, interest), (TransactionType.FEE, fees)]
+        records = _records(
+            uuids, interest, TransactionType.INTEREST, f"Interest {day}", now, 1
+        )
+        records += _records(
+            uuids, fees, TransactionType.FEE, f"Monthly fee {day:%Y-%m}", now, -1
+        )
+        if records:
+            await copy_transactions(session, records, COPY_COLUMNS)
+
+            branches = {}
+            branch_index = numpy.fromiter(
+                (branches.setdefault(row.branch_uuid, len(branches)) for row in rows),
+                int,
+                len(rows),
+            )
+            rollups = _rollups(list(branches), branch_index, postings, now.date())
+            await session.execute(rollup_upsert(union_all(*rollups)))
+            await counters.bump(session, counters.BALANCE_TOTAL, float(deltas.sum()))
+
+        await session.execute(
+            update(accrual_run)
+            .where(accrual_run.c.day == day)
+            .values(
+                last_uuid=uuids[-1],
+                accounts=accrual_run.c.accounts + len(rows),
+                interest_total=accrual_run.c.interest_total + float(interest.sum()),
+                fee_total=accrual_run.c.fee_total + float(fees.sum()),
+            )
+        )
+        await session.commit()
+
+    return len(rows)
+
+
+# Posts `day`'s interest to every live account, and on the first day of a month
+# the monthly fee, `chunk_size` accounts per database transaction. Running it
+# again for a day resumes it, or does nothing once it has finished.
+async def run_accrual(day: date, chunk_size: int = None, progress=None) -> AccrualRun:
+    chunk_size = chunk_size or settings.accrual_chunk_size
+    fee = settings.monthly_fee if day.day == 1 else 0.0
+
+    async with AsyncSession(engine) as session:
+        statement = insert(AccrualRun).values(day=day).on_conflict_do_nothing()
+        await session.execute(statement)
+        await session.commit()
+
+    while True:
+        async with AsyncSession(engine) as session:
+            run = await session.get(AccrualRun, day)
+        if run.finished_at is not None:
+            return run
+
+        accounts = await _accrue_chunk(day, fee, chunk_size)
+        if progress and accounts:
+            progress(run.accounts + accounts)
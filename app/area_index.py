@@ -0,0 +1,96 @@
+import hashlib
+import json
+from collections import defaultdict
+from types import MappingProxyType
+from typing import Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.dependencies import replicas
+from app.models.area import Area
+from app.versions import get_version
+
+
+VERSION_NAME = "area"
+
+_COLUMNS = (
+    Area.name,
+    Area.level,
+    Area.parent_uuid,
+    Area.uuid,
+    Area.created_at,
+    Area.updated_at,
+)
+
+
+# Read-only snapshot of the live area tree. Handlers grab `area_index.current`
+# once and only read from it, a reload builds a new snapshot and swaps the
+# reference so a request never sees a half loaded tree.
+class AreaSnapshot:
+    def __init__(self, version: int, rows):
+        areas = {}
+        children = defaultdict(list)
+        for row in rows:
+            area = dict(row, deleted_at=None)
+            areas[area["uuid"]] = area
+            children[area["parent_uuid"]].append(area)
+
+        self.version = version
+        self.areas = MappingProxyType(areas)
+        self.children = MappingProxyType(
+            {
+                parent: tuple(sorted(items, key=lambda area: area["name"]))
+                for parent, items in children.items()
+            }
+        )
+        # encoded bodies are derived from immutable data, so they are memoized
+        # per snapshot and thrown away with it
+        self._rendered = {}
+
+    # Returns the encoded body and its strong ETag for ("children", parent_uuid)
+    # or ("area", uuid), None when the area doesn't exist.
+    def render(self, key) -> Optional[tuple]:
+        rendered = self._rendered.get(key)
+        if rendered is not None:
+            return rendered
+
+        kind, uuid = key
+        if kind == "children":
+            value = self.children.get(uuid, ())
+        else:
+            value = self.areas.get(uuid)
+            if value is None:
+                return None
+
+        body = json.dumps(jsonable_encoder(value), separators=(",", ":")).encode()
+        etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+        rendered = self._rendered[key] = (body, etag)
+
+        return rendered
+
+
+class AreaIndex:
+    def __init__(self):
+        self.current = AreaSnapshot(0, ())
+
+    async def load(self):
+        async with AsyncSession(replicas.pick()) as session:
+            version = await get_version(session, VERSION_NAME)
+            statement = select(*_COLUMNS).where(Area.deleted_at == None)
+            rows = (await session.execute(statement)).mappings().all()
+
+        self.current = AreaSnapshot(version, rows)
+
+    # Polled by every worker, the tree is only reloaded after someone bumped
+    # the "area" table version (app.versions.bump_version).
+    async def refresh(self):
+        async with AsyncSession(replicas.pick()) as session:
+            version = await get_version(session, VERSION_NAME)
+
+        if version != self.current.version:
+            await self.load()
+
+
+area_index = AreaIndex()
@@ -0,0 +1,14 @@
+import asyncio
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(interval: float, fn, *args):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await fn(*args)
+        except Exception:
+            logger.exception("Background task %s failed", fn.__name__)
@@ -0,0 +1,44 @@
+import hashlib
+import json
+
+from fastapi.encoders import jsonable_encoder
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.area_index import VERSION_NAME as AREA_VERSION_NAME
+from app.cache import TTLCache
+from app.config import settings
+from app.versions import get_versions
+
+
+VERSION_NAME = "branch"
+
+# Encoded branch responses and their strong ETags. Entries are keyed on the
+# branch and area table versions (a branch embeds its address' area names), so
+# a bump by any worker makes every worker miss and render again; stale entries
+# just age out.
+branch_responses = TTLCache(
+    "branch_responses", settings.branch_cache_size, settings.branch_cache_ttl
+)
+
+
+async def current_versions(session: AsyncSession) -> tuple:
+    return await get_versions(session, VERSION_NAME, AREA_VERSION_NAME)
+
+
+def render(value) -> tuple:
+    body = json.dumps(jsonable_encoder(value), separators=(",", ":")).encode()
+    etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+
+    return body, etag
+
+
+# Returns the cached (body, etag) of `key` at `versions`, rendering the value
+# `load` returns on a miss. `load` may raise, nothing is cached then.
+async def cached(versions: tuple, key, load) -> tuple:
+    cache_key = (versions, key)
+    rendered = branch_responses.get(cache_key)
+    if rendered is None:
+        rendered = render(await load())
+        branch_responses.set(cache_key, rendered)
+
+    return rendered
@@ -0,0 +1,241 @@
+import csv
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import AsyncIterator, List, Tuple
+from uuid import uuid4
+
+from pydantic import ValidationError
+from sqlalchemy import Float, bindparam, cast, func, select, union_all, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import counters, metrics
+from app.dependencies import engine
+from app.models.account import Account
+from app.models.bulk import BulkStatus, BulkTransaction
+from app.models.transaction import Transaction, TransactionType
+from app.rollups import rollup_row, rollup_upsert
+
+
+logger = logging.getLogger(__name__)
+
+account = Account.__table__
+
+# the detail of every entry of a batch that failed and was rolled back
+BATCH_FAILED = "Not posted, its batch failed"
+
+TRANSACTION_COLUMNS = [
+    "uuid",
+    "account_uuid",
+    "type",
+    "amount",
+    "status",
+    "details",
+    "created_at",
+    "updated_at",
+    "balance_change",
+]
+
+# every account of a batch gets its new balance in one UPDATE ... FROM unnest()
+_balances = (
+    func.unnest(
+        cast(bindparam("uuids"), ARRAY(UUID(as_uuid=True))),
+        cast(bindparam("balances"), ARRAY(Float)),
+    )
+    .table_valued("uuid", "balance")
+    .render_derived(name="balances")
+)
+update_balances = (
+    update(account)
+    .where(account.c.uuid == _balances.c.uuid)
+    .values(
+        balance=_balances.c.balance,
+        updated_at=func.now(),
+        last_activity_at=func.now(),
+    )
+)
+
+
+# COPYs transaction rows, tuples of `columns`, straight into the table
+# on the session's connection, inside its transaction
+async def copy_transactions(
+    session: AsyncSession, records: list, columns: List[str] = TRANSACTION_COLUMNS
+):
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        Transaction.__tablename__, records=records, columns=columns
+    )
+
+
+# Results are plain BulkResult shaped dicts: a batch report has one per entry
+# and building then re-validating that many models costs more than the posting
+def _accepted(index: int, transaction_uuid) -> dict:
+    return {
+        "index": index,
+        "status": BulkStatus.ACCEPTED.value,
+        "transaction_uuid": str(transaction_uuid),
+        "detail": None,
+    }
+
+
+def _rejected(index: int, detail: str) -> dict:
+    return {
+        "index": index,
+        "status": BulkStatus.REJECTED.value,
+        "transaction_uuid": None,
+        "detail": detail,
+    }
+
+
+def parse_item(index: int, data) -> Tuple[BulkTransaction, dict]:
+    if not isinstance(data, dict):
+        return None, _rejected(index, "Expected a transaction object")
+
+    try:
+        return BulkTransaction.parse_obj(data), None
+    except ValidationError as e:
+        error = e.errors()[0]
+        field = ".".join(str(part) for part in error["loc"])
+        return None, _rejected(index, f"{field}: {error['msg']}")
+
+
+async def ndjson_items(lines: AsyncIterator[str]):
+    async for line in lines:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+
+# One record per line, the first line names the columns
+async def csv_items(lines: AsyncIterator[str]):
+    header = None
+    async for line in lines:
+        if not line.strip():
+            continue
+
+        row = next(csv.reader([line]))
+        if header is None:
+            header = [column.strip() for column in row]
+            continue
+
+        yield {key: value for key, value in zip(header, row) if value != ""}
+
+
+# Applies one batch of postings in a single database transaction. Accounts are
+# locked in uuid order, then every posting is checked against the running
+# balance of its account in input order; rejected postings leave no trace.
+async def post_batch(batch: List[Tuple[int, BulkTransaction]]) -> List[dict]:
+    results = []
+    uuids = sorted({item.account_uuid for _, item in batch})
+
+    async with AsyncSession(engine) as session:
+        statement = (
+            select(
+                account.c.uuid,
+                account.c.balance,
+                account.c.minimum_balance,
+                account.c.branch_uuid,
+            )
+            .where(account.c.uuid.in_(uuids), account.c.deleted_at == None)
+            .order_by(account.c.uuid)
+            .with_for_update()
+        )
+        accounts = {row.uuid: row for row in (await session.execute(statement))}
+
+        now = datetime.utcnow()
+        balances = {}
+        records = []
+        rollups = defaultdict(lambda: [0, 0.0])
+        balance_delta = 0
+        for index, item in batch:
+            target = accounts.get(item.account_uuid)
+            if target is None:
+                results.append(_rejected(index, "Resource not found"))
+                continue
+
+            delta = {
+                TransactionType.DEPOSIT: item.amount,
+                TransactionType.WITHDRAWAL: -item.amount,
+            }.get(item.type, 0)
+            balance = balances.get(target.uuid, target.balance) + delta
+            if delta and balance < target.minimum_balance:
+                detail = (
+                    "Balance too low"
+                    if item.type == TransactionType.DEPOSIT
+                    else "Insufficient funds"
+                )
+                results.append(_rejected(index, detail))
+                continue
+
+            # interest and fee entries leave the balance and last activity
+            if delta:
+                balances[target.uuid] = balance
+                balance_delta += delta
+            rollup = rollups[(target.branch_uuid, item.type)]
+            rollup[0] += 1
+            rollup[1] += item.amount
+
+            transaction_uuid = uuid4()
+            records.append(
+                (
+                    transaction_uuid,
+                    target.uuid,
+                    int(item.type),
+                    item.amount,
+                    item.status,
+                    item.details,
+                    now,
+                    now,
+                    delta,
+                )
+            )
+            results.append(_accepted(index, transaction_uuid))
+
+        if balances:
+            await session.execute(
+                update_balances,
+                {"uuids": list(balances), "balances": list(balances.values())},
+            )
+        if records:
+            await copy_transactions(session, records)
+
+            # in key order like the accounts, so concurrent batches lock the
+            # rollup rows they share in the same order
+            rows = union_all(
+                *[
+                    rollup_row(now.date(), branch_uuid, type, count, total)
+                    for (branch_uuid, type), (count, total) in sorted(rollups.items())
+                ]
+            )
+            await session.execute(rollup_upsert(rows))
+            await counters.bump(session, counters.BALANCE_TOTAL, balance_delta)
+
+        await session.commit()
+
+    for (_, item), result in zip(batch, results):
+        detail = result["detail"]
+        outcome = metrics.rejection(detail) if detail else metrics.POSTED
+        metrics.posting(item.type, outcome)
+
+    return results
+
+
+# post_batch, except that a batch that fails is rolled back and reported with
+# every entry rejected. Returns the results and whether the batch went through.
+async def try_post_batch(
+    batch: List[Tuple[int, BulkTransaction]]
+) -> Tuple[List[dict], bool]:
+    try:
+        return await post_batch(batch), True
+    except Exception:
+        logger.exception("Bulk batch of %s postings failed", len(batch))
+
+    for _, item in batch:
+        metrics.posting(item.type, metrics.BATCH_FAILED)
+
+    return [_rejected(index, BATCH_FAILED) for index, _ in batch], False
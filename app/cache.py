@@ -0,0 +1,70 @@
+import time
+from collections import OrderedDict
+
+
+# every cache registers itself here so hit ratios can be reported in one place
+caches = {}
+
+
+# Bounded in-process LRU cache whose entries expire after `ttl` seconds.
+#
+# Invalidation bumps `generation`; a value loaded before an invalidation is
+# dropped by set(), so a slow loader can't put back a stale entry.
+class TTLCache:
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._data = OrderedDict()
+
+        caches[name] = self
+
+    def get(self, key):
+        item = self._data.get(key)
+        if item is not None:
+            value, expires_at = item
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+
+            del self._data[key]
+
+        self.misses += 1
+        return None
+
+    def set(self, key, value, generation: int = None):
+        if generation is not None and generation != self.generation:
+            return
+        if self.maxsize <= 0:
+            return
+
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, *keys):
+        self.generation += 1
+        for key in keys:
+            self._data.pop(key, None)
+
+    def clear(self):
+        self.generation += 1
+        self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,49 @@
+# Posts a day's interest to every live account, and on the first day of a
+# month the monthly fee (OINKBANK_MONTHLY_FEE):
+#
+#   python -m app.commands.accrue [--day 2021-12-31] [--chunk-size 50000]
+#
+# The day defaults to yesterday, the day that just ended. Each chunk of
+# accounts commits with its checkpoint, running the command again for the same
+# day resumes an interrupted run and does nothing for a finished one.
+import argparse
+import asyncio
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import app.models
+from app.accrual import numpy, run_accrual
+from app.dependencies import engine
+
+
+async def main(day: date, chunk_size: int):
+    started = time.perf_counter()
+
+    def progress(accounts):
+        elapsed = time.perf_counter() - started
+        print(f"{accounts} accounts, {accounts / elapsed:.0f}/s", flush=True)
+
+    run = await run_accrual(day, chunk_size, progress)
+    await engine.dispose()
+
+    print(f"accrual for {run.day} finished at {run.finished_at}")
+    print(f"accounts          {run.accounts}")
+    print(f"interest          {run.interest_total:.2f}")
+    print(f"fees              {run.fee_total:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--day",
+        type=date.fromisoformat,
+        default=datetime.utcnow().date() - timedelta(days=1),
+    )
+    parser.add_argument("--chunk-size", type=int)
+    args = parser.parse_args()
+
+    if numpy is None:
+        sys.exit("The accrual batch requires numpy, install the `accrual` extra")
+
+    asyncio.run(main(args.day, args.chunk_size))
@@ -0,0 +1,29 @@
+# Rebuilds transaction_rollup from the transaction history:
+#
+#   python -m app.commands.backfill_rollups
+#
+# Safe to run on a live database, postings wait until it commits.
+import asyncio
+
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app.models
+from app.dependencies import engine
+from app.models.rollup import TransactionRollup
+from app.rollups import rebuild
+
+
+async def main():
+    async with AsyncSession(engine) as session:
+        await rebuild(session)
+        await session.commit()
+
+        rows = (await session.exec(select(func.count(TransactionRollup.day)))).one()
+
+    await engine.dispose()
+    print(f"transaction_rollup rebuilt, {rows} rows")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
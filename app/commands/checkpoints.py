@@ -0,0 +1,31 @@
+# Rebuilds balance_checkpoint from the transaction history:
+#
+#   python -m app.commands.checkpoints
+#
+# The app only checkpoints the days that ended since its last run, this builds
+# the checkpoints of a history that predates them, or repairs them. Safe to run
+# on a live database, postings wait until it commits.
+import asyncio
+
+from sqlalchemy import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app.models
+from app.dependencies import engine
+from app.statements import checkpoint, rebuild
+
+
+async def main():
+    async with AsyncSession(engine) as session:
+        await rebuild(session)
+        await session.commit()
+
+        statement = select(func.count()).select_from(checkpoint)
+        rows = (await session.execute(statement)).scalar_one()
+
+    await engine.dispose()
+    print(f"balance_checkpoint rebuilt, {rows} rows")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
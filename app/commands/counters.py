@@ -0,0 +1,27 @@
+# Corrects the report counters from the account and user tables:
+#
+#   python -m app.commands.counters
+#
+# Every worker does it every OINKBANK_COUNTER_RECONCILE_INTERVAL seconds, this
+# is for right after upgrading a database with data or importing into it. Safe
+# to run on a live database, writes don't wait for it.
+import asyncio
+
+import app.models
+from app.counters import reconcile
+from app.dependencies import engine
+
+
+async def main():
+    drift = await reconcile()
+    await engine.dispose()
+
+    if drift is None:
+        print("Another worker is reconciling the counters, try again later")
+    else:
+        for name, delta in drift.items():
+            print(f"{name}: corrected by {delta}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+# Lists, creates and detaches the monthly partitions of the transaction table:
+#
+#   python -m app.commands.partitions list
+#   python -m app.commands.partitions create [--months-ahead 3]
+#   python -m app.commands.partitions detach --before 2025-01-01
+#
+# The app creates partitions ahead by itself, `create` is for a database no
+# worker is running against yet. `detach` takes the partitions of every month
+# before the given day's month out of the table, see app.partitions.
+import argparse
+import asyncio
+import sys
+from datetime import date
+
+import app.models
+from app.config import settings
+from app.dependencies import engine
+from app.partitions import (
+    attached_partitions,
+    create_partitions,
+    detach_partitions,
+    partition_name,
+)
+
+
+async def main(args):
+    try:
+        if args.command == "create":
+            months = await create_partitions(args.months_ahead)
+            print(f"created {len(months)} partitions")
+        elif args.command == "detach":
+            months = await detach_partitions(args.before)
+            print(f"detached {len(months)} partitions")
+        else:
+            async with engine.connect() as conn:
+                months = await attached_partitions(conn)
+    finally:
+        await engine.dispose()
+
+    for month in months:
+        print(partition_name(month))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list")
+    create = commands.add_parser("create")
+    create.add_argument(
+        "--months-ahead", type=int, default=settings.transaction_partitions_ahead
+    )
+    detach = commands.add_parser("detach")
+    detach.add_argument("--before", type=date.fromisoformat, required=True)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(main(args))
+    except ValueError as e:
+        sys.exit(str(e))
@@ -0,0 +1,116 @@
+import logging
+import random
+
+from sqlalchemy import Float, func, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql.expression import ColumnElement
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.dependencies import engine
+from app.models.account import Account
+from app.models.counter import ReportCounter
+from app.models.user import User, UserRole
+
+
+logger = logging.getLogger(__name__)
+
+SHARDS = 8
+
+ACCOUNTS_COUNT = "accounts_count"
+USERS_COUNT = "users_count"
+BALANCE_TOTAL = "balance_total"
+
+# arbitrary key, keeps workers from reconciling at the same time
+RECONCILE_LOCK = 7_101_001
+
+
+# Adds `delta` to a shard of counter `name`, a random one unless given. With
+# `source` (a CTE of the statement it is attached to) the delta is added once
+# per source row. `shard` and `delta` may be bind parameters.
+def counter_upsert(name: str, delta, source=None, shard=None):
+    if shard is None:
+        shard = random.randrange(SHARDS)
+
+    rows = select(
+        literal(name),
+        shard if isinstance(shard, ColumnElement) else literal(shard),
+        delta if isinstance(delta, ColumnElement) else literal(delta, Float),
+    )
+    if source is not None:
+        rows = rows.select_from(source)
+
+    statement = insert(ReportCounter).from_select(["name", "shard", "value"], rows)
+
+    return statement.on_conflict_do_update(
+        index_elements=["name", "shard"],
+        set_={"value": ReportCounter.value + statement.excluded.value},
+    )
+
+
+# Must run in the transaction that makes the change being counted.
+async def bump(session: AsyncSession, name: str, delta: float):
+    if delta:
+        await session.exec(counter_upsert(name, delta))
+
+
+async def read_counters(session: AsyncSession, *names: str) -> dict:
+    statement = (
+        select(ReportCounter.name, func.sum(ReportCounter.value))
+        .where(ReportCounter.name.in_(names))
+        .group_by(ReportCounter.name)
+    )
+    values = dict((await session.exec(statement)).all())
+
+    return {name: values.get(name, 0) for name in names}
+
+
+def _actual_values():
+    return {
+        ACCOUNTS_COUNT: select(func.count(Account.uuid)).where(
+            Account.deleted_at == None
+        ),
+        USERS_COUNT: select(func.count(User.uuid)).where(
+            User.role <= UserRole.CONSUMER, User.deleted_at == None
+        ),
+        BALANCE_TOTAL: select(func.coalesce(func.sum(Account.balance), 0)).where(
+            Account.deleted_at == None
+        ),
+    }
+
+
+# The difference between every counter and its source table. Read in a single
+# snapshot: each change to a source table bumps its counter in the same
+# transaction, so the two only differ by the drift.
+async def _drift() -> dict:
+    snapshot = engine.execution_options(isolation_level="REPEATABLE READ")
+    async with AsyncSession(snapshot) as session:
+        actual = _actual_values()
+        current = await read_counters(session, *actual)
+
+        return {
+            name: (await session.exec(statement)).one() - current[name]
+            for name, statement in actual.items()
+        }
+
+
+# Adds any drift of the counters from the source tables to a shard, like any
+# other change, so writes to account and user never wait for it. Scans both
+# tables, it is meant to run rarely (OINKBANK_COUNTER_RECONCILE_INTERVAL).
+# Returns the drift corrected, or None when another worker is reconciling.
+async def reconcile():
+    async with engine.begin() as conn:
+        # held until the drift is added, the next reconcile's snapshot sees it
+        locked = (
+            await conn.execute(select(func.pg_try_advisory_xact_lock(RECONCILE_LOCK)))
+        ).scalar()
+        if not locked:
+            return None
+
+        drift = await _drift()
+        for name, delta in drift.items():
+            if delta:
+                logger.warning("Counter %s was off by %s", name, -delta)
+                await conn.execute(counter_upsert(name, delta))
+
+        return drift
@@ -0,0 +1,157 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import AsyncIterator, List
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.dependencies import replicas
+from app.fast_read import json_default
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # parquet exports are optional
+    pyarrow = None
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+    PARQUET = "parquet"
+
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+
+def _value(value):
+    if isinstance(value, Enum):
+        return value.name
+
+    return value
+
+
+def _csv_chunk(columns: List[str], rows, header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    writer.writerows([_value(value) for value in row] for row in rows)
+
+    return buffer.getvalue().encode()
+
+
+def _ndjson_chunk(columns: List[str], rows) -> bytes:
+    lines = (
+        json.dumps(
+            {column: _value(value) for column, value in zip(columns, row)},
+            default=json_default,
+        )
+        for row in rows
+    )
+
+    return "".join(line + "\n" for line in lines).encode()
+
+
+# Write-only file for the parquet writer, every write is handed out by
+# take() so the file is never held in memory as a whole.
+class _ChunkSink:
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_type(column):
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return pyarrow.string()
+
+    return {
+        bool: pyarrow.bool_(),
+        int: pyarrow.int64(),
+        float: pyarrow.float64(),
+        datetime: pyarrow.timestamp("us"),
+        date: pyarrow.date32(),
+    }.get(python_type, pyarrow.string())
+
+
+def _parquet_schema(statement, columns: List[str]):
+    return pyarrow.schema(
+        [
+            (name, _arrow_type(column))
+            for name, column in zip(columns, statement.selected_columns)
+        ]
+    )
+
+
+def _parquet_batch(schema, rows):
+    arrays = []
+    for field, values in zip(schema, zip(*rows)):
+        if field.type == pyarrow.string():
+            values = [None if v is None else str(_value(v)) for v in values]
+        arrays.append(pyarrow.array(values, type=field.type))
+
+    return pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+# Streams the result of `statement` through a server side cursor, `chunk_size`
+# rows at a time, so memory stays flat regardless of how many rows match.
+async def stream_rows(
+    statement, columns: List[str], format: ExportFormat
+) -> AsyncIterator[bytes]:
+    chunk_size = settings.export_chunk_size
+    statement = statement.execution_options(yield_per=chunk_size)
+
+    async with AsyncSession(replicas.pick()) as session:
+        result = await session.stream(statement)
+
+        if format == ExportFormat.PARQUET:
+            schema = _parquet_schema(statement, columns)
+            sink = _ChunkSink()
+            writer = pyarrow.parquet.ParquetWriter(
+                pyarrow.PythonFile(sink, mode="w"), schema
+            )
+            async for rows in result.partitions(chunk_size):
+                writer.write_batch(_parquet_batch(schema, rows))
+                yield sink.take()
+            writer.close()
+            yield sink.take()
+            return
+
+        header = True
+        async for rows in result.partitions(chunk_size):
+            if format == ExportFormat.CSV:
+                yield _csv_chunk(columns, rows, header)
+                header = False
+            else:
+                yield _ndjson_chunk(columns, rows)
+
+        if format == ExportFormat.CSV and header:
+            yield _csv_chunk(columns, [], header)
@@ -0,0 +1,112 @@
+import json
+from datetime import date, datetime
+from typing import Type
+
+from fastapi import Response
+from sqlalchemy import and_, inspect, select, type_coerce
+from sqlalchemy.dialects.postgresql import UUID
+from sqlmodel import SQLModel
+from sqlmodel.sql.sqltypes import GUID
+
+try:
+    import orjson
+except ImportError:  # the standard library encoder is the fallback
+    orjson = None
+
+
+# dates for the standard library encoder, and the uuid type asyncpg returns,
+# which neither encoder knows
+def json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+
+    return str(value)
+
+
+def dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, default=json_default)
+
+    return json.dumps(value, default=json_default, separators=(",", ":")).encode()
+
+
+# The response body is written directly, the route's response_model only
+# documents it
+def json_response(value) -> Response:
+    return Response(content=dumps(value), media_type="application/json")
+
+
+def _result_column(column, label: str):
+    if isinstance(column.type, GUID):
+        # asyncpg already returns uuid objects, the model's GUID type would
+        # parse each of them again
+        column = type_coerce(column, UUID(as_uuid=True))
+
+    return column.label(label)
+
+
+# Fast path for hot listings. A read model and everything it nests is read with
+# one Core SELECT, every many-to-one relationship the read model nests becomes a
+# join, just like loaders.py loads them, and each row is turned straight into
+# plain dicts shaped like the read model. No ORM objects are built and nothing
+# is validated again: the columns already have the read model's types.
+class RowLayout:
+    def __init__(self, model: Type[SQLModel], read_model: Type[SQLModel], path=""):
+        table = model.__table__
+        self.table = table.alias(path) if path else table
+        self.columns = []
+        self.joins = []
+        # (name, position of the column or of the nested layout's first one,
+        # nested layout or None)
+        self._fields = []
+
+        relationships = inspect(model).relationships
+        prefix = f"{path}__" if path else ""
+        for name, field in read_model.__fields__.items():
+            if name in relationships:
+                relationship = relationships[name]
+                if relationship.uselist:
+                    raise ValueError(f"{model.__name__}.{name} is a collection")
+
+                nested = RowLayout(
+                    relationship.mapper.class_,
+                    field.type_,
+                    f"{path}_{name}" if path else name,
+                )
+                onclause = and_(
+                    *[
+                        self.table.c[local.name] == nested.table.c[remote.name]
+                        for local, remote in relationship.local_remote_pairs
+                    ]
+                )
+                self.joins.append((nested.table, onclause))
+                self.joins += nested.joins
+
+                self._fields.append((name, len(self.columns), nested))
+                self.columns += nested.columns
+            elif name in table.c:
+                self._fields.append((name, len(self.columns), None))
+                self.columns.append(_result_column(self.table.c[name], prefix + name))
+
+    # The root table's columns keep their names, so paginate() can read the
+    # cursor off the last row
+    def select(self):
+        from_clause = self.table
+        for table, onclause in self.joins:
+            from_clause = from_clause.join(table, onclause)
+
+        return select(*self.columns).select_from(from_clause)
+
+    def read(self, row, start: int = 0) -> dict:
+        return {
+            name: row[start + position]
+            if nested is None
+            else nested.read(row, start + position)
+            for name, position, nested in self._fields
+        }
+
+    def read_page(self, page: dict) -> dict:
+        return {
+            "items": [self.read(row) for row in page["items"]],
+            "next_cursor": page["next_cursor"],
+        }
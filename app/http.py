@@ -0,0 +1,39 @@
+import codecs
+
+from fastapi import Request, Response, status
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+# Answers 304 Not Modified when the client already holds `etag`, otherwise
+# sends `body` (already encoded JSON) tagged with it.
+def cached_response(
+    request: Request, body: bytes, etag: str, cache_control: str
+) -> Response:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# Yields the request body line by line as it arrives, without buffering it
+async def stream_lines(request: Request):
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in request.stream():
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line
+
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
@@ -0,0 +1,246 @@
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import timedelta
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+from sqlalchemy import func, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.dependencies import engine, replicas
+from app.models.job import JobStatus, ReportJob, ReportJobCreate
+from app.models.report import ReportName
+from app.reports import REPORTS
+
+
+logger = logging.getLogger(__name__)
+
+job = ReportJob.__table__
+
+PENDING = text("status IN ('queued', 'running')")
+
+
+def params_hash(report: str, params: dict) -> str:
+    canonical = json.dumps(
+        [report, jsonable_encoder(params)], sort_keys=True, separators=(",", ":")
+    )
+
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def parse_params(create: ReportJobCreate):
+    params_model, _ = REPORTS[create.report]
+    try:
+        return params_model.parse_obj(create.params)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=e.errors()
+        )
+
+
+async def _cached(session: AsyncSession, digest: str) -> Optional[ReportJob]:
+    statement = (
+        select(ReportJob)
+        .where(
+            ReportJob.params_hash == digest,
+            ReportJob.status == JobStatus.DONE,
+            ReportJob.expires_at > func.now(),
+        )
+        .order_by(ReportJob.expires_at.desc())
+        .limit(1)
+    )
+
+    return (await session.exec(statement)).one_or_none()
+
+
+async def _pending(session: AsyncSession, digest: str) -> Optional[ReportJob]:
+    statement = select(ReportJob).where(ReportJob.params_hash == digest, PENDING)
+
+    return (await session.exec(statement)).one_or_none()
+
+
+# Returns the job computing `create`: a done one whose result hasn't expired,
+# the pending one an identical request already queued, or a new one. The
+# partial unique index on pending hashes coalesces requests across processes.
+async def submit(create: ReportJobCreate) -> ReportJob:
+    params = parse_params(create)
+    params_data = jsonable_encoder(params, exclude_none=True)
+    digest = params_hash(create.report.value, params_data)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        while True:
+            cached = await _cached(session, digest)
+            if cached:
+                return cached
+
+            statement = (
+                insert(ReportJob)
+                .values(report=create.report, params=params_data, params_hash=digest)
+                .on_conflict_do_nothing(
+                    index_elements=[job.c.params_hash], index_where=PENDING
+                )
+                .returning(job.c.uuid)
+            )
+            created = (await session.execute(statement)).scalar_one_or_none()
+            await session.commit()
+            if created:
+                workers.wake()
+                return await session.get(ReportJob, created)
+
+            pending = await _pending(session, digest)
+            if pending:
+                return pending
+            # it finished in between, its result is cached now
+
+
+async def get_job(session: AsyncSession, uuid: UUID) -> ReportJob:
+    report_job = await session.get(ReportJob, uuid)
+    if not report_job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found"
+        )
+
+    return report_job
+
+
+# Marks the oldest queued job running and returns it, queued jobs locked by
+# another worker's claim are skipped
+async def _claim() -> Optional[ReportJob]:
+    oldest = (
+        select(job.c.uuid)
+        .where(job.c.status == JobStatus.QUEUED)
+        .order_by(job.c.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    statement = (
+        update(job)
+        .where(job.c.uuid == oldest)
+        .values(status=JobStatus.RUNNING, started_at=func.now())
+        .returning(job.c.uuid)
+    )
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        uuid = (await session.execute(statement)).scalar_one_or_none()
+        await session.commit()
+
+        return await session.get(ReportJob, uuid) if uuid else None
+
+
+# Stores the outcome of a job this worker claimed. The claim's started_at tells
+# it apart from a later claim: a job left running too long is put back by
+# sweep() and may be running elsewhere by now. Returns False when the job was
+# no longer this worker's, nothing is stored then.
+async def _finish(report_job: ReportJob, **values) -> bool:
+    async with AsyncSession(engine) as session:
+        result = await session.execute(
+            update(job)
+            .where(
+                job.c.uuid == report_job.uuid,
+                job.c.status == JobStatus.RUNNING,
+                job.c.started_at == report_job.started_at,
+            )
+            .values(finished_at=func.now(), **values)
+        )
+        await session.commit()
+
+    if result.rowcount == 0:
+        logger.warning("Report job %s was taken over, result dropped", report_job.uuid)
+        return False
+
+    return True
+
+
+# Results, and failures, are kept for OINKBANK_REPORT_CACHE_TTL seconds
+async def _run(report_job: ReportJob):
+    expires_at = func.now() + timedelta(seconds=settings.report_cache_ttl)
+    params_model, compute = REPORTS[ReportName(report_job.report)]
+    try:
+        async with AsyncSession(replicas.pick()) as session:
+            result = await compute(session, params_model.parse_obj(report_job.params))
+    except Exception as e:
+        logger.exception("Report job %s failed", report_job.uuid)
+        await _finish(
+            report_job,
+            status=JobStatus.FAILED,
+            error=str(e),
+            expires_at=expires_at,
+        )
+        return
+
+    await _finish(
+        report_job,
+        status=JobStatus.DONE,
+        result=jsonable_encoder(result),
+        expires_at=expires_at,
+    )
+
+
+# Puts back jobs left running by a worker that died and drops expired results
+async def sweep():
+    timeout = timedelta(seconds=settings.report_job_timeout)
+    async with AsyncSession(engine) as session:
+        await session.execute(
+            update(job)
+            .where(
+                job.c.status == JobStatus.RUNNING,
+                job.c.started_at < func.now() - timeout,
+            )
+            .values(status=JobStatus.QUEUED, started_at=None)
+        )
+        await session.execute(job.delete().where(job.c.expires_at < func.now()))
+        await session.commit()
+
+
+# Report computations run on the event loop of this process, at most `count`
+# at a time. Workers sleep until a job is submitted here, or poll the table for
+# jobs submitted to other processes.
+class JobWorkers:
+    def __init__(self, count: int):
+        self.count = count
+        self._tasks = []
+        self._wakeup = asyncio.Event()
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._work()) for _ in range(self.count)]
+
+    def shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def wake(self):
+        self._wakeup.set()
+
+    async def _work(self):
+        while True:
+            try:
+                report_job = await _claim()
+            except Exception:
+                logger.exception("Claiming a report job failed")
+                report_job = None
+
+            if report_job is None:
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), settings.report_poll_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            await _run(report_job)
+
+
+workers = JobWorkers(settings.report_workers)
@@ -0,0 +1,35 @@
+from functools import lru_cache
+from typing import Type
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+from sqlmodel import SQLModel
+
+
+# Relationships can not be lazy loaded on the event loop, and loading them one
+# row at a time is an N+1 anyway. The loader options are derived from the read
+# model an endpoint returns: every relationship the read model nests is loaded
+# up front, many-to-one with a join and collections with one extra SELECT ... IN,
+# so a listing costs a fixed number of queries whatever the page size.
+@lru_cache(maxsize=None)
+def loader_options(model: Type[SQLModel], read_model: Type[SQLModel]):
+    relationships = inspect(model).relationships
+    options = []
+    for name, field in read_model.__fields__.items():
+        if name not in relationships:
+            continue
+
+        relationship = relationships[name]
+        attribute = getattr(model, name)
+        option = (
+            selectinload(attribute) if relationship.uselist else joinedload(attribute)
+        )
+
+        if isinstance(field.type_, type) and issubclass(field.type_, SQLModel):
+            nested = loader_options(relationship.mapper.class_, field.type_)
+            if nested:
+                option = option.options(*nested)
+
+        options.append(option)
+
+    return tuple(options)
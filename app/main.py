@@ -1,7 +1,17 @@
+import asyncio
+
 from fastapi import FastAPI, APIRouter
-from sqlmodel import SQLModel
 from . import models
-from .dependencies import engine
+from .area_index import area_index
+from .background import run_periodically
+from .config import settings
+from .counters import reconcile
+from .dependencies import engine, replicas
+from .jobs import sweep, workers
+from .metrics import instrument, router as metrics_router
+from .partitions import create_partitions
+from .statements import update_checkpoints
+from .passwords import passwords
 from .routers.api import api
 
 # Init fastapi
@@ -9,8 +19,62 @@ app = FastAPI(title="Oink Bank")
 
 # Init routes
 app.include_router(api)
+app.include_router(metrics_router)
+
+instrument(app, engine, replicas)
+
+background_tasks = []
 
 
 @app.on_event("startup")
-def on_startup():
-    SQLModel.metadata.create_all(engine)
+async def on_startup():
+    passwords.start()
+    workers.start()
+
+    await replicas.check()
+    await area_index.load()
+    await create_partitions(settings.transaction_partitions_ahead)
+
+    background_tasks.append(
+        asyncio.create_task(
+            run_periodically(settings.area_refresh_interval, area_index.refresh)
+        )
+    )
+    background_tasks.append(
+        asyncio.create_task(
+            run_periodically(settings.counter_reconcile_interval, reconcile)
+        )
+    )
+    background_tasks.append(
+        asyncio.create_task(run_periodically(settings.report_cache_ttl, sweep))
+    )
+    background_tasks.append(
+        asyncio.create_task(
+            run_periodically(
+                settings.partition_check_interval,
+                create_partitions,
+                settings.transaction_partitions_ahead,
+            )
+        )
+    )
+    background_tasks.append(
+        asyncio.create_task(
+            run_periodically(settings.replica_check_interval, replicas.check)
+        )
+    )
+    background_tasks.append(
+        asyncio.create_task(
+            run_periodically(settings.checkpoint_interval, update_checkpoints)
+        )
+    )
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    for task in background_tasks:
+        task.cancel()
+
+    workers.shutdown()
+    passwords.shutdown()
+    await replicas.dispose()
+    await engine.dispose()
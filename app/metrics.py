@@ -0,0 +1,213 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Response, status
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    import prometheus_client
+    from prometheus_client import Counter, Histogram
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+except ImportError:  # metrics are optional
+    prometheus_client = None
+
+
+# [statements, seconds] of the SQL run for the current request, None outside
+# of one (background tasks, commands)
+_request_db: ContextVar[Optional[list]] = ContextVar("request_db", default=None)
+
+if prometheus_client is not None:
+    REQUEST_SECONDS = Histogram(
+        "oinkbank_http_request_duration_seconds",
+        "Time to respond to a request, streamed bodies included",
+        ["method", "route", "status"],
+    )
+    REQUEST_DB_STATEMENTS = Histogram(
+        "oinkbank_http_request_db_statements",
+        "SQL statements run for a request",
+        ["method", "route"],
+        buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+    )
+    REQUEST_DB_SECONDS = Histogram(
+        "oinkbank_http_request_db_seconds",
+        "Time spent running SQL statements for a request",
+        ["method", "route"],
+    )
+    STATEMENT_SECONDS = Histogram(
+        "oinkbank_db_statement_duration_seconds",
+        "Time to run a SQL statement, from any request or background task",
+    )
+    AUTH_FAILURES = Counter(
+        "oinkbank_auth_failures",
+        "Rejected logins and tokens",
+        ["reason"],
+    )
+    POSTINGS = Counter(
+        "oinkbank_postings",
+        "Postings by transaction type and outcome",
+        ["type", "outcome"],
+    )
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _start_statement(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _end_statement(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_start
+        STATEMENT_SECONDS.observe(elapsed)
+
+        request_db = _request_db.get()
+        if request_db is not None:
+            request_db[0] += 1
+            request_db[1] += elapsed
+
+
+def auth_failure(reason: str):
+    if prometheus_client is not None:
+        AUTH_FAILURES.labels(reason).inc()
+
+
+# Outcomes of a posting, the only values its label takes: posted, the batch it
+# was part of failed, or the reason it was rejected
+POSTED = "posted"
+BATCH_FAILED = "batch_failed"
+REJECTED = "rejected"
+REJECTIONS = {
+    "Insufficient funds": "insufficient_funds",
+    "Balance too low": "balance_too_low",
+    "Resource not found": "not_found",
+    "Transfer destination not found": "destination_not_found",
+    "Cannot transfer to the same account": "same_account",
+    "Incoming transfers are posted by their transfer": "incoming_transfer",
+}
+
+
+# The outcome of a rejection by its detail, REJECTED when it isn't a known one
+def rejection(detail: str) -> str:
+    return REJECTIONS.get(detail, REJECTED)
+
+
+def posting(type, outcome: str):
+    if prometheus_client is not None:
+        POSTINGS.labels(type.name, outcome).inc()
+
+
+# Pool gauges and counters of the primary and every replica, read when scraped
+class PoolCollector:
+    def __init__(self, primary, replicas):
+        self.primary = primary
+        self.replicas = replicas
+
+    def collect(self):
+        connections = GaugeMetricFamily(
+            "oinkbank_db_pool_connections",
+            "Connections of the pool by state",
+            labels=["pool", "state"],
+        )
+        checkouts = CounterMetricFamily(
+            "oinkbank_db_pool_checkouts",
+            "Connections handed out by the pool",
+            labels=["pool"],
+        )
+        timeouts = CounterMetricFamily(
+            "oinkbank_db_pool_timeouts",
+            "Checkouts that gave up waiting for a connection",
+            labels=["pool"],
+        )
+        wait = CounterMetricFamily(
+            "oinkbank_db_pool_wait_seconds",
+            "Time spent waiting for a connection",
+            labels=["pool"],
+        )
+        engines = [("primary", self.primary)] + [
+            (replica.name, replica.engine) for replica in self.replicas.replicas
+        ]
+        for name, engine in engines:
+            pool = engine.pool
+            for state, value in (
+                ("checked_in", pool.checkedin()),
+                ("checked_out", pool.checkedout()),
+                ("overflow", max(pool.overflow(), 0)),
+            ):
+                connections.add_metric([name, state], value)
+            checkouts.add_metric([name], pool.checkouts)
+            timeouts.add_metric([name], pool.timeouts)
+            wait.add_metric([name], pool.wait_total)
+
+        return [connections, checkouts, timeouts, wait]
+
+
+# ASGI middleware timing every request under its route template, so
+# /accounts/{uuid} is one series however many accounts there are
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self._templates = None
+
+    def _route(self, scope) -> str:
+        if self._templates is None:
+            self._templates = {}
+            for route in scope["app"].routes:
+                endpoint = getattr(route, "endpoint", None)
+                if endpoint is not None:
+                    self._templates.setdefault(endpoint, route.path)
+
+        return self._templates.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status_code = 500
+        request_db = [0, 0.0]
+        token = _request_db.set(request_db)
+
+        async def send_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            _request_db.reset(token)
+
+            method, route = scope["method"], self._route(scope)
+            REQUEST_SECONDS.labels(method, route, status_code).observe(
+                time.perf_counter() - start
+            )
+            REQUEST_DB_STATEMENTS.labels(method, route).observe(request_db[0])
+            REQUEST_DB_SECONDS.labels(method, route).observe(request_db[1])
+
+
+# Times every request and reports the pools of `primary` and `replicas`
+def instrument(app, primary, replicas):
+    if prometheus_client is None:
+        return
+
+    app.add_middleware(MetricsMiddleware)
+    prometheus_client.REGISTRY.register(PoolCollector(primary, replicas))
+
+
+router = APIRouter()
+
+
+# Prometheus text format, for scrapers on the internal network
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    if prometheus_client is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Metrics require prometheus_client",
+        )
+
+    # passed as a header, a media_type would get a second charset
+    return Response(
+        prometheus_client.generate_latest(),
+        headers={"Content-Type": prometheus_client.CONTENT_TYPE_LATEST},
+    )
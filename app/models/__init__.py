@@ -1,5 +1,14 @@
+# sqlmodel 0.0.4 indexes every column whose field doesn't say `index=False`,
+# each write would then update an index per column. Table fields say it unless
+# the column is meant to be indexed, the other indexes are in __table_args__.
 from .area import Area
 from .address import Address
 from .branch import Branch
 from .account import Account
-from .user import User
\ No newline at end of file
+from .user import User
+from .counter import ReportCounter
+from .rollup import TransactionRollup
+from .version import TableVersion
+from .accrual import AccrualRun
+from .job import ReportJob
+from .statement import BalanceCheckpoint
@@ -1,9 +1,10 @@
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship, text
 from pydantic import EmailStr, validator
 
 from enum import Enum, IntEnum
 from uuid import UUID, uuid4
-from datetime import datetime
+from datetime import date, datetime
 from typing import TYPE_CHECKING, List, Optional
 
 from app.models.branch import BranchRead
@@ -14,25 +15,56 @@ if TYPE_CHECKING:
     from app.models.user import User
     from app.models.transaction import Transaction
 
+
 class Currency(str, Enum):
     IDR = "IDR"
 
 
 class AccountBase(SQLModel):
-    number: str
+    number: str = Field(index=False)
     balance: float = Field(
-        default=0, nullable=False, sa_column_kwargs={"server_default": "0"}
+        default=0, nullable=False, sa_column_kwargs={"server_default": "0"}, index=False
     )
     currency: Currency = Field(
-        default=Currency.IDR, nullable=False, sa_column_kwargs={"server_default": "IDR"}
+        default=Currency.IDR,
+        nullable=False,
+        sa_column_kwargs={"server_default": "IDR"},
+        index=False,
     )
     minimum_balance: float = Field(
-        default=50_000, nullable=False, sa_column_kwargs={"server_default": "50000"}
+        default=50_000,
+        nullable=False,
+        sa_column_kwargs={"server_default": "50000"},
+        index=False,
     )
-    interest: float
+    interest: float = Field(index=False)
 
 
 class Account(AccountBase, table=True):
+    __table_args__ = (
+        # keyset pagination order
+        Index(
+            "ix_account_created_at_uuid",
+            "created_at",
+            "uuid",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        # a number belongs to one live account, transfers look accounts up by it
+        Index(
+            "ux_account_number",
+            "number",
+            unique=True,
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        # inactive accounts report, in its keyset pagination order
+        Index(
+            "ix_account_last_activity_at_uuid",
+            "last_activity_at",
+            "uuid",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
+
     user_uuid: UUID = Field(foreign_key="user.uuid", index=True)
     branch_uuid: UUID = Field(foreign_key="branch.uuid", index=True)
 
@@ -43,11 +75,13 @@ class Account(AccountBase, table=True):
         default_factory=uuid4,
         primary_key=True,
         sa_column_kwargs={"server_default": text("uuid_generate_v4()")},
+        index=False,
     )
     created_at: datetime = Field(
         default_factory=datetime.utcnow,
         nullable=False,
         sa_column_kwargs={"server_default": text("now()")},
+        index=False,
     )
     updated_at: datetime = Field(
         default_factory=datetime.utcnow,
@@ -56,8 +90,24 @@ class Account(AccountBase, table=True):
             "server_default": text("now()"),
             "server_onupdate": text("now()"),
         },
+        index=False,
     )
-    deleted_at: Optional[datetime]
+    deleted_at: Optional[datetime] = Field(index=False)
+    # last customer posting, unlike updated_at untouched by edits and by
+    # interest or fee postings
+    last_activity_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        nullable=False,
+        sa_column_kwargs={"server_default": text("now()")},
+        index=False,
+    )
+    # balance the account was opened with, statements start from it
+    opening_balance: float = Field(
+        default=0, nullable=False, sa_column_kwargs={"server_default": "0"}, index=False
+    )
+    # the first day statements are exact from, when transactions deleted
+    # without giving their balance change back came before it (migration 0009)
+    statements_from: Optional[date] = Field(index=False)
 
     transactions: List["Transaction"] = Relationship(back_populates="account")
 
@@ -73,6 +123,12 @@ class AccountRead(AccountBase):
     uuid: UUID
     created_at: datetime
     updated_at: datetime
+    last_activity_at: datetime
+
+
+class AccountNumberRead(SQLModel):
+    number: str
+    uuid: UUID
 
 
 class AccountUpdate(SQLModel):
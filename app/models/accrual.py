@@ -0,0 +1,24 @@
+from sqlmodel import SQLModel, Field, text
+from uuid import UUID
+from datetime import date, datetime
+from typing import Optional
+
+
+# Progress of the interest and fee accrual for one day. Each chunk of accounts
+# moves `last_uuid` forward in the same database transaction as its postings,
+# so an interrupted run resumes after the last chunk it committed.
+class AccrualRun(SQLModel, table=True):
+    __tablename__ = "accrual_run"
+
+    day: date = Field(primary_key=True, index=False)
+    last_uuid: Optional[UUID] = Field(index=False)
+    accounts: int = Field(default=0, nullable=False, index=False)
+    interest_total: float = Field(default=0, nullable=False, index=False)
+    fee_total: float = Field(default=0, nullable=False, index=False)
+    started_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        nullable=False,
+        sa_column_kwargs={"server_default": text("now()")},
+        index=False,
+    )
+    finished_at: Optional[datetime] = Field(index=False)
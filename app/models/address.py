@@ -16,16 +16,16 @@ if TYPE_CHECKING:
 
 
 class AddressBase(SQLModel):
-    address: str
-    rt: int
-    rw: int
+    address: str = Field(index=False)
+    rt: int = Field(index=False)
+    rw: int = Field(index=False)
 
 
 class Address(AddressBase, table=True):
-    subdistrict_uuid: UUID = Field(foreign_key="area.uuid")
-    district_uuid: UUID = Field(foreign_key="area.uuid")
-    city_uuid: UUID = Field(foreign_key="area.uuid")
-    province_uuid: UUID = Field(foreign_key="area.uuid")
+    subdistrict_uuid: UUID = Field(foreign_key="area.uuid", index=False)
+    district_uuid: UUID = Field(foreign_key="area.uuid", index=False)
+    city_uuid: UUID = Field(foreign_key="area.uuid", index=False)
+    province_uuid: UUID = Field(foreign_key="area.uuid", index=False)
 
     province: Area = Relationship(
         sa_relationship_kwargs={
@@ -52,11 +52,13 @@ class Address(AddressBase, table=True):
         default_factory=uuid4,
         primary_key=True,
         sa_column_kwargs={"server_default": text("uuid_generate_v4()")},
+        index=False,
     )
     created_at: datetime = Field(
         default_factory=datetime.utcnow,
         nullable=False,
         sa_column_kwargs={"server_default": text("now()")},
+        index=False,
     )
     updated_at: datetime = Field(
         default_factory=datetime.utcnow,
@@ -65,8 +67,9 @@ class Address(AddressBase, table=True):
             "server_default": text("now()"),
             "server_onupdate": text("now()"),
         },
+        index=False,
     )
-    deleted_at: Optional[datetime]
+    deleted_at: Optional[datetime] = Field(index=False)
 
     user: Optional["User"] = Relationship(back_populates="address")
     branch: Optional["Branch"] = Relationship(back_populates="address")
@@ -0,0 +1,42 @@
+from sqlmodel import SQLModel
+from typing import Optional
+
+
+class PoolStatus(SQLModel):
+    name: str
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    max_overflow: int
+    checkouts: int
+    timeouts: int
+    wait_avg_ms: float
+    wait_max_ms: float
+    connections: int
+    connection_age_avg_s: float
+    connection_age_max_s: float
+
+
+class CacheStatus(SQLModel):
+    name: str
+    size: int
+    maxsize: int
+    ttl: float
+    hits: int
+    misses: int
+    hit_ratio: float
+
+
+class QueryStatus(SQLModel):
+    name: str
+    executions: int
+    cache_hits: int
+    cache_misses: int
+    hit_ratio: float
+
+
+class ReplicaStatus(SQLModel):
+    name: str
+    lag_s: Optional[float]
+    in_sync: bool
@@ -8,9 +8,9 @@ import re
 
 
 class AreaBase(SQLModel):
-    name: str = Field(max_length=128)
-    level: int
-    parent_uuid: Optional[UUID]
+    name: str = Field(max_length=128, index=False)
+    level: int = Field(index=False)
+    parent_uuid: Optional[UUID] = Field(index=False)
 
 
 class Area(AreaBase, table=True):
@@ -18,11 +18,13 @@ class Area(AreaBase, table=True):
         default_factory=uuid4,
         primary_key=True,
         sa_column_kwargs={"server_default": text("uuid_generate_v4()")},
+        index=False,
     )
     created_at: datetime = Field(
         default_factory=datetime.utcnow,
         nullable=False,
         sa_column_kwargs={"server_default": text("now()")},
+        index=False,
     )
     updated_at: datetime = Field(
         default_factory=datetime.utcnow,
@@ -31,8 +33,9 @@ class Area(AreaBase, table=True):
             "server_default": text("now()"),
             "server_onupdate": text("now()"),
         },
+        index=False,
     )
-    deleted_at: Optional[datetime]
+    deleted_at: Optional[datetime] = Field(index=False)
 
 class AreaRead(SQLModel):
     name: str
@@ -3,7 +3,7 @@ from enum import Enum, IntEnum
 from uuid import UUID, uuid4
 from datetime import datetime
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import text
+from sqlalchemy import Index, text
 from pydantic import EmailStr, validator
 from typing import TYPE_CHECKING, List, Optional
 
@@ -20,25 +20,37 @@ class BranchType(str, Enum):
 
 
 class BranchBase(SQLModel):
-    name: str
-    type: BranchType
-    phone_number: str
-    description: Optional[str]
+    name: str = Field(index=False)
+    type: BranchType = Field(index=False)
+    phone_number: str = Field(index=False)
+    description: Optional[str] = Field(index=False)
 
 
 class Branch(BranchBase, table=True):
-    address_uuid: UUID = Field(foreign_key="address.uuid")
+    __table_args__ = (
+        # keyset pagination order
+        Index(
+            "ix_branch_created_at_uuid",
+            "created_at",
+            "uuid",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
+
+    address_uuid: UUID = Field(foreign_key="address.uuid", index=False)
     address: "Address" = Relationship(back_populates="branch")
 
     uuid: Optional[UUID] = Field(
         default_factory=uuid4,
         primary_key=True,
         sa_column_kwargs={"server_default": text("uuid_generate_v4()")},
+        index=False,
     )
     created_at: datetime = Field(
         default_factory=datetime.utcnow,
         nullable=False,
         sa_column_kwargs={"server_default": text("now()")},
+        index=False,
     )
     updated_at: datetime = Field(
         default_factory=datetime.utcnow,
@@ -47,8 +59,9 @@ class Branch(BranchBase, table=True):
             "server_default": text("now()"),
             "server_onupdate": text("now()"),
         },
+        index=False,
     )
-    deleted_at: Optional[datetime]
+    deleted_at: Optional[datetime] = Field(index=False)
 
     accounts: List["Account"] = Relationship(back_populates="branch")
 
@@ -0,0 +1,53 @@
+from enum import Enum
+from sqlmodel import SQLModel, Field
+from pydantic import validator
+from typing import List, Optional
+from uuid import UUID
+
+from app.models.transaction import TransactionType
+
+
+class BulkTransaction(SQLModel):
+    account_uuid: UUID
+    type: TransactionType
+    amount: float = Field(gt=0)
+    status: bool = False
+    details: Optional[str]
+
+    # CSV and hand written batches may use names ("deposit") or numbers as text
+    @validator("type", pre=True)
+    def parse_type(cls, value):
+        if isinstance(value, str):
+            if value.isdigit():
+                return int(value)
+            try:
+                return TransactionType[value.upper()]
+            except KeyError:
+                raise ValueError("unknown transaction type")
+        return value
+
+    @validator("type")
+    def not_transfer(cls, value):
+        if value in (TransactionType.TRANSFER, TransactionType.TRANSFER_IN):
+            raise ValueError("transfers can't be posted in bulk")
+        return value
+
+
+class BulkStatus(str, Enum):
+    ACCEPTED = "accepted"
+    REJECTED = "rejected"
+
+
+class BulkResult(SQLModel):
+    index: int
+    status: BulkStatus
+    transaction_uuid: Optional[UUID]
+    detail: Optional[str]
+
+
+class BulkReport(SQLModel):
+    accepted: int
+    rejected: int
+    # false when a batch failed and the entries after it were never read
+    complete: bool
+    results: List[BulkResult]
@@ -0,0 +1,12 @@
+from sqlmodel import SQLModel, Field
+
+
+# Running totals behind the dashboard reports. Each counter is split over a few
+# shard rows so concurrent writers rarely wait on the same row lock, its value
+# is the sum of its shards.
+class ReportCounter(SQLModel, table=True):
+    __tablename__ = "report_counter"
+
+    name: str = Field(primary_key=True, index=False)
+    shard: int = Field(primary_key=True, index=False)
+    value: float = Field(default=0, nullable=False, index=False)
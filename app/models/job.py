@@ -0,0 +1,79 @@
+from enum import Enum
+from sqlalchemy import Column, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import SQLModel, Field, text
+from uuid import UUID, uuid4
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from app.models.report import ReportName
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class ReportJobBase(SQLModel):
+    report: ReportName = Field(index=False)
+    params: Dict[str, Any] = Field(default={}, sa_column=Column(JSONB, nullable=False))
+
+
+# A report computed in the background. The table is the queue: workers of any
+# process claim queued jobs, and done jobs are the result cache until they
+# expire.
+class ReportJob(ReportJobBase, table=True):
+    __tablename__ = "report_job"
+    __table_args__ = (
+        # one pending job per set of parameters, identical requests join it
+        Index(
+            "ux_report_job_params_hash_pending",
+            "params_hash",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+        # cached results
+        Index(
+            "ix_report_job_params_hash_expires_at",
+            "params_hash",
+            "expires_at",
+            postgresql_where=text("status = 'done'"),
+        ),
+    )
+
+    uuid: UUID = Field(
+        default_factory=uuid4,
+        primary_key=True,
+        sa_column_kwargs={"server_default": text("uuid_generate_v4()")},
+        index=False,
+    )
+    # sha256 of the report name and its canonical parameters
+    params_hash: str = Field(nullable=False, index=False)
+    status: JobStatus = Field(default=JobStatus.QUEUED, nullable=False, index=False)
+    result: Optional[Dict[str, Any]] = Field(sa_column=Column(JSONB))
+    error: Optional[str] = Field(index=False)
+    created_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        nullable=False,
+        sa_column_kwargs={"server_default": text("now()")},
+        index=False,
+    )
+    started_at: Optional[datetime] = Field(index=False)
+    finished_at: Optional[datetime] = Field(index=False)
+    expires_at: Optional[datetime] = Field(index=False)
+
+
+class ReportJobCreate(ReportJobBase):
+    pass
+
+
+class ReportJobRead(ReportJobBase):
+    uuid: UUID
+    status: JobStatus
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    expires_at: Optional[datetime]
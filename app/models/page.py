@@ -0,0 +1,9 @@
+from pydantic.generics import GenericModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Page(GenericModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str]
@@ -1,26 +1,66 @@
+from enum import Enum
 from sqlmodel import SQLModel, Field, text
 from typing import List, Optional, Union
 from uuid import UUID, uuid4
 from datetime import date, datetime
 from pydantic import EmailStr, validator
 import re
-from app.models.account import AccountRead
 
 from app.models.user import User, UserRead
 
 
+class ReportName(str, Enum):
+    ACCOUNTS_USERS = "accounts_users"
+    TRANSACTIONS = "transactions"
+
+
+class AccountsUsersParams(SQLModel):
+    start_date: Optional[date]
+    end_date: Optional[date]
+
+
 class AccountsUsers(SQLModel):
     accounts_count: int
     users_count: int
 
 
-class Transactions(SQLModel):
-    deposits_count: int
-    deposits_total: float
-    withdrawals_count: int
-    withdrawals_total: float
+class TotalBalance(SQLModel):
+    balance_total: float
+
+
+class Interval(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class TransactionsParams(SQLModel):
+    start_date: Optional[date]
+    end_date: Optional[date]
+    branch_uuid: Optional[UUID]
+    interval: Optional[Interval]
+
+
+class TransactionTotals(SQLModel):
+    deposits_count: int = 0
+    deposits_total: float = 0
+    withdrawals_count: int = 0
+    withdrawals_total: float = 0
+
+
+class TransactionsPeriod(TransactionTotals):
+    period: date
+
+
+class Transactions(TransactionTotals):
+    series: Optional[List[TransactionsPeriod]]
 
 
 class AccountInactive(SQLModel):
-    account: AccountRead
+    uuid: UUID
+    number: str
+    user_uuid: UUID
+    branch_uuid: UUID
+    balance: float
+    last_activity_at: datetime
     days_inactive: int
@@ -0,0 +1,17 @@
+from sqlmodel import SQLModel, Field
+from uuid import UUID
+from datetime import date
+
+from app.models.transaction import TransactionType
+
+
+# Transactions per (day, branch, type), maintained together with every posting
+# and soft-delete so reports read O(days) rows instead of scanning transactions
+class TransactionRollup(SQLModel, table=True):
+    __tablename__ = "transaction_rollup"
+
+    day: date = Field(primary_key=True, index=False)
+    branch_uuid: UUID = Field(primary_key=True, foreign_key="branch.uuid", index=False)
+    type: TransactionType = Field(primary_key=True, index=False)
+    count: int = Field(default=0, nullable=False, index=False)
+    total: float = Field(default=0, nullable=False, index=False)
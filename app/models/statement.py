@@ -0,0 +1,36 @@
+from sqlmodel import SQLModel, Field
+from uuid import UUID
+from datetime import date, datetime
+from typing import List, Optional
+
+from app.models.transaction import TransactionType
+
+
+# An account's balance at the end of a day it had transactions on, so a
+# statement's opening balance is one lookup plus the transactions since
+class BalanceCheckpoint(SQLModel, table=True):
+    __tablename__ = "balance_checkpoint"
+
+    account_uuid: UUID = Field(
+        primary_key=True, foreign_key="account.uuid", index=False
+    )
+    day: date = Field(primary_key=True, index=False)
+    balance: float = Field(nullable=False, index=False)
+
+
+class StatementLine(SQLModel):
+    uuid: UUID
+    type: TransactionType
+    amount: float
+    details: Optional[str]
+    created_at: datetime
+    balance: float
+
+
+class Statement(SQLModel):
+    account_uuid: UUID
+    start_date: date
+    end_date: date
+    opening_balance: float
+    closing_balance: float
+    lines: List[StatementLine]
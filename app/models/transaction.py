@@ -1,3 +1,4 @@
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship, text
 from pydantic import EmailStr, validator
 
@@ -20,30 +21,57 @@ class TransactionType(IntEnum):
     TRANSFER = 3
     INTEREST = 4
     FEE = 5
+    # the destination's side of a transfer, posted together with it
+    TRANSFER_IN = 6
 
 class TransferFund(SQLModel):
     account_number: str
 
 class TransactionBase(SQLModel):
-    type: TransactionType
-    amount: float = Field(default=0)
-    status: bool = Field(default=False)
-    details: Optional[str]
+    type: TransactionType = Field(index=False)
+    amount: float = Field(default=0, index=False)
+    status: bool = Field(default=False, index=False)
+    details: Optional[str] = Field(index=False)
 
 
 class Transaction(TransactionBase, table=True):
-    account_uuid: UUID = Field(foreign_key="account.uuid", index=True)
+    __table_args__ = (
+        # account history in keyset pagination order
+        Index(
+            "ix_transaction_account_uuid_created_at_uuid",
+            "account_uuid",
+            "created_at",
+            "uuid",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        # exports across all accounts
+        Index(
+            "ix_transaction_created_at_uuid",
+            "created_at",
+            "uuid",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        # one partition per month, see app.partitions
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    # looked up through ix_transaction_account_uuid_created_at_uuid
+    account_uuid: UUID = Field(foreign_key="account.uuid", index=False)
     account: "Account" = Relationship(back_populates="transactions")
 
     uuid: Optional[UUID] = Field(
         default_factory=uuid4,
         primary_key=True,
         sa_column_kwargs={"server_default": text("uuid_generate_v4()")},
+        index=False,
     )
+    # part of the primary key, it is the partition key
     created_at: datetime = Field(
         default_factory=datetime.utcnow,
+        primary_key=True,
         nullable=False,
         sa_column_kwargs={"server_default": text("now()")},
+        index=False,
     )
     updated_at: datetime = Field(
         default_factory=datetime.utcnow,
@@ -52,8 +80,12 @@ class Transaction(TransactionBase, table=True):
             "server_default": text("now()"),
             "server_onupdate": text("now()"),
         },
+        index=False,
     )
-    deleted_at: Optional[datetime]
+    deleted_at: Optional[datetime] = Field(index=False)
+    # what the posting did to the account's balance, 0 for interest and fees
+    # posted by hand
+    balance_change: float = Field(index=False)
 
 
 class TransactionCreate(TransactionBase):
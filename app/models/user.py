@@ -3,7 +3,7 @@ from enum import Enum, IntEnum
 from uuid import UUID, uuid4
 from datetime import datetime
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import text
+from sqlalchemy import Index, text
 from pydantic import EmailStr, validator
 from typing import TYPE_CHECKING, List, Optional
 
@@ -29,28 +29,42 @@ class UserBase(SQLModel):
     username: str = Field(sa_column_kwargs={"unique": True})
     email: EmailStr = Field(sa_column_kwargs={"unique": True})
     phone_number: str = Field(sa_column_kwargs={"unique": True})
-    full_name: str
-    identity_number: str
-    identity_type: IdentityType
+    full_name: str = Field(index=False)
+    identity_number: str = Field(index=False)
+    identity_type: IdentityType = Field(index=False)
     phone_number: str
-    description: Optional[str]
+    description: Optional[str] = Field(index=False)
 
 
 class User(UserBase, table=True):
-    role: UserRole = Field(default=1, sa_column_kwargs={"server_default": "1"})
-    password_hash: bytes
-    address_uuid: UUID = Field(foreign_key="address.uuid")
+    __table_args__ = (
+        # keyset pagination order
+        Index(
+            "ix_user_created_at_uuid",
+            "created_at",
+            "uuid",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
+
+    role: UserRole = Field(
+        default=1, sa_column_kwargs={"server_default": "1"}, index=False
+    )
+    password_hash: bytes = Field(index=False)
+    address_uuid: UUID = Field(foreign_key="address.uuid", index=False)
     address: "Address" = Relationship(back_populates="user")
 
     uuid: Optional[UUID] = Field(
         default_factory=uuid4,
         primary_key=True,
         sa_column_kwargs={"server_default": text("uuid_generate_v4()")},
+        index=False,
     )
     created_at: datetime = Field(
         default_factory=datetime.utcnow,
         nullable=False,
         sa_column_kwargs={"server_default": text("now()")},
+        index=False,
     )
     updated_at: datetime = Field(
         default_factory=datetime.utcnow,
@@ -59,8 +73,9 @@ class User(UserBase, table=True):
             "server_default": text("now()"),
             "server_onupdate": text("now()"),
         },
+        index=False,
     )
-    deleted_at: Optional[datetime]
+    deleted_at: Optional[datetime] = Field(index=False)
 
     accounts: List["Account"] = Relationship(back_populates="user")
 
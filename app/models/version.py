@@ -0,0 +1,12 @@
+from sqlmodel import SQLModel, Field
+
+
+# Version counters for read-mostly tables. Bumping a counter tells every worker
+# that its in-memory copy of that table, and any ETag derived from it, is stale.
+class TableVersion(SQLModel, table=True):
+    __tablename__ = "table_version"
+
+    name: str = Field(primary_key=True, index=False)
+    version: int = Field(
+        default=0, nullable=False, sa_column_kwargs={"server_default": "0"}, index=False
+    )
@@ -0,0 +1,124 @@
+import logging
+import re
+from datetime import date, datetime
+from typing import List, Optional
+
+from sqlalchemy import func, select, text
+
+from app.dependencies import engine
+
+
+logger = logging.getLogger(__name__)
+
+# transaction is partitioned by month of created_at (UTC), the partition of a
+# month is named after it and keeps its name once detached
+PARTITION_NAME = re.compile(r"^transaction_(\d{4})_(\d{2})$")
+
+PARTITION_LOCK = 7_101_002
+
+# Creating a partition briefly locks the whole table. Rather than have every
+# query queue up behind one long running read, give up and try again at the
+# next check.
+CREATE_LOCK_TIMEOUT = "5s"
+
+PARTITIONS_STATEMENT = text(
+    """
+    SELECT child.relname
+    FROM pg_inherits
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE pg_inherits.inhparent = '"transaction"'::regclass
+    """
+)
+
+
+def month_of(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"transaction_{month:%Y_%m}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    match = PARTITION_NAME.match(name)
+    if not match:
+        return None
+
+    return date(int(match[1]), int(match[2]), 1)
+
+
+# months of the attached partitions, oldest first
+async def attached_partitions(conn) -> List[date]:
+    names = (await conn.execute(PARTITIONS_STATEMENT)).scalars().all()
+
+    return sorted(month for month in map(partition_month, names) if month)
+
+
+# Creates the partitions of the current month and of the `months_ahead` after
+# it that don't exist yet, and returns their months. Every worker runs this
+# periodically (OINKBANK_PARTITION_CHECK_INTERVAL), so a posting never finds
+# its month missing; a worker skips the check while another one runs it.
+async def create_partitions(months_ahead: int) -> List[date]:
+    current = month_of(datetime.utcnow().date())
+    created = []
+
+    async with engine.begin() as conn:
+        locked = (
+            await conn.execute(select(func.pg_try_advisory_xact_lock(PARTITION_LOCK)))
+        ).scalar_one()
+        if not locked:
+            return created
+
+        await conn.execute(text(f"SET LOCAL lock_timeout = '{CREATE_LOCK_TIMEOUT}'"))
+        existing = set(await attached_partitions(conn))
+        for month in (add_months(current, i) for i in range(months_ahead + 1)):
+            if month in existing:
+                continue
+
+            await conn.execute(
+                text(
+                    f'CREATE TABLE {partition_name(month)} PARTITION OF "transaction" '
+                    f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+                )
+            )
+            created.append(month)
+
+    for month in created:
+        logger.info("Created partition %s", partition_name(month))
+
+    return created
+
+
+# Detaches the partitions of the months before `before`'s, and returns their
+# months. A detached partition is a plain table under the same name, to be
+# archived (pg_dump --table) and dropped, or attached again with ATTACH
+# PARTITION. Its transactions are gone from the listings and exports but stay
+# in the reports, the rollups already count them.
+#
+# Partitions are detached CONCURRENTLY, the table stays readable and writable.
+# One that was interrupted is left pending: finish it with ALTER TABLE
+# "transaction" DETACH PARTITION ... FINALIZE.
+async def detach_partitions(before: date) -> List[date]:
+    before = month_of(before)
+    if before > month_of(datetime.utcnow().date()):
+        raise ValueError("The current month and later ones can't be detached")
+
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+
+        months = [month for month in await attached_partitions(conn) if month < before]
+        for month in months:
+            await conn.execute(
+                text(
+                    'ALTER TABLE "transaction" '
+                    f"DETACH PARTITION {partition_name(month)} CONCURRENTLY"
+                )
+            )
+            logger.info("Detached partition %s", partition_name(month))
+
+    return months
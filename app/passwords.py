@@ -0,0 +1,77 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.config import settings
+
+
+pwd = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds
+)
+
+
+def _hash(secret: str) -> bytes:
+    return pwd.hash(secret).encode()
+
+
+def _verify(secret: str, password_hash: Optional[bytes]) -> bool:
+    if password_hash is None:
+        # simulate the time to verify a password when the user is not found
+        pwd.dummy_verify()
+        return False
+
+    return pwd.verify(secret, password_hash)
+
+
+# bcrypt is CPU bound (~250 ms at the default cost), running it on the event
+# loop stalls every other request on the worker. Hashes run in a process pool
+# instead, and once `workers + queue_size` operations are in flight new ones are
+# rejected with a 503 rather than queueing without bound.
+class PasswordHasher:
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.pending = 0
+        self.rejected = 0
+        self._executor = None
+
+    def start(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            # the first submit starts every worker, do it before the event loop
+            # opens any database connections the children would inherit
+            self._executor.submit(int)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.workers + self.queue_size:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, try again later",
+                headers={"Retry-After": "1"},
+            )
+
+        self.start()
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, secret: str) -> bytes:
+        return await self._run(_hash, secret)
+
+    async def verify(self, secret: str, password_hash: Optional[bytes]) -> bool:
+        return await self._run(_verify, secret, password_hash)
+
+
+passwords = PasswordHasher(settings.password_workers, settings.password_queue_size)
@@ -0,0 +1,60 @@
+import time
+import weakref
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+# Queue pool that also keeps checkout wait times and connection ages, so pools
+# can be sized per deployment from live numbers.
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._records = weakref.WeakSet()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            wait = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def _create_connection(self):
+        record = super()._create_connection()
+        self._records.add(record)
+        return record
+
+    def stats(self):
+        now = time.time()
+        ages = [
+            now - record.starttime
+            for record in list(self._records)
+            if record.dbapi_connection is not None
+        ]
+
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": self.wait_total / self.checkouts * 1000
+            if self.checkouts
+            else 0.0,
+            "wait_max_ms": self.wait_max * 1000,
+            "connections": len(ages),
+            "connection_age_avg_s": sum(ages) / len(ages) if ages else 0.0,
+            "connection_age_max_s": max(ages, default=0.0),
+        }
@@ -0,0 +1,340 @@
+import random
+from datetime import datetime
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, exists, func, lambda_stmt, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app import metrics
+from app.account_numbers import account_numbers, resolve_number
+from app.counters import BALANCE_TOTAL, SHARDS, bump, counter_upsert
+from app.dependencies import engine
+from app.models.account import Account
+from app.models.transaction import Transaction, TransactionCreate, TransactionType
+from app.rollups import rollup_row, rollup_upsert
+
+
+account = Account.__table__
+transaction = Transaction.__table__
+
+# A posting without a transfer is a single statement and PostgreSQL runs every
+# statement atomically, so it is sent without BEGIN/COMMIT: one round trip.
+autocommit_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+
+TRANSACTION_VALUES = [
+    "uuid",
+    "type",
+    "amount",
+    "status",
+    "details",
+    "created_at",
+    "balance_change",
+]
+
+
+def _update_balance(
+    name: str, uuid, delta, check_minimum=True, after=None, activity=True
+):
+    statement = (
+        update(account)
+        .where(account.c.uuid == uuid, account.c.deleted_at == None)
+        .values(balance=account.c.balance + delta, updated_at=func.now())
+        .returning(account.c.uuid, account.c.branch_uuid)
+    )
+    if activity:
+        # interest and fees are posted by the bank, not the account holder
+        statement = statement.values(last_activity_at=func.now())
+    if check_minimum:
+        # never let a posting take the balance under the account's minimum
+        statement = statement.where(
+            account.c.balance + delta >= account.c.minimum_balance
+        )
+    if after is not None:
+        # only applied when the `after` update went through
+        statement = statement.where(exists(select(after.c.uuid)))
+
+    return statement.cte(name)
+
+
+# The transaction row for the `posted` account update, inserted in the same
+# statement as its rollup and (with `delta`) balance counter changes. Returns
+# the new transaction, or no row when `posted` matched nothing.
+def _posting_statement(posted, delta=None):
+    row = select(
+        *[
+            bindparam(f"p_{key}", type_=transaction.c[key].type)
+            for key in TRANSACTION_VALUES
+        ],
+        bindparam("p_created_at", type_=transaction.c.updated_at.type),
+        posted.c.uuid,
+    )
+    inserted = (
+        insert(transaction)
+        .from_select([*TRANSACTION_VALUES, "updated_at", "account_uuid"], row)
+        .returning(*transaction.c)
+        .cte("inserted")
+    )
+
+    rollup = rollup_row(
+        bindparam("p_day"),
+        posted.c.branch_uuid,
+        bindparam("p_type"),
+        1,
+        bindparam("p_amount"),
+    )
+    statement = select(inserted).add_cte(rollup_upsert(rollup).cte("rollup"))
+    if delta is not None:
+        counter = counter_upsert(
+            BALANCE_TOTAL, delta, source=posted, shard=bindparam("p_shard")
+        )
+        statement = statement.add_cte(counter.cte("counter"))
+
+    return statement
+
+
+# The statements are built once, a posting only binds its values.
+_balance_posting = _posting_statement(
+    _update_balance("posted", bindparam("p_account_uuid"), bindparam("p_delta")),
+    delta=bindparam("p_delta"),
+)
+_plain_posting = _posting_statement(
+    _update_balance(
+        "posted",
+        bindparam("p_account_uuid"),
+        0,
+        check_minimum=False,
+        activity=False,
+    )
+)
+_debited = _update_balance(
+    "posted", bindparam("p_account_uuid"), -bindparam("p_amount")
+)
+# the destination is credited whatever its minimum balance
+_credited = _update_balance(
+    "credited",
+    bindparam("p_destination_uuid"),
+    bindparam("p_amount"),
+    check_minimum=False,
+    after=_debited,
+)
+_credit = select(
+    literal(TransactionType.TRANSFER_IN, transaction.c.type.type),
+    bindparam("p_amount"),
+    bindparam("p_status", type_=transaction.c.status.type),
+    bindparam("p_credit_details", type_=transaction.c.details.type),
+    bindparam("p_created_at", type_=transaction.c.created_at.type),
+    bindparam("p_created_at", type_=transaction.c.updated_at.type),
+    bindparam("p_amount", type_=transaction.c.balance_change.type),
+    _credited.c.uuid,
+)
+_transfer_posting = (
+    _posting_statement(_debited)
+    .add_cte(_credited)
+    # the destination's side of the transfer, in its own history and rollup
+    .add_cte(
+        insert(transaction)
+        .from_select(
+            [
+                "type",
+                "amount",
+                "status",
+                "details",
+                "created_at",
+                "updated_at",
+                "balance_change",
+                "account_uuid",
+            ],
+            _credit,
+            # its uuid is the server's default
+            include_defaults=False,
+        )
+        .cte("credit")
+    )
+    .add_cte(
+        rollup_upsert(
+            rollup_row(
+                bindparam("p_day"),
+                _credited.c.branch_uuid,
+                TransactionType.TRANSFER_IN,
+                1,
+                bindparam("p_amount"),
+            )
+        ).cte("credit_rollup")
+    )
+)
+
+
+# SQLAlchemy 1.4 derives no cache key from PostgreSQL's insert(), as they are
+# these statements would be compiled again for every posting. A lambda
+# statement is keyed on its code instead, each is compiled once per process.
+balance_posting = lambda_stmt(lambda: _balance_posting)
+plain_posting = lambda_stmt(lambda: _plain_posting)
+transfer_posting = lambda_stmt(lambda: _transfer_posting)
+
+
+def _parameters(account_uuid: UUID, create: TransactionCreate, **extra) -> dict:
+    now = datetime.utcnow()
+
+    parameters = {
+        "account_uuid": account_uuid,
+        "uuid": uuid4(),
+        "type": create.type,
+        "amount": create.amount,
+        "status": create.status,
+        "details": create.details,
+        "created_at": now,
+        "day": now.date(),
+        "shard": random.randrange(SHARDS),
+        **extra,
+    }
+
+    # bind parameters can't share a name with the columns they are written to
+    return {f"p_{key}": value for key, value in parameters.items()}
+
+
+# SQLAlchemy also maps the RETURNING columns of the CTEs into the result, so the
+# row is read by position, names taken from the cursor
+async def _fetch_posted(conn, statement, parameters):
+    result = await conn.execute(statement, parameters)
+    row = result.one_or_none()
+
+    return dict(zip(result.keys(), row)) if row else None
+
+
+async def _account_exists(conn, account_uuid: UUID) -> bool:
+    statement = select(account.c.uuid).where(
+        account.c.uuid == account_uuid, account.c.deleted_at == None
+    )
+
+    return (await conn.execute(statement)).one_or_none() is not None
+
+
+def _not_found():
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found"
+    )
+
+
+def _bad_request(detail: str):
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def _conflict(detail: str):
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+
+async def post(account_uuid: UUID, create: TransactionCreate) -> dict:
+    try:
+        posted_transaction = await _post(account_uuid, create)
+    except HTTPException as e:
+        metrics.posting(create.type, metrics.rejection(e.detail))
+        raise
+
+    metrics.posting(create.type, metrics.POSTED)
+    return posted_transaction
+
+
+async def _post(account_uuid: UUID, create: TransactionCreate) -> dict:
+    if create.type == TransactionType.TRANSFER:
+        return await _transfer(account_uuid, create)
+    if create.type == TransactionType.TRANSFER_IN:
+        raise _bad_request("Incoming transfers are posted by their transfer")
+
+    delta = {
+        TransactionType.DEPOSIT: create.amount,
+        TransactionType.WITHDRAWAL: -create.amount,
+    }.get(create.type)
+    statement = plain_posting if delta is None else balance_posting
+
+    async with autocommit_engine.connect() as conn:
+        parameters = _parameters(
+            account_uuid, create, delta=delta, balance_change=delta or 0
+        )
+        posted_transaction = await _fetch_posted(conn, statement, parameters)
+        if posted_transaction:
+            return posted_transaction
+
+        # rejected, find out why with a second look only on this path
+        if not await _account_exists(conn, account_uuid):
+            raise _not_found()
+        if create.type == TransactionType.DEPOSIT:
+            raise _bad_request("Balance too low")
+        raise _bad_request("Insufficient funds")
+
+
+# Locks the live accounts among `uuids` in uuid order, returns uuid -> number
+async def _lock_accounts(conn, *uuids) -> dict:
+    statement = (
+        select(account.c.uuid, account.c.number)
+        .where(account.c.uuid.in_(uuids), account.c.deleted_at == None)
+        .order_by(account.c.uuid)
+        .with_for_update()
+    )
+
+    return {row.uuid: row.number for row in await conn.execute(statement)}
+
+
+# Both accounts are locked in uuid order before either balance changes, two
+# opposite transfers between the same accounts queue up instead of deadlocking.
+# Money only moves between accounts, the balance total is unchanged.
+async def _transfer(account_uuid: UUID, create: TransactionCreate) -> dict:
+    number = create.transfer.account_number
+    create = create.copy(update={"details": f"Transfer to {number}"})
+
+    async with engine.begin() as conn:
+        destination_uuid = await resolve_number(conn, number)
+        accounts = await _lock_accounts(conn, account_uuid, destination_uuid)
+        if destination_uuid is not None and destination_uuid not in accounts:
+            # cached before the account was deleted by another worker
+            account_numbers.invalidate(number)
+            destination_uuid = await resolve_number(conn, number)
+            accounts = await _lock_accounts(conn, account_uuid, destination_uuid)
+
+        if account_uuid not in accounts:
+            raise _not_found()
+        if destination_uuid is None:
+            raise _bad_request("Transfer destination not found")
+        if destination_uuid == account_uuid:
+            raise _bad_request("Cannot transfer to the same account")
+
+        parameters = _parameters(
+            account_uuid,
+            create,
+            destination_uuid=destination_uuid,
+            balance_change=-create.amount,
+            credit_details=f"Transfer from {accounts[account_uuid]}",
+        )
+        posted_transaction = await _fetch_posted(conn, transfer_posting, parameters)
+        if not posted_transaction:
+            raise _bad_request("Insufficient funds")
+
+        return posted_transaction
+
+
+# Gives the balance change of a transaction being deleted back to its account,
+# in the deletion's transaction. Taking a deposit back can't go under the
+# account's minimum. Either leg of a transfer is refused: reversing it alone
+# would make or destroy the money it moved.
+async def reverse(session, transaction: Transaction):
+    if transaction.type in (TransactionType.TRANSFER, TransactionType.TRANSFER_IN):
+        raise _conflict("Transfers cannot be deleted")
+
+    delta = -transaction.balance_change
+    statement = (
+        update(account)
+        .where(account.c.uuid == transaction.account_uuid)
+        .values(balance=account.c.balance + delta, updated_at=func.now())
+        .returning(account.c.deleted_at)
+    )
+    if delta < 0:
+        statement = statement.where(
+            account.c.balance + delta >= account.c.minimum_balance
+        )
+
+    reversed_account = (await session.execute(statement)).one_or_none()
+    if reversed_account is None:
+        raise _bad_request("Insufficient funds")
+    # the balance total only counts live accounts
+    if reversed_account.deleted_at is None:
+        await bump(session, BALANCE_TOTAL, delta)
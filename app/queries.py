@@ -0,0 +1,114 @@
+from sqlalchemy import event, lambda_stmt, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.default import CACHE_HIT
+from sqlalchemy.util import immutabledict
+
+from app.fast_read import RowLayout
+from app.loaders import loader_options
+from app.models.account import Account, AccountRead
+from app.models.transaction import Transaction, TransactionRead
+from app.models.user import User, UserRead
+
+
+# every hot query registers itself here so compiled cache hit ratios can be
+# reported in one place
+hot_queries = {}
+
+
+# A statement that runs on (almost) every request. `build` returns it as a
+# lambda statement: SQLAlchemy runs the lambda and derives the cache key from
+# its code once per process, later calls only read the closure's values into
+# bound parameters instead of building select(...).where(...) and walking it
+# for a cache key again. Executed with the query's execution options, every
+# statement is counted as a hit or a miss of the compiled statement cache.
+class HotQuery:
+    def __init__(self, name: str, build):
+        self.name = name
+        self.build = build
+        self.execution_options = immutabledict({"hot_query": name})
+        self.executions = 0
+        self.cache_hits = 0
+
+        hot_queries[name] = self
+
+    def __call__(self, *args):
+        return self.build(*args)
+
+    async def execute(self, executor, *args):
+        return await executor.execute(
+            self.build(*args), execution_options=self.execution_options
+        )
+
+    def stats(self):
+        misses = self.executions - self.cache_hits
+
+        return {
+            "name": self.name,
+            "executions": self.executions,
+            "cache_hits": self.cache_hits,
+            "cache_misses": misses,
+            "hit_ratio": self.cache_hits / self.executions if self.executions else 0.0,
+        }
+
+
+def hot_query(name: str):
+    def register(build) -> HotQuery:
+        return HotQuery(name, build)
+
+    return register
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_execution(conn, cursor, statement, parameters, context, executemany):
+    query = hot_queries.get(context.execution_options.get("hot_query"))
+    if query is not None:
+        query.executions += 1
+        if context.cache_hit is CACHE_HIT:
+            query.cache_hits += 1
+
+
+_user_options = loader_options(User, UserRead)
+_account_options = loader_options(Account, AccountRead)
+_account = Account.__table__
+
+transaction_rows = RowLayout(Transaction, TransactionRead)
+_transaction_rows = transaction_rows.select()
+
+
+# the principal of a token, and the user logging in
+@hot_query("user_by_username")
+def user_by_username(username: str):
+    return lambda_stmt(
+        lambda: select(User)
+        .where(User.username == username, User.deleted_at == None)
+        .options(*_user_options)
+    )
+
+
+@hot_query("account_by_uuid")
+def account_by_uuid(uuid):
+    return lambda_stmt(
+        lambda: select(Account)
+        .where(Account.uuid == uuid, Account.deleted_at == None)
+        .options(*_account_options)
+        .execution_options(populate_existing=True)
+    )
+
+
+@hot_query("account_by_number")
+def account_by_number(number: str):
+    return lambda_stmt(
+        lambda: select(_account.c.uuid).where(
+            _account.c.number == number, _account.c.deleted_at == None
+        )
+    )
+
+
+# rows of transaction_rows, paginate() adds the page
+@hot_query("transactions_by_account")
+def transactions_by_account(account_uuid):
+    return lambda_stmt(
+        lambda: _transaction_rows.where(
+            Transaction.account_uuid == account_uuid, Transaction.deleted_at == None
+        )
+    )
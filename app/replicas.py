@@ -0,0 +1,122 @@
+import asyncio
+import itertools
+import logging
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+logger = logging.getLogger(__name__)
+
+# The primary's WAL position, read before its replicas are checked; asyncpg
+# gives and takes a pg_lsn as an int
+PRIMARY_LSN_STATEMENT = text("SELECT pg_current_wal_lsn()")
+
+# Seconds the replica's replayed WAL is behind the primary. A replica that has
+# replayed up to where the primary was just before is in sync even when nothing
+# was written for a while; one that lost its connection stops replaying while
+# the primary moves on, and falls behind. A server that isn't in recovery is a
+# primary and never behind.
+LAG_STATEMENT = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_replay_lsn() >= CAST(:primary_lsn AS pg_lsn) THEN 0
+        ELSE coalesce(
+            extract(epoch FROM now() - pg_last_xact_replay_timestamp()),
+            'Infinity'
+        )
+    END
+    """
+)
+
+
+class Replica:
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        # None until the first check, and while the replica can't be reached
+        self.lag: Optional[float] = None
+
+
+# Read-only work goes round robin to the replicas at most `max_lag` seconds
+# behind the primary, and to the primary when none is (or none is configured).
+# Replica lag is only known after check(), which every worker runs
+# periodically; until then reads stay on the primary.
+class ReplicaSet:
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        engines: List[AsyncEngine],
+        max_lag: float,
+        check_timeout: float,
+    ):
+        self.primary = primary
+        self.replicas = [
+            Replica(f"replica-{i}", engine) for i, engine in enumerate(engines)
+        ]
+        self.max_lag = max_lag
+        self.check_timeout = check_timeout
+        self._in_sync = []
+        self._turn = itertools.count()
+
+    async def _primary_lsn(self) -> int:
+        async with self.primary.connect() as conn:
+            return (await conn.execute(PRIMARY_LSN_STATEMENT)).scalar_one()
+
+    async def _lag(self, replica: Replica, primary_lsn: int) -> float:
+        async with replica.engine.connect() as conn:
+            lag = await conn.execute(LAG_STATEMENT, {"primary_lsn": primary_lsn})
+            return float(lag.scalar_one())
+
+    async def check(self):
+        if not self.replicas:
+            return
+
+        try:
+            primary_lsn = await asyncio.wait_for(
+                self._primary_lsn(), self.check_timeout
+            )
+        except Exception as e:
+            logger.warning("WAL position check of the primary failed: %r", e)
+            primary_lsn = None
+
+        for replica in self.replicas:
+            # with nothing to compare with, no replica counts as in sync
+            if primary_lsn is None:
+                replica.lag = None
+                continue
+            try:
+                replica.lag = await asyncio.wait_for(
+                    self._lag(replica, primary_lsn), self.check_timeout
+                )
+            except Exception as e:
+                logger.warning("Lag check of %s failed: %r", replica.name, e)
+                replica.lag = None
+
+        self._in_sync = [
+            replica.engine
+            for replica in self.replicas
+            if replica.lag is not None and replica.lag <= self.max_lag
+        ]
+
+    def pick(self) -> AsyncEngine:
+        if not self._in_sync:
+            return self.primary
+
+        return self._in_sync[next(self._turn) % len(self._in_sync)]
+
+    def status(self):
+        return [
+            {
+                "name": replica.name,
+                "lag_s": replica.lag,
+                "in_sync": replica.engine in self._in_sync,
+            }
+            for replica in self.replicas
+        ]
+
+    async def dispose(self):
+        for replica in self.replicas:
+            await replica.engine.dispose()
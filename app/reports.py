@@ -0,0 +1,133 @@
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import Date, Integer, cast, func, literal_column
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import counters
+from app.models.account import Account
+from app.models.report import (
+    AccountsUsers,
+    AccountsUsersParams,
+    ReportName,
+    Transactions,
+    TransactionsParams,
+    TransactionsPeriod,
+    TransactionTotals,
+)
+from app.models.rollup import TransactionRollup
+from app.models.transaction import TransactionType
+from app.models.user import User, UserRole
+
+
+async def accounts_users(
+    session: AsyncSession, params: AccountsUsersParams
+) -> AccountsUsers:
+    if not params.start_date and not params.end_date:
+        return AccountsUsers(
+            **await counters.read_counters(
+                session, counters.ACCOUNTS_COUNT, counters.USERS_COUNT
+            )
+        )
+
+    accounts_stmt = select(func.count(Account.uuid).label("account_count")).where(
+        Account.deleted_at == None
+    )
+    users_stmt = select(func.count(User.uuid).label("users_count")).where(
+        User.role <= UserRole.CONSUMER, User.deleted_at == None
+    )
+
+    if params.start_date:
+        start = datetime.combine(params.start_date, time(0, 0, 0))
+        accounts_stmt = accounts_stmt.where(Account.created_at >= start)
+        users_stmt = users_stmt.where(User.created_at >= start)
+    if params.end_date:
+        end = datetime.combine(params.end_date, time(0, 0, 0))
+        accounts_stmt = accounts_stmt.where(Account.created_at <= end)
+        users_stmt = users_stmt.where(User.created_at <= end)
+
+    return AccountsUsers(
+        accounts_count=(await session.exec(accounts_stmt)).one(),
+        users_count=(await session.exec(users_stmt)).one(),
+    )
+
+
+def _add_totals(totals: TransactionTotals, type: int, count: int, total: float):
+    prefix = "deposits" if type == TransactionType.DEPOSIT else "withdrawals"
+    setattr(totals, f"{prefix}_count", getattr(totals, f"{prefix}_count") + count)
+    setattr(totals, f"{prefix}_total", getattr(totals, f"{prefix}_total") + total)
+
+
+async def transactions(
+    session: AsyncSession, params: TransactionsParams
+) -> Transactions:
+    # read from the daily rollup, both dates are inclusive
+    group_by = [TransactionRollup.type]
+    if params.interval:
+        # inlined rather than bound, GROUP BY must repeat the exact expression
+        unit = literal_column(f"'{params.interval.value}'")
+        period = func.date_trunc(unit, TransactionRollup.day)
+        group_by.insert(0, cast(period, Date).label("period"))
+
+    statement = (
+        select(
+            *group_by,
+            func.sum(TransactionRollup.count),
+            func.sum(TransactionRollup.total),
+        )
+        .where(
+            TransactionRollup.type.in_(
+                [TransactionType.DEPOSIT, TransactionType.WITHDRAWAL]
+            )
+        )
+        .group_by(*group_by)
+        .order_by(*group_by)
+    )
+    if params.start_date:
+        statement = statement.where(TransactionRollup.day >= params.start_date)
+    if params.end_date:
+        statement = statement.where(TransactionRollup.day <= params.end_date)
+    if params.branch_uuid:
+        statement = statement.where(TransactionRollup.branch_uuid == params.branch_uuid)
+
+    result = Transactions(series=[] if params.interval else None)
+    for row in (await session.exec(statement)).all():
+        if params.interval:
+            period, type, count, total = row
+            if not result.series or result.series[-1].period != period:
+                result.series.append(TransactionsPeriod(period=period))
+            _add_totals(result.series[-1], type, count, total)
+        else:
+            type, count, total = row
+
+        _add_totals(result, type, count, total)
+
+    return result
+
+
+# Live accounts without a customer posting in the last `days` days, with the
+# number of whole days since their last one
+def inactive_accounts(days: int):
+    days_inactive = cast(
+        func.date_part("day", func.now() - Account.last_activity_at), Integer
+    )
+
+    return select(
+        Account.uuid,
+        Account.number,
+        Account.user_uuid,
+        Account.branch_uuid,
+        Account.balance,
+        Account.last_activity_at,
+        days_inactive.label("days_inactive"),
+    ).where(
+        Account.last_activity_at < func.now() - timedelta(days=days),
+        Account.deleted_at == None,
+    )
+
+
+# Reports that can run as background jobs: parameters model and computation
+REPORTS = {
+    ReportName.ACCOUNTS_USERS: (AccountsUsersParams, accounts_users),
+    ReportName.TRANSACTIONS: (TransactionsParams, transactions),
+}
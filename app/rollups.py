@@ -0,0 +1,91 @@
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import func, literal, select, text
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.account import Account
+from app.models.rollup import TransactionRollup
+from app.models.transaction import Transaction, TransactionType
+
+
+# `rows` selects (day, branch_uuid, type, count, total), each row is added to
+# the matching rollup row
+def rollup_upsert(rows):
+    statement = insert(TransactionRollup).from_select(
+        ["day", "branch_uuid", "type", "count", "total"], rows
+    )
+
+    return statement.on_conflict_do_update(
+        index_elements=["day", "branch_uuid", "type"],
+        set_={
+            "count": TransactionRollup.count + statement.excluded.count,
+            "total": TransactionRollup.total + statement.excluded.total,
+        },
+    )
+
+
+# One rollup row. Arguments may also be SQL expressions, such as a column of the
+# statement the rollup is attached to or a bind parameter (see app.posting).
+def rollup_row(day: date, branch_uuid: UUID, type: TransactionType, count, total):
+    columns = TransactionRollup.__table__.c
+    values = zip(
+        [columns.day, columns.branch_uuid, columns.type, columns.count, columns.total],
+        [day, branch_uuid, type, count, total],
+    )
+
+    return select(
+        *[
+            value if isinstance(value, ColumnElement) else literal(value, column.type)
+            for column, value in values
+        ]
+    )
+
+
+# Must run in the same database transaction as the insert (sign=1) or the
+# soft-delete (sign=-1) of `transaction`, so the rollup never drifts from it.
+async def record_transaction(
+    session: AsyncSession, transaction: Transaction, branch_uuid: UUID, sign: int = 1
+):
+    rows = rollup_row(
+        transaction.created_at.date(),
+        branch_uuid,
+        transaction.type,
+        sign,
+        sign * transaction.amount,
+    )
+    await session.exec(rollup_upsert(rows))
+
+
+# Rebuilds the rollup from the transaction table. Postings are blocked for the
+# duration so nothing is counted twice or missed. Days before the oldest
+# transaction are kept, they were counted from partitions detached since
+# (app.partitions).
+async def rebuild(session: AsyncSession):
+    await session.exec(text('LOCK TABLE "transaction" IN SHARE MODE'))
+    oldest = (await session.execute(select(func.min(Transaction.created_at)))).scalar()
+    if oldest is None:
+        return
+
+    await session.exec(
+        TransactionRollup.__table__.delete().where(
+            TransactionRollup.day >= oldest.date()
+        )
+    )
+
+    day = func.date(Transaction.created_at)
+    rows = (
+        select(
+            day,
+            Account.branch_uuid,
+            Transaction.type,
+            func.count(),
+            func.sum(Transaction.amount),
+        )
+        .join(Account, Account.uuid == Transaction.account_uuid)
+        .where(Transaction.deleted_at == None)
+        .group_by(day, Account.branch_uuid, Transaction.type)
+    )
+    await session.exec(rollup_upsert(rows))
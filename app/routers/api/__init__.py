@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from . import reports, users, branches, accounts, transactions, areas, token
+from . import admin, bulk, exports, report_jobs, reports, users, branches, accounts, transactions, areas, token
 
 api = APIRouter()
 
@@ -7,9 +7,13 @@ api.include_router(users.router, prefix="/users", tags=["users"])
 api.include_router(branches.router, prefix="/branches", tags=["branches"])
 api.include_router(accounts.router, prefix="/accounts", tags=["accounts"])
 api.include_router(transactions.router, prefix="/accounts/{account_uuid}/transactions", tags=["transactions"])
+api.include_router(bulk.router, prefix="/transactions", tags=["transactions"])
+api.include_router(report_jobs.router, prefix="/reports/jobs", tags=["reports"])
 api.include_router(reports.router, prefix="/reports", tags=["branches", "reports"])
+api.include_router(exports.router, prefix="/exports", tags=["exports"])
 
 api.include_router(areas.router, prefix="/areas", tags=["areas"])
+api.include_router(admin.router, prefix="/admin", tags=["admin"])
 
 # Authentication endpoint
 api.include_router(token.router, prefix="/token")
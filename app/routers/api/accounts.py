@@ -1,113 +1,201 @@
-from fastapi import APIRouter, Depends, status
+from datetime import date, datetime
+from fastapi import APIRouter, Depends, Query, status
 from fastapi.exceptions import HTTPException
-from fastapi.param_functions import Depends
-from sqlmodel import Session, select
-from typing import List
+from sqlalchemy import func, update as update_statement
+from sqlalchemy.exc import IntegrityError
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Optional
 from uuid import UUID
 
-from app.dependencies import db_session, engine, authenticate_user
-from app.models.account import Account, AccountCreate, AccountRead, AccountUpdate
+from app import counters, statements
+from app.config import settings
+from app.account_numbers import account_numbers, resolve_number
+from app.dependencies import db_session, authenticate_user, read_session
+from app.fast_read import RowLayout, json_response
+from app.pagination import PageParams, paginate
+from app.queries import account_by_uuid
+from app.models.account import (
+    Account,
+    AccountCreate,
+    AccountNumberRead,
+    AccountRead,
+    AccountUpdate,
+)
+from app.models.page import Page
+from app.models.statement import Statement
 from app.models.user import User, UserRole
 
 
 router = APIRouter()
 
+account_rows = RowLayout(Account, AccountRead)
+
+
+async def get_account(session: AsyncSession, uuid: UUID):
+    result = await account_by_uuid.execute(session, uuid)
+    account = result.scalars().one_or_none()
+    if not account:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found"
+        )
+
+    return account
+
 
 @router.post("", response_model=AccountRead)
-def create(
+async def create(
     create: AccountCreate,
     current_user: User = Depends(authenticate_user),
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(db_session),
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
     account = Account.from_orm(create)
+    account.opening_balance = account.balance
 
     session.add(account)
-    session.commit()
-    session.refresh(account)
+    await counters.bump(session, counters.ACCOUNTS_COUNT, 1)
+    await counters.bump(session, counters.BALANCE_TOTAL, account.balance)
+    try:
+        await session.commit()
+    except IntegrityError as e:
+        if "ux_account_number" not in str(e.orig):
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Account number already in use",
+        )
+    account_numbers.invalidate(account.number)
 
-    return account
+    return await get_account(session, account.uuid)
 
 
-@router.get("", response_model=List[AccountRead])
-def index(
+@router.get("", response_model=Page[AccountRead])
+async def index(
+    page: PageParams = Depends(),
     current_user: User = Depends(authenticate_user),
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(read_session),
 ):
-    statement = select(Account).where(Account.deleted_at == None)
+    statement = account_rows.select().where(Account.deleted_at == None)
+    rows = await paginate(session, statement, Account, page)
 
-    return session.exec(statement).all()
+    return json_response(account_rows.read_page(rows))
+
+
+# Lets a client check a transfer destination before posting, without exposing
+# anything but the account's uuid
+@router.get("/by-number/{number}", response_model=AccountNumberRead)
+async def read_by_number(
+    number: str,
+    current_user: User = Depends(authenticate_user),
+    session: AsyncSession = Depends(db_session),
+):
+    uuid = await resolve_number(session, number)
+    if uuid is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found"
+        )
+
+    return AccountNumberRead(number=number, uuid=uuid)
 
 
 @router.get("/{uuid}", response_model=AccountRead)
-def read(
+async def read(
     uuid: UUID,
     current_user: User = Depends(authenticate_user),
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(db_session),
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-    statement = select(Account).where(Account.uuid == uuid, Account.deleted_at == None)
-    account = session.exec(statement).one_or_none()
-    if not account:
+    return await get_account(session, uuid)
+
+
+# `to` defaults to today
+@router.get("/{uuid}/statement", response_model=Statement)
+async def statement(
+    uuid: UUID,
+    start_date: date = Query(..., alias="from"),
+    end_date: Optional[date] = Query(None, alias="to"),
+    current_user: User = Depends(authenticate_user),
+    session: AsyncSession = Depends(db_session),
+):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    end_date = end_date or datetime.utcnow().date()
+    if end_date < start_date:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found"
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid date range"
+        )
+    if (end_date - start_date).days >= settings.statement_max_days:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A statement covers at most {settings.statement_max_days} days",
         )
 
-    return account
+    account = await get_account(session, uuid)
+    if account.statements_from and start_date < account.statements_from:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Statements of this account start on {account.statements_from}",
+        )
+
+    return json_response(
+        await statements.statement(session, account, start_date, end_date)
+    )
 
 
 @router.patch("/{uuid}", response_model=AccountRead)
-def update(
+async def update(
     uuid: UUID,
     update: AccountUpdate,
     current_user: User = Depends(authenticate_user),
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(db_session),
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-    statement = select(Account).where(Account.uuid == uuid, Account.deleted_at == None)
-    account = session.exec(statement).one_or_none()
-    if not account:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found"
-        )
+    account = await get_account(session, uuid)
 
     account_data = update.dict(exclude_unset=True)
     for key, value in account_data.items():
         setattr(account, key, value)
-    account.updated_at = "now()"
+    account.updated_at = func.now()
 
     session.add(account)
-    session.commit()
-    session.refresh(account)
+    await session.commit()
 
-    return account
+    return await get_account(session, uuid)
 
 
 @router.delete("/{uuid}")
-def delete(
+async def delete(
     uuid: UUID,
     current_user: User = Depends(authenticate_user),
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(db_session),
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-    statement = select(Account).where(Account.uuid == uuid, Account.deleted_at == None)
-    account = session.exec(statement).one_or_none()
+    # The balance taken off the total is the one the deletion locked: a posting
+    # committed first is in it, one after finds the account gone
+    statement = (
+        update_statement(Account)
+        .where(Account.uuid == uuid, Account.deleted_at == None)
+        .values(deleted_at=func.now())
+        .returning(Account.balance, Account.number)
+    )
+    account = (await session.execute(statement)).one_or_none()
     if not account:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found"
         )
 
-    account.deleted_at = "now()"  # let the SQL server do the time calculation
-
-    session.add(account)
-    session.commit()
+    await counters.bump(session, counters.ACCOUNTS_COUNT, -1)
+    await counters.bump(session, counters.BALANCE_TOTAL, -account.balance)
+    await session.commit()
+    account_numbers.invalidate(account.number)
 
     return None, status.HTTP_204_NO_CONTENT
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.exceptions import HTTPException
+from typing import List
+
+from app.cache import caches
+from app.dependencies import engine, authenticate_user, replicas
+from app.models.admin import CacheStatus, PoolStatus, QueryStatus, ReplicaStatus
+from app.models.user import User, UserRole
+from app.queries import hot_queries
+
+
+router = APIRouter()
+
+
+@router.get("/pool", response_model=List[PoolStatus])
+async def pool(current_user: User = Depends(authenticate_user)):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    return [PoolStatus(name="primary", **engine.pool.stats())] + [
+        PoolStatus(name=replica.name, **replica.engine.pool.stats())
+        for replica in replicas.replicas
+    ]
+
+
+@router.get("/replicas", response_model=List[ReplicaStatus])
+async def replica_status(current_user: User = Depends(authenticate_user)):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    return [ReplicaStatus(**replica) for replica in replicas.status()]
+
+
+@router.get("/caches", response_model=List[CacheStatus])
+async def cache_stats(current_user: User = Depends(authenticate_user)):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    return [CacheStatus(**cache.stats()) for cache in caches.values()]
+
+
+# compiled statement cache hits of the hot queries since the worker started
+@router.get("/queries", response_model=List[QueryStatus])
+async def query_stats(current_user: User = Depends(authenticate_user)):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    return [QueryStatus(**query.stats()) for query in hot_queries.values()]
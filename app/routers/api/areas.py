@@ -1,37 +1,29 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from fastapi.exceptions import HTTPException
-from sqlmodel import Session, select
-from app.dependencies import engine
+from app.area_index import area_index
+from app.http import cached_response
 from app.models.area import Area
 from typing import List
 from uuid import UUID
 
 router = APIRouter()
 
+# clients revalidate after a while, a 304 costs a dict lookup
+CACHE_CONTROL = "public, max-age=300"
+
 
 @router.get("", response_model=List[Area])
-def index(parent_uuid: UUID = None):
-    with Session(engine) as session:
-        statement = (
-            select(Area)
-            .where(Area.parent_uuid == parent_uuid, Area.deleted_at == None)
-            .order_by(Area.name)
-        )
-        result = session.exec(statement).all()
+async def index(request: Request, parent_uuid: UUID = None):
+    body, etag = area_index.current.render(("children", parent_uuid))
 
-        return result
+    return cached_response(request, body, etag, CACHE_CONTROL)
 
 
 @router.get("/{uuid}", response_model=Area)
-def read(uuid: UUID):
-    with Session(engine) as session:
-        statement = (
-            select(Area)
-            .where(Area.parent_uuid == uuid, Area.deleted_at == None)
-            .order_by(Area.name)
-        )
-        area = session.exec(statement).one_or_none()
-        if not area:
-            raise HTTPException(status_code=404, detail="Resource not found")
-
-        return area
+async def read(uuid: UUID, request: Request):
+    rendered = area_index.current.render(("area", uuid))
+    if not rendered:
+        raise HTTPException(status_code=404, detail="Resource not found")
+
+    body, etag = rendered
+    return cached_response(request, body, etag, CACHE_CONTROL)
@@ -1,24 +1,51 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
 from fastapi.exceptions import HTTPException
-from sqlmodel import Session, select
-from typing import List
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
 
-from app.dependencies import db_session, engine, authenticate_user
+from app import branch_cache
+from app.dependencies import db_session, authenticate_user, read_session
+from app.http import cached_response
+from app.loaders import loader_options
+from app.pagination import PageParams, paginate
+from app.versions import bump_version
 
 from app.models.branch import Branch, BranchCreate, BranchRead, BranchUpdate
 from app.models.address import Address
+from app.models.page import Page
 from app.models.user import User, UserRole
 
 
 router = APIRouter()
 
+# the branch locator is public, CDNs and clients may keep a response for a
+# minute and revalidate it with If-None-Match after that
+CACHE_CONTROL = "public, max-age=60"
+
+
+async def get_branch(session: AsyncSession, uuid: UUID):
+    statement = (
+        select(Branch)
+        .where(Branch.uuid == uuid, Branch.deleted_at == None)
+        .options(*loader_options(Branch, BranchRead))
+        .execution_options(populate_existing=True)
+    )
+    branch = (await session.exec(statement)).one_or_none()
+    if not branch:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found"
+        )
+
+    return branch
+
 
 @router.post("", response_model=BranchRead)
-def create(
+async def create(
     create: BranchCreate,
     current_user: User = Depends(authenticate_user),
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(db_session),
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
@@ -29,55 +56,62 @@ def create(
     branch.address = Address(**create.address.dict())
 
     session.add(branch)
-    session.commit()
-    session.refresh(branch)
+    await bump_version(session, branch_cache.VERSION_NAME)
+    await session.commit()
 
-    return branch
+    return await get_branch(session, branch.uuid)
+
+
+@router.get("", response_model=Page[BranchRead])
+async def index(
+    request: Request,
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(read_session),
+):
+    async def load():
+        statement = (
+            select(Branch)
+            .where(Branch.deleted_at == None)
+            .options(*loader_options(Branch, BranchRead))
+        )
 
+        return Page[BranchRead].parse_obj(
+            await paginate(session, statement, Branch, page)
+        )
 
-@router.get("", response_model=List[BranchRead])
-def index(session: Session = Depends(db_session)):
-    statement = select(Branch).where(Branch.deleted_at == None)
+    versions = await branch_cache.current_versions(session)
+    body, etag = await branch_cache.cached(
+        versions, ("index", page.cursor, page.limit), load
+    )
 
-    return session.exec(statement).all()
+    return cached_response(request, body, etag, CACHE_CONTROL)
 
 
 @router.get("/{uuid}", response_model=BranchRead)
-def read(uuid: UUID, session: Session = Depends(db_session)):
-    statement = (
-        select(Branch, Address)
-        .join(Address)
-        .where(Branch.uuid == uuid, Branch.deleted_at == None)
-    )
-    branch, address = session.exec(statement).one_or_none()
-    if not branch:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Resourse not found"
-        )
+async def read(
+    uuid: UUID, request: Request, session: AsyncSession = Depends(read_session)
+):
+    async def load():
+        return BranchRead.from_orm(await get_branch(session, uuid))
 
-    return BranchRead(**branch.dict(), address=address)
+    versions = await branch_cache.current_versions(session)
+    body, etag = await branch_cache.cached(versions, ("branch", uuid), load)
+
+    return cached_response(request, body, etag, CACHE_CONTROL)
 
 
 @router.patch("/{uuid}", response_model=BranchRead)
-def update(
+async def update(
     uuid: UUID,
     branch_update: BranchUpdate,
     current_user: User = Depends(authenticate_user),
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(db_session),
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-    statement = (
-        select(Branch, Address)
-        .join(Address)
-        .where(Branch.uuid == uuid, Branch.deleted_at == None)
-    )
-    branch, address = session.exec(statement).one_or_none()
-    if not branch:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found"
-        )
+    branch = await get_branch(session, uuid)
+    address = branch.address
 
     branch_data = branch_update.dict(exclude_unset=True)
     for key, value in branch_data.items():
@@ -86,30 +120,27 @@ def update(
             for k, v in address_data.items():
                 setattr(address, k, v)
 
-            address.updated_at = "now()"
-
+            address.updated_at = func.now()
             session.add(address)
-            session.commit()
-            session.refresh(address)
 
             continue
 
         setattr(branch, key, value)
 
-    branch.updated_at = "now()"
+    branch.updated_at = func.now()
 
     session.add(branch)
-    session.commit()
-    session.refresh(branch)
+    await bump_version(session, branch_cache.VERSION_NAME)
+    await session.commit()
 
-    return BranchRead(**branch.dict(), address=address)
+    return await get_branch(session, uuid)
 
 
 @router.delete("/{uuid}")
-def delete(
+async def delete(
     uuid: UUID,
     current_user: User = Depends(authenticate_user),
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(db_session),
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
@@ -119,18 +150,20 @@ def delete(
         .join(Address)
         .where(Branch.uuid == uuid, Branch.deleted_at == None)
     )
-    branch, address = session.exec(statement).one_or_none()
-    if not branch:
+    result = (await session.exec(statement)).one_or_none()
+    if not result:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found"
         )
+    branch, address = result
 
     # let the SQL server do the time calculation
-    branch.deleted_at = "now()"
-    address.deleted_at = "now()"
+    branch.deleted_at = func.now()
+    address.deleted_at = func.now()
 
     session.add(branch)
     session.add(address)
-    session.commit()
+    await bump_version(session, branch_cache.VERSION_NAME)
+    await session.commit()
 
     return None, status.HTTP_204_NO_CONTENT
@@ -0,0 +1,91 @@
+import json
+
+from fastapi import APIRouter, Depends, Request, Response, status
+from fastapi.exceptions import HTTPException
+
+from app.bulk import csv_items, ndjson_items, parse_item, try_post_batch
+from app.config import settings
+from app.dependencies import authenticate_user
+from app.http import stream_lines
+from app.models.bulk import BulkReport, BulkStatus
+from app.models.user import User, UserRole
+
+
+router = APIRouter()
+
+
+async def _json_items(request: Request):
+    try:
+        body = await request.json()
+    except ValueError:
+        body = None
+    if not isinstance(body, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Expected a JSON array of transactions",
+        )
+
+    for data in body:
+        yield data
+
+
+# Accepts a JSON array (application/json), or a streamed upload of one
+# transaction per line as NDJSON (application/x-ndjson) or CSV with a header
+# line (text/csv). Entries are posted in batches of OINKBANK_BULK_BATCH_SIZE,
+# each batch in its own database transaction. When a batch fails the upload
+# stops there: the batches before it stay posted, and the report comes back
+# with status 500 and `complete` false. It lists the entries read until then,
+# those of the failed batch rejected. The report is written directly,
+# BulkReport only documents it.
+@router.post("/bulk", response_model=BulkReport)
+async def create(request: Request, current_user: User = Depends(authenticate_user)):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type == "application/json":
+        items = _json_items(request)
+    elif content_type in ("application/x-ndjson", "application/ndjson"):
+        items = ndjson_items(stream_lines(request))
+    elif content_type == "text/csv":
+        items = csv_items(stream_lines(request))
+    else:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    results = []
+    batch = []
+    index = 0
+    complete = True
+    async for data in items:
+        item, rejected = parse_item(index, data)
+        if rejected:
+            results.append(rejected)
+        else:
+            batch.append((index, item))
+
+        index += 1
+        if len(batch) >= settings.bulk_batch_size:
+            batch_results, complete = await try_post_batch(batch)
+            results += batch_results
+            batch = []
+            if not complete:
+                break
+
+    if batch and complete:
+        batch_results, complete = await try_post_batch(batch)
+        results += batch_results
+
+    results.sort(key=lambda result: result["index"])
+    accepted = sum(result["status"] == BulkStatus.ACCEPTED for result in results)
+    report = {
+        "accepted": accepted,
+        "rejected": len(results) - accepted,
+        "complete": complete,
+        "results": results,
+    }
+
+    return Response(
+        content=json.dumps(report),
+        media_type="application/json",
+        status_code=200 if complete else 500,
+    )
@@ -0,0 +1,94 @@
+from datetime import date, datetime, time, timedelta
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.exceptions import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlmodel import select
+from typing import Optional
+from uuid import UUID
+
+from app import reports
+from app.dependencies import authenticate_user
+from app.exports import MEDIA_TYPES, ExportFormat, pyarrow, stream_rows
+from app.models.account import Account
+from app.models.transaction import Transaction
+from app.models.user import User, UserRole
+
+
+router = APIRouter()
+
+
+def export_response(statement, columns, format: ExportFormat, filename: str):
+    if format == ExportFormat.PARQUET and pyarrow is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Parquet exports require pyarrow",
+        )
+
+    return StreamingResponse(
+        stream_rows(statement, columns, format),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{format.value}"'
+        },
+    )
+
+
+@router.get("/transactions")
+async def transactions(
+    format: ExportFormat = ExportFormat.CSV,
+    account_uuid: Optional[UUID] = None,
+    branch_uuid: Optional[UUID] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: User = Depends(authenticate_user),
+):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    columns = [
+        "uuid",
+        "account_uuid",
+        "type",
+        "amount",
+        "status",
+        "details",
+        "created_at",
+    ]
+    statement = (
+        select(*[getattr(Transaction, column) for column in columns])
+        .where(Transaction.deleted_at == None)
+        .order_by(Transaction.created_at, Transaction.uuid)
+    )
+
+    if account_uuid:
+        statement = statement.where(Transaction.account_uuid == account_uuid)
+    if branch_uuid:
+        statement = statement.join(Account).where(Account.branch_uuid == branch_uuid)
+    if start_date:
+        statement = statement.where(
+            Transaction.created_at >= datetime.combine(start_date, time(0, 0, 0))
+        )
+    if end_date:
+        statement = statement.where(
+            Transaction.created_at
+            < datetime.combine(end_date + timedelta(days=1), time(0, 0, 0))
+        )
+
+    return export_response(statement, columns, format, "transactions")
+
+
+@router.get("/inactive_accounts")
+async def inactive_accounts(
+    format: ExportFormat = ExportFormat.CSV,
+    days: int = Query(90, ge=0),
+    current_user: User = Depends(authenticate_user),
+):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    statement = reports.inactive_accounts(days).order_by(
+        Account.last_activity_at, Account.uuid
+    )
+    columns = [column.name for column in statement.selected_columns]
+
+    return export_response(statement, columns, format, "inactive_accounts")
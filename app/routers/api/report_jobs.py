@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.exceptions import HTTPException
+from sqlmodel.ext.asyncio.session import AsyncSession
+from uuid import UUID
+
+from app import jobs
+from app.dependencies import db_session, authenticate_user
+from app.models.job import JobStatus, ReportJobCreate, ReportJobRead
+from app.models.user import User, UserRole
+
+
+router = APIRouter()
+
+
+# Queues the report, or joins the identical one already queued or cached. The
+# job is done when it comes back with a cached result.
+@router.post("", response_model=ReportJobRead, status_code=status.HTTP_202_ACCEPTED)
+async def create(
+    create: ReportJobCreate, current_user: User = Depends(authenticate_user)
+):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    return await jobs.submit(create)
+
+
+@router.get("/{uuid}", response_model=ReportJobRead)
+async def get(
+    uuid: UUID,
+    current_user: User = Depends(authenticate_user),
+    session: AsyncSession = Depends(db_session),
+):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    return await jobs.get_job(session, uuid)
+
+
+# The stored report, as the synchronous endpoint of the same report returns it
+@router.get("/{uuid}/result")
+async def result(
+    uuid: UUID,
+    current_user: User = Depends(authenticate_user),
+    session: AsyncSession = Depends(db_session),
+):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    report_job = await jobs.get_job(session, uuid)
+    if report_job.status != JobStatus.DONE:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Report is {report_job.status}",
+        )
+
+    return report_job.result
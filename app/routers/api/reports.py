@@ -1,134 +1,71 @@
-from datetime import date, datetime, timedelta, time
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 from fastapi.exceptions import HTTPException
-from sqlmodel import Session, select
-from sqlalchemy import func
-from typing import List, Optional
-from uuid import UUID
-
-from app.dependencies import db_session, engine, authenticate_user
-from app.models.address import Address
-from app.models.branch import Branch, BranchRead
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import counters, reports
+from app.dependencies import authenticate_user, read_session
+from app.pagination import PageParams, paginate
 from app.models.account import Account
-from app.models.transaction import Transaction, TransactionType
-from app.models.report import AccountInactive, AccountsUsers, Transactions
+from app.models.report import (
+    AccountInactive,
+    AccountsUsers,
+    AccountsUsersParams,
+    Transactions,
+    TransactionsParams,
+    TotalBalance,
+)
+from app.models.page import Page
 from app.models.user import User, UserRole
 
 
 router = APIRouter()
 
 
-@router.get("/accounts_users")
-def branches(
-    start_date: Optional[date] = None,
-    end_date: Optional[date] = None,
+@router.get("/accounts_users", response_model=AccountsUsers)
+async def branches(
+    params: AccountsUsersParams = Depends(),
     current_user: User = Depends(authenticate_user),
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(read_session),
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-    accounts_stmt = select(func.count(Account.uuid).label("account_count"))
-    users_stmt = select(func.count(User.uuid).label("users_count")).where(User.role <= UserRole.CONSUMER)
-
-    if start_date:
-        accounts_stmt = accounts_stmt.where(
-            Account.created_at >= datetime.combine(start_date, time(0, 0, 0))
-        )
-        users_stmt = users_stmt.where(
-            User.created_at >= datetime.combine(start_date, time(0, 0, 0))
-        )
-    if end_date:
-        accounts_stmt = accounts_stmt.where(
-            Account.created_at <= datetime.combine(end_date, time(0, 0, 0))
-        )
-        users_stmt = users_stmt.where(
-            User.created_at <= datetime.combine(end_date, time(0, 0, 0))
-        )
-
-    return {
-        "accounts_count": session.exec(accounts_stmt).one(),
-        "users_count": session.exec(users_stmt).one(),
-    }
-
-
-@router.get("/transactions")
-def branches(
-    start_date: Optional[date] = None,
-    end_date: Optional[date] = None,
+    return await reports.accounts_users(session, params)
+
+
+@router.get("/transactions", response_model=Transactions)
+async def branches(
+    params: TransactionsParams = Depends(),
     current_user: User = Depends(authenticate_user),
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(read_session),
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-    deposits_stmt = select(
-        func.count(Transaction.amount).label("deposits_count"),
-        func.sum(Transaction.amount).label("deposits_total"),
-    ).where(Transaction.type == TransactionType.DEPOSIT)
-    withdrawals_stmt = select(
-        func.count(Transaction.amount).label("withdrawals_count"),
-        func.sum(Transaction.amount).label("withdrawals_total"),
-    ).where(Transaction.type == TransactionType.WITHDRAWAL)
-
-    if start_date:
-        deposits_stmt = deposits_stmt.where(
-            Transaction.created_at >= datetime.combine(start_date, time(0, 0, 0))
-        )
-        withdrawals_stmt = withdrawals_stmt.where(
-            Transaction.created_at >= datetime.combine(start_date, time(0, 0, 0))
-        )
-    if end_date:
-        deposits_stmt = deposits_stmt.where(
-            Transaction.created_at >= datetime.combine(start_date, time(0, 0, 0))
-        )
-        withdrawals_stmt = withdrawals_stmt.where(
-            Transaction.created_at >= datetime.combine(start_date, time(0, 0, 0))
-        )
-
-    deposits_count, deposits_total = session.exec(deposits_stmt).one()
-    withdrawals_count, withdrawals_total = session.exec(withdrawals_stmt).one()
-
-    return {
-        "deposits_count": deposits_count,
-        "deposits_total": deposits_total,
-        "withdrawals_count": withdrawals_count,
-        "withdrawals_total": withdrawals_total,
-    }
-
-
-@router.get("/total_balance")
-def branches(
+    return await reports.transactions(session, params)
+
+
+@router.get("/total_balance", response_model=TotalBalance)
+async def branches(
     current_user: User = Depends(authenticate_user),
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(read_session),
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-    balance_stmt = select(func.sum(Account.balance).label("balance_total")).where(
-        Account.deleted_at == None
-    )
-
-    return {"balance_total": session.exec(balance_stmt).one()}
+    return await counters.read_counters(session, counters.BALANCE_TOTAL)
 
 
-@router.get("/inactive_accounts", response_model=List[AccountInactive])
-def accounts(
+@router.get("/inactive_accounts", response_model=Page[AccountInactive])
+async def accounts(
+    days: int = Query(90, ge=0),
+    page: PageParams = Depends(),
     current_user: User = Depends(authenticate_user),
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(read_session),
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-    statement = select(Account).where(
-        Account.updated_at < datetime.utcnow() - timedelta(days=90),
-        Account.deleted_at == None,
-    )
-    result = [
-        AccountInactive(
-            account=account, days_inactive=(datetime.utcnow() - account.updated_at).days
-        )
-        for account in session.exec(statement).all()
-    ]
-
-    return result
+    statement = reports.inactive_accounts(days)
+
+    return await paginate(session, statement, Account, page, key="last_activity_at")
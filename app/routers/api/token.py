@@ -3,16 +3,16 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestFormStrict
 from jose import jwt
-from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app import metrics
 from app.dependencies import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
     SECRET_KEY,
     TOKEN_ALGORITHM,
     db_session,
-    engine,
-    pwd,
 )
-from app.models.user import User
+from app.passwords import passwords
+from app.queries import user_by_username
 
 
 router = APIRouter()
@@ -32,16 +32,15 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 @router.post("")
 async def login(
     form_data: OAuth2PasswordRequestFormStrict = Depends(),
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(db_session),
 ):
-    statement = select(User).where(
-        User.username == form_data.username, User.deleted_at == None
-    )
-    user = session.exec(statement).one_or_none()
+    result = await user_by_username.execute(session, form_data.username)
+    user = result.scalars().one_or_none()
 
-    # use a dummy hash if user not found to simulate time to hash a password
-    password_hash = user.password_hash if user else pwd._dummy_hash
-    if not pwd.verify(form_data.password, password_hash):
+    # without a user the hash is checked against a dummy to take the same time
+    password_hash = user.password_hash if user else None
+    if not await passwords.verify(form_data.password, password_hash):
+        metrics.auth_failure("invalid_password" if user else "unknown_user")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
@@ -1,112 +1,75 @@
 from fastapi import APIRouter, Depends, status
 from fastapi.exceptions import HTTPException
-from pydantic.schema import model_schema
-from sqlmodel import Session, select
-from typing import List, Optional
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from datetime import date, datetime, time, timedelta
+from typing import Optional
 from uuid import UUID
 
-from app.dependencies import db_session, engine, authenticate_user
+from app import statements
+from app.dependencies import db_session, authenticate_user
+from app.fast_read import json_response
+from app.pagination import PageParams, paginate
 from app.models.account import Account
-from app.models.transaction import (
-    Transaction,
-    TransactionCreate,
-    TransactionRead,
-    TransactionType,
-)
+from app.models.page import Page
+from app.models.transaction import Transaction, TransactionCreate, TransactionRead
 from app.models.user import User, UserRole
+from app.posting import post, reverse
+from app.queries import transaction_rows, transactions_by_account
+from app.rollups import record_transaction
 
 
 router = APIRouter()
 
 
 @router.post("", response_model=TransactionRead)
-def create(
+async def create(
     account_uuid: UUID,
     create: TransactionCreate,
     current_user: User = Depends(authenticate_user),
-    session: Session = Depends(db_session),
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-    statement = select(Account).where(
-        Account.uuid == account_uuid, Account.deleted_at == None
-    )
-    account = session.exec(statement).one_or_none()
-    if not account:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found"
-        )
-
-    transaction: Transaction = Transaction(
-        **create.dict(exclude={"transfer": ...}), account_uuid=account.uuid
-    )
-
-    if transaction.type == TransactionType.DEPOSIT:
-        account.balance += transaction.amount
-        if account.balance < account.minimum_balance:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail="Balance too low"
-            )
-
-    if (
-        transaction.type == TransactionType.WITHDRAWAL
-        or transaction.type == TransactionType.TRANSFER
-    ):
-        account.balance -= transaction.amount
-        if account.balance < account.minimum_balance:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient funds"
-            )
-
-        if transaction.type == TransactionType.TRANSFER:
-            transaction.details = f"Transfer to {create.transfer.account_number}"
-            dest = session.exec(
-                select(Account).where(
-                    Account.number == create.transfer.account_number,
-                    Account.deleted_at == None,
-                )
-            ).one_or_none()
-            if not dest:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Transfer destination not found",
-                )
-            dest.balance += transaction.amount
-            dest.updated_at = "now()"
-            session.add(dest)
-            session.commit()
-
-    account.updated_at = "now()"
-    session.add(account)
-    session.commit()
-
-    session.add(transaction)
-    session.commit()
-    session.refresh(transaction)
-
-    return transaction
+    return await post(account_uuid, create)
 
 
-@router.get("", response_model=List[TransactionRead])
-def index(
+@router.get("", response_model=Page[TransactionRead])
+async def index(
     account_uuid: UUID,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    page: PageParams = Depends(),
     current_user: User = Depends(authenticate_user),
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(db_session),
 ):
-    statement = select(Transaction).where(
-        Transaction.account_uuid == account_uuid, Transaction.deleted_at == None
+    statement = transactions_by_account(account_uuid)
+    # only the partitions of the months in the range are read
+    if start_date:
+        start = datetime.combine(start_date, time(0, 0, 0))
+        statement += lambda s: s.where(Transaction.created_at >= start)
+    if end_date:
+        end = datetime.combine(end_date + timedelta(days=1), time(0, 0, 0))
+        statement += lambda s: s.where(Transaction.created_at < end)
+
+    rows = await paginate(
+        session,
+        statement,
+        Transaction,
+        page,
+        execution_options=transactions_by_account.execution_options,
     )
 
-    return session.exec(statement).all()
+    return json_response(transaction_rows.read_page(rows))
 
 
 @router.get("/{uuid}", response_model=TransactionRead)
-def read(
+async def read(
     uuid: UUID,
     account_uuid: UUID,
     current_user: User = Depends(authenticate_user),
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(db_session),
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
@@ -116,7 +79,7 @@ def read(
         Transaction.uuid == uuid,
         Transaction.deleted_at == None,
     )
-    transaction = session.exec(statement).one_or_none()
+    transaction = (await session.exec(statement)).one_or_none()
     if not transaction:
         raise HTTPException(status_code=404, detail="Resource not found")
 
@@ -124,27 +87,37 @@ def read(
 
 
 @router.delete("/{uuid}")
-def delete(
+async def delete(
     uuid: UUID,
     account_uuid: UUID,
     current_user: User = Depends(authenticate_user),
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(db_session),
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-    statement = select(Transaction).where(
-        Transaction.account_uuid == account_uuid,
-        Transaction.uuid == uuid,
-        Transaction.deleted_at == None,
+    statement = (
+        select(Transaction, Account.branch_uuid)
+        .join(Account)
+        .where(
+            Transaction.account_uuid == account_uuid,
+            Transaction.uuid == uuid,
+            Transaction.deleted_at == None,
+        )
+        # a concurrent deletion of the same transaction waits, then finds it gone
+        .with_for_update(of=Transaction)
     )
-    transaction = session.exec(statement).one_or_none()
-    if not transaction:
+    result = (await session.exec(statement)).one_or_none()
+    if not result:
         raise HTTPException(status_code=404, detail="Resource not found")
+    transaction, branch_uuid = result
 
-    transaction.deleted_at = "now()"  # let the SQL server do the time calculation
+    transaction.deleted_at = func.now()  # let the SQL server do the time calculation
 
     session.add(transaction)
-    session.commit()
+    await reverse(session, transaction)
+    await record_transaction(session, transaction, branch_uuid, sign=-1)
+    await statements.record_deletion(session, transaction)
+    await session.commit()
 
     return None, status.HTTP_204_NO_CONTENT
@@ -1,147 +1,164 @@
-from typing import List
 from uuid import UUID
 from fastapi import APIRouter, HTTPException, Depends, status
-from sqlmodel import Session, select
-
-from app.dependencies import db_session, engine, pwd, authenticate_user
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import counters
+from app.dependencies import db_session, authenticate_user, principals
+from app.fast_read import RowLayout, json_response
+from app.loaders import loader_options
+from app.pagination import PageParams, paginate
+from app.models.address import Address
+from app.models.page import Page
 from app.models.user import User, UserCreate, UserRead, UserRole, UserUpdate
+from app.passwords import passwords
 
 
 router = APIRouter()
 
+user_rows = RowLayout(User, UserRead)
+
+
+async def get_user(session: AsyncSession, uuid: UUID):
+    statement = (
+        select(User)
+        .where(User.uuid == uuid, User.deleted_at == None)
+        .options(*loader_options(User, UserRead))
+        .execution_options(populate_existing=True)
+    )
+    user = (await session.exec(statement)).one_or_none()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found"
+        )
+
+    return user
+
 
 @router.post("", response_model=UserRead)
-def create(user_create: UserCreate, session: Session = Depends(db_session)):
-    password_hash = pwd.hash(user_create.password)
-    user = User(**user_create.dict(), password_hash=password_hash)
+async def create(user_create: UserCreate, session: AsyncSession = Depends(db_session)):
+    password_hash = await passwords.hash(user_create.password)
+    user = User(
+        **user_create.dict(exclude={"address": ...}), password_hash=password_hash
+    )
+    user.address = Address(**user_create.address.dict())
 
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await counters.bump(session, counters.USERS_COUNT, 1)
+    await session.commit()
 
-    return user
+    return await get_user(session, user.uuid)
 
 
-@router.get("", response_model=List[UserRead])
-def index(
+@router.get("", response_model=Page[UserRead])
+async def index(
+    page: PageParams = Depends(),
     current_user: User = Depends(authenticate_user),
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(db_session),
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-    statement = select(User).where(
+    statement = user_rows.select().where(
         User.role <= UserRole.CONSUMER, User.deleted_at == None
     )
+    rows = await paginate(session, statement, User, page)
 
-    return session.exec(statement).all()
+    return json_response(user_rows.read_page(rows))
 
 
 @router.get("/me", response_model=UserRead)
-def me(current_user: User = Depends(authenticate_user)):
+async def me(current_user: User = Depends(authenticate_user)):
     return current_user
 
 
 @router.get("/{uuid}", response_model=UserRead)
-def read(
+async def read(
     uuid: UUID,
     current_user: User = Depends(authenticate_user),
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(db_session),
 ):
     if current_user.uuid != uuid and current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-    statement = select(User).where(User.uuid == uuid, User.deleted_at == None)
-    user = session.exec(statement).one_or_none()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found"
-        )
-
-    return user
+    return await get_user(session, uuid)
 
 
 @router.patch("/me", response_model=UserRead)
-def update_me(
+async def update_me(
     user_update: UserUpdate,
     current_user: User = Depends(authenticate_user),
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(db_session),
 ):
-    statement = select(User).where(
-        User.uuid == current_user.uuid, User.deleted_at == None
-    )
-    user = session.exec(statement).one_or_none()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found"
-        )
+    user = await get_user(session, current_user.uuid)
+    username = user.username
 
     user_data = user_update.dict(exclude_unset=True)
     for key, value in user_data.items():
         if key == "password":
             key = "password_hash"
-            value = str(pwd.hash(value)).encode()
+            value = await passwords.hash(value)
         setattr(user, key, value)
-    user.updated_at = "now()"
+    user.updated_at = func.now()
 
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    principals.invalidate(username, user.username)
 
-    return user
+    return await get_user(session, user.uuid)
 
 
 @router.patch("/{uuid}", response_model=UserRead)
-def update(
+async def update(
     uuid: UUID,
     user_update: UserUpdate,
     current_user: User = Depends(authenticate_user),
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(db_session),
 ):
     if current_user.uuid != uuid and current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-    statement = select(User).where(User.uuid == uuid, User.deleted_at == None)
-    user = session.exec(statement).one_or_none()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found"
-        )
+    user = await get_user(session, uuid)
+    username = user.username
 
     user_data = user_update.dict(exclude_unset=True)
     for key, value in user_data.items():
         if key == "password":
             key = "password_hash"
-            value = str(pwd.hash(value)).encode()
+            value = await passwords.hash(value)
         setattr(user, key, value)
-    user.updated_at = "now()"
+    user.updated_at = func.now()
 
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    principals.invalidate(username, user.username)
 
-    return user
+    return await get_user(session, uuid)
 
 
 @router.delete("/{uuid}")
-def delete(
+async def delete(
     uuid: UUID,
     current_user: User = Depends(authenticate_user),
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(db_session),
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
     statement = select(User).where(User.uuid == uuid, User.deleted_at == None)
-    user = session.exec(statement).one_or_none()
+    user = (await session.exec(statement)).one_or_none()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found"
         )
 
-    user.deleted_at = "now()"  # let the SQL server do the time calculation
+    user.deleted_at = func.now()  # let the SQL server do the time calculation
 
     session.add(user)
-    session.commit()
+    if user.role <= UserRole.CONSUMER:
+        await counters.bump(session, counters.USERS_COUNT, -1)
+    await session.commit()
+    principals.invalidate(user.username)
 
     return None, status.HTTP_204_NO_CONTENT
@@ -0,0 +1,199 @@
+from datetime import date, datetime, time, timedelta
+from uuid import UUID
+
+from sqlalchemy import Float, bindparam, func, select, text, true, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.dependencies import engine
+from app.models.account import Account
+from app.models.statement import BalanceCheckpoint
+from app.models.transaction import Transaction
+
+
+account = Account.__table__
+checkpoint = BalanceCheckpoint.__table__
+transaction = Transaction.__table__
+
+CHECKPOINT_LOCK = 7_101_003
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time(0, 0, 0))
+
+
+def _live_transactions(account_uuid: UUID, start: datetime, end: datetime):
+    return [
+        transaction.c.account_uuid == account_uuid,
+        transaction.c.deleted_at == None,
+        transaction.c.created_at >= start,
+        transaction.c.created_at < end,
+    ]
+
+
+# Writes the closing balance of every account on every day from `since` to
+# `until` it had transactions on. Each account starts from its latest
+# checkpoint before `since`, or from its opening balance when it has none, so
+# the checkpoints before `since` must be complete.
+async def take_checkpoints(session: AsyncSession, since: date, until: date):
+    day = func.date(transaction.c.created_at)
+    days = (
+        select(
+            transaction.c.account_uuid,
+            day.label("day"),
+            func.sum(transaction.c.balance_change).label("change"),
+        )
+        .where(
+            transaction.c.deleted_at == None,
+            transaction.c.created_at >= _day_start(since),
+            transaction.c.created_at < _day_start(until + timedelta(days=1)),
+        )
+        .group_by(transaction.c.account_uuid, day)
+        .subquery("days")
+    )
+    base = (
+        select(checkpoint.c.balance)
+        .where(
+            checkpoint.c.account_uuid == days.c.account_uuid, checkpoint.c.day < since
+        )
+        .order_by(checkpoint.c.day.desc())
+        .limit(1)
+        .lateral("base")
+    )
+    rows = select(
+        days.c.account_uuid,
+        days.c.day,
+        func.coalesce(base.c.balance, account.c.opening_balance)
+        + func.sum(days.c.change).over(
+            partition_by=days.c.account_uuid, order_by=days.c.day
+        ),
+    ).select_from(
+        days.join(account, account.c.uuid == days.c.account_uuid).outerjoin(
+            base, true()
+        )
+    )
+
+    statement = insert(checkpoint).from_select(["account_uuid", "day", "balance"], rows)
+    await session.exec(
+        statement.on_conflict_do_update(
+            index_elements=[checkpoint.c.account_uuid, checkpoint.c.day],
+            set_={"balance": statement.excluded.balance},
+        )
+    )
+
+
+# Checkpoints the days that ended since the last run. The latest checkpointed
+# day is taken again, it may have had postings committed after its run. Every
+# worker runs this periodically (OINKBANK_CHECKPOINT_INTERVAL), one at a time.
+async def update_checkpoints():
+    async with AsyncSession(engine) as session:
+        locked = (
+            await session.execute(
+                select(func.pg_try_advisory_xact_lock(CHECKPOINT_LOCK))
+            )
+        ).scalar()
+        if not locked:
+            return
+
+        since = (await session.execute(select(func.max(checkpoint.c.day)))).scalar()
+        if since is None:
+            oldest = select(func.min(transaction.c.created_at))
+            oldest = (await session.execute(oldest)).scalar()
+            since = oldest and oldest.date()
+
+        until = datetime.utcnow().date() - timedelta(days=1)
+        if since is None or since > until:
+            return
+
+        await take_checkpoints(session, since, until)
+        await session.commit()
+
+
+# Rebuilds the checkpoints from the transaction table, like rollups.rebuild.
+# Days before the oldest transaction are kept, they were taken from partitions
+# detached since (app.partitions).
+async def rebuild(session: AsyncSession):
+    await session.exec(select(func.pg_advisory_xact_lock(CHECKPOINT_LOCK)))
+    await session.exec(text('LOCK TABLE "transaction" IN SHARE MODE'))
+    oldest = select(func.min(transaction.c.created_at))
+    oldest = (await session.execute(oldest)).scalar()
+    if oldest is None:
+        return
+
+    await session.exec(checkpoint.delete().where(checkpoint.c.day >= oldest.date()))
+    await take_checkpoints(
+        session, oldest.date(), datetime.utcnow().date() - timedelta(days=1)
+    )
+
+
+# Must run in the database transaction that soft-deletes `transaction`: the
+# balances of its day and after no longer include it. Waits for a checkpoint
+# update in progress, which could otherwise still count it.
+async def record_deletion(session: AsyncSession, transaction: Transaction):
+    await session.exec(select(func.pg_advisory_xact_lock_shared(CHECKPOINT_LOCK)))
+    await session.exec(
+        update(checkpoint)
+        .where(
+            checkpoint.c.account_uuid == transaction.account_uuid,
+            checkpoint.c.day >= transaction.created_at.date(),
+        )
+        .values(balance=checkpoint.c.balance - transaction.balance_change)
+    )
+
+
+# The balance at the start of `day`: the latest checkpoint before it, or the
+# opening balance, plus the transactions since
+async def opening_balance(session: AsyncSession, account: Account, day: date) -> float:
+    statement = (
+        select(checkpoint.c.day, checkpoint.c.balance)
+        .where(checkpoint.c.account_uuid == account.uuid, checkpoint.c.day < day)
+        .order_by(checkpoint.c.day.desc())
+        .limit(1)
+    )
+    base = (await session.execute(statement)).one_or_none()
+    if base is None:
+        balance, since = account.opening_balance, datetime.min
+    else:
+        balance, since = base.balance, _day_start(base.day + timedelta(days=1))
+
+    statement = select(func.coalesce(func.sum(transaction.c.balance_change), 0)).where(
+        *_live_transactions(account.uuid, since, _day_start(day))
+    )
+
+    return balance + (await session.execute(statement)).scalar_one()
+
+
+# The account's live transactions from `start` to `end`, both included, each
+# with the balance after it
+async def statement(session: AsyncSession, account: Account, start: date, end: date):
+    opening = await opening_balance(session, account, start)
+
+    balance = bindparam("opening", opening, type_=Float) + func.sum(
+        transaction.c.balance_change
+    ).over(order_by=[transaction.c.created_at, transaction.c.uuid])
+    lines = (
+        select(
+            transaction.c.uuid,
+            transaction.c.type,
+            transaction.c.amount,
+            transaction.c.details,
+            transaction.c.created_at,
+            balance.label("balance"),
+        )
+        .where(
+            *_live_transactions(
+                account.uuid, _day_start(start), _day_start(end + timedelta(days=1))
+            )
+        )
+        .order_by(transaction.c.created_at, transaction.c.uuid)
+    )
+    lines = [dict(line) for line in (await session.execute(lines)).mappings()]
+
+    return {
+        "account_uuid": account.uuid,
+        "start_date": start,
+        "end_date": end,
+        "opening_balance": opening,
+        "closing_balance": lines[-1]["balance"] if lines else opening,
+        "lines": lines,
+    }
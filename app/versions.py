@@ -0,0 +1,35 @@
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.version import TableVersion
+
+
+async def get_version(session: AsyncSession, name: str) -> int:
+    statement = select(TableVersion.version).where(TableVersion.name == name)
+
+    return (await session.exec(statement)).one_or_none() or 0
+
+
+# Runs in the caller's transaction, the new version becomes visible together
+# with the change it announces.
+async def bump_version(session: AsyncSession, name: str):
+    statement = (
+        insert(TableVersion)
+        .values(name=name, version=1)
+        .on_conflict_do_update(
+            index_elements=[TableVersion.name],
+            set_={"version": TableVersion.version + 1},
+        )
+    )
+    await session.exec(statement)
+
+
+# Several versions in one round trip, in the order of `names`
+async def get_versions(session: AsyncSession, *names: str) -> tuple:
+    statement = select(TableVersion.name, TableVersion.version).where(
+        TableVersion.name.in_(names)
+    )
+    versions = dict((await session.exec(statement)).all())
+
+    return tuple(versions.get(name, 0) for name in names)
@@ -0,0 +1,181 @@
+# Per request overhead the hot query registry (app.queries) saves, for every
+# registered query against the select(...).where(...) it replaced:
+#
+#   python -m benchmarks.hot_queries --iterations 2000
+#
+# build:   building the statement and its compiled cache key, no database
+# execute: process time of a full execution through a session, so asyncpg and
+#          the ORM are included and waiting on the database is not
+#
+# The arguments are taken from the latest user and account, point it at a
+# database with at least one of each.
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app.models
+from app.dependencies import engine
+from app.loaders import loader_options
+from app.models.account import Account, AccountRead
+from app.models.transaction import Transaction
+from app.models.user import User, UserRead
+from app.pagination import PageParams, paginate
+from app.queries import (
+    account_by_number,
+    account_by_uuid,
+    transaction_rows,
+    transactions_by_account,
+    user_by_username,
+)
+
+
+def plain_user_by_username(username):
+    return (
+        select(User)
+        .where(User.username == username, User.deleted_at == None)
+        .options(*loader_options(User, UserRead))
+    )
+
+
+def plain_account_by_uuid(uuid):
+    return (
+        select(Account)
+        .where(Account.uuid == uuid, Account.deleted_at == None)
+        .options(*loader_options(Account, AccountRead))
+        .execution_options(populate_existing=True)
+    )
+
+
+def plain_account_by_number(number):
+    account = Account.__table__
+    return select(account.c.uuid).where(
+        account.c.number == number, account.c.deleted_at == None
+    )
+
+
+def plain_transactions_by_account(account_uuid):
+    return transaction_rows.select().where(
+        Transaction.account_uuid == account_uuid, Transaction.deleted_at == None
+    )
+
+
+# (name, plain builder, hot query, whether it is paginated)
+QUERIES = [
+    ("user_by_username", plain_user_by_username, user_by_username, False),
+    ("account_by_uuid", plain_account_by_uuid, account_by_uuid, False),
+    ("account_by_number", plain_account_by_number, account_by_number, False),
+    (
+        "transactions_by_account",
+        plain_transactions_by_account,
+        transactions_by_account,
+        True,
+    ),
+]
+
+
+# the statement paginate() would run, for a page of 50
+def page_statement(statement):
+    created_at, uuid = Transaction.created_at, Transaction.uuid
+    if isinstance(statement, StatementLambdaElement):
+        statement += lambda s: s.order_by(created_at, uuid).limit(51)
+        return statement
+
+    return statement.order_by(created_at, uuid).limit(51)
+
+
+def build_time(build, argument, paginated: bool, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        statement = build(argument)
+        if paginated:
+            statement = page_statement(statement)
+        statement._generate_cache_key()
+
+    return (time.perf_counter() - start) / iterations
+
+
+async def execute_time(build, argument, paginated, options, iterations) -> float:
+    async with AsyncSession(engine) as session:
+
+        async def run():
+            if paginated:
+                statement = build(argument)
+                await paginate(
+                    session, statement, Transaction, PageParams(limit=50), **options
+                )
+            else:
+                result = await session.execute(build(argument), **options)
+                result.all()
+
+        await run()  # warm up the caches
+
+        start = time.process_time()
+        for _ in range(iterations):
+            await run()
+
+    return (time.process_time() - start) / iterations
+
+
+async def main(args):
+    async with engine.connect() as conn:
+        account_table = Account.__table__
+        username = (
+            await conn.execute(
+                select(User.__table__.c.username)
+                .order_by(User.__table__.c.created_at.desc())
+                .limit(1)
+            )
+        ).scalar_one()
+        account = (
+            await conn.execute(
+                select(account_table.c.uuid, account_table.c.number)
+                .where(account_table.c.deleted_at == None)
+                .order_by(account_table.c.created_at.desc())
+                .limit(1)
+            )
+        ).one()
+    arguments = {
+        "user_by_username": username,
+        "account_by_uuid": account.uuid,
+        "account_by_number": account.number,
+        "transactions_by_account": account.uuid,
+    }
+
+    print(
+        f"{'query':<26}{'build us':>10}{'hot':>8}{'saved':>8}"
+        f"{'execute us':>12}{'hot':>8}{'saved':>8}"
+    )
+    for name, plain, query, paginated in QUERIES:
+        argument = arguments[name]
+        build = [
+            build_time(builder, argument, paginated, args.iterations) * 1e6
+            for builder in (plain, query)
+        ]
+        execute = [
+            await execute_time(builder, argument, paginated, options, args.iterations)
+            * 1e6
+            for builder, options in (
+                (plain, {}),
+                (query, {"execution_options": query.execution_options}),
+            )
+        ]
+        print(
+            f"{name:<26}{build[0]:>10.1f}{build[1]:>8.1f}{build[0] - build[1]:>8.1f}"
+            f"{execute[0]:>12.1f}{execute[1]:>8.1f}{execute[0] - execute[1]:>8.1f}"
+        )
+
+    for query in (q for _, _, q, _ in QUERIES):
+        stats = query.stats()
+        print(f"{stats['name']:<26}compiled cache hit ratio {stats['hit_ratio']:.3f}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,231 @@
+# Replays a mix of API calls against a running app seeded by benchmarks.seed,
+# and reports latency percentiles and throughput per endpoint:
+#
+#   python -m benchmarks.load --url http://localhost:8000 --users 1000000 \
+#       --concurrency 50 --seconds 60 --output release.json
+#
+# Each client logs in as a random seeded user, then picks calls by their MIX
+# weight: another login, its profile, a page of the account listing, a posting
+# to a random account or one of the admin reports. Postings and reports need
+# an admin, they are sent with the seeded admin's token. A withdrawal the
+# account can't cover is a valid outcome, not an error.
+#
+# --users, --accounts-per-user and --password must match the seed. With
+# --baseline, a report saved by an earlier --output run, every percentile is
+# shown next to its change since.
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Optional
+
+import httpx
+
+from benchmarks.seed import (
+    ADMIN_USERNAME,
+    DEFAULT_ACCOUNTS_PER_USER,
+    DEFAULT_PASSWORD,
+    DEFAULT_USERS,
+    account_uuid,
+    username,
+)
+
+
+# endpoint -> weight, bcrypt keeps logins rare
+MIX = {
+    "POST /token": 1,
+    "GET /users/me": 30,
+    "GET /accounts": 20,
+    "POST /accounts/{uuid}/transactions": 15,
+    "GET /reports/total_balance": 2,
+    "GET /reports/accounts_users": 1,
+    "GET /reports/transactions": 1,
+}
+
+PERCENTILES = (50, 95, 99)
+
+
+class Driver:
+    def __init__(self, client: httpx.AsyncClient, args, rng: random.Random):
+        self.client = client
+        self.args = args
+        self.rng = rng
+        self.admin_headers = None
+        # endpoint -> latencies in seconds, errors
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def login(self, name: str) -> Optional[dict]:
+        response = await self.call(
+            "POST /token",
+            "POST",
+            "/token",
+            data=dict(
+                grant_type="password", username=name, password=self.args.password
+            ),
+        )
+        if response is None or response.status_code != 200:
+            return None
+
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def call(self, endpoint: str, method: str, path: str, ok=(200,), **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        self.latencies[endpoint].append(time.perf_counter() - start)
+
+        if response is None or response.status_code not in ok:
+            self.errors[endpoint] += 1
+
+        return response
+
+    def _random_user(self) -> str:
+        return username(self.rng.randrange(self.args.users))
+
+    def _report_params(self, name: str) -> dict:
+        params = {}
+        if name != "total_balance":
+            end = date.today()
+            params = dict(start_date=end - timedelta(days=30), end_date=end)
+            if name == "transactions":
+                params["interval"] = "day"
+
+        return params
+
+    async def client_loop(self, deadline: float):
+        headers = await self.login(self._random_user())
+        endpoints, weights = list(MIX), list(MIX.values())
+        accounts = self.args.users * self.args.accounts_per_user
+
+        while time.perf_counter() < deadline:
+            endpoint = self.rng.choices(endpoints, weights)[0]
+            if endpoint == "POST /token":
+                headers = await self.login(self._random_user()) or headers
+            elif endpoint == "GET /users/me":
+                await self.call(endpoint, "GET", "/users/me", headers=headers)
+            elif endpoint == "GET /accounts":
+                params = dict(limit=20)
+                await self.call(
+                    endpoint, "GET", "/accounts", headers=headers, params=params
+                )
+            elif endpoint == "POST /accounts/{uuid}/transactions":
+                uuid = account_uuid(self.rng.randrange(accounts))
+                body = dict(
+                    type=self.rng.choice([1, 2]),
+                    amount=self.rng.randrange(10, 1_000) * 1_000,
+                )
+                await self.call(
+                    endpoint,
+                    "POST",
+                    f"/accounts/{uuid}/transactions",
+                    ok=(200, 400),
+                    headers=self.admin_headers,
+                    json=body,
+                )
+            else:
+                path = endpoint.split(" ")[1]
+                params = self._report_params(path.rsplit("/", 1)[1])
+                await self.call(
+                    endpoint, "GET", path, headers=self.admin_headers, params=params
+                )
+
+
+# endpoint -> its requests, errors, throughput and latency percentiles, and
+# the same over every endpoint as "all"
+def summarize(latencies, errors, elapsed: float) -> dict:
+    latencies = dict(latencies)
+    latencies["all"] = [sample for samples in latencies.values() for sample in samples]
+    errors = dict(errors, all=sum(errors.values()))
+
+    report = {}
+    for endpoint, samples in sorted(latencies.items()):
+        cuts = (
+            statistics.quantiles(samples, n=100) if len(samples) > 1 else samples * 99
+        )
+        report[endpoint] = {
+            "requests": len(samples),
+            "errors": errors.get(endpoint, 0),
+            "throughput": len(samples) / elapsed,
+            **{f"p{p}": cuts[p - 1] * 1000 for p in PERCENTILES},
+        }
+
+    return report
+
+
+def print_report(report: dict, baseline: dict):
+    columns = ["requests", "errors", "throughput"] + [f"p{p}" for p in PERCENTILES]
+    print(f"{'endpoint':<38}" + "".join(f"{column:>18}" for column in columns))
+    for endpoint, row in report.items():
+        cells = []
+        for column in columns:
+            value = row[column]
+            cell = str(value) if isinstance(value, int) else f"{value:.1f}"
+            before = baseline.get(endpoint, {}).get(column)
+            if before and column.startswith("p"):
+                cell += f" ({(row[column] / before - 1) * 100:+.0f}%)"
+            cells.append(f"{cell:>18}")
+        print(f"{endpoint:<38}" + "".join(cells))
+    print("latencies in ms, throughput in requests/s")
+
+
+async def main(args):
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["endpoints"]
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.url, limits=limits, timeout=args.timeout
+    ) as client:
+        driver = Driver(client, args, random.Random(args.seed))
+        driver.admin_headers = await driver.login(ADMIN_USERNAME)
+        if driver.admin_headers is None:
+            raise SystemExit(f"Can't log in as {ADMIN_USERNAME}, is the app seeded?")
+
+        started = time.perf_counter()
+        deadline = started + args.seconds
+        await asyncio.gather(
+            *[driver.client_loop(deadline) for _ in range(args.concurrency)]
+        )
+        elapsed = time.perf_counter() - started
+
+    report = summarize(driver.latencies, driver.errors, elapsed)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "url": args.url,
+                    "concurrency": args.concurrency,
+                    "seconds": elapsed,
+                    "endpoints": report,
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS)
+    parser.add_argument(
+        "--accounts-per-user", type=int, default=DEFAULT_ACCOUNTS_PER_USER
+    )
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,94 @@
+# Postings per second on one hot account, straight through the posting engine
+# (no HTTP, no auth):
+#
+#   python -m benchmarks.posting <account_uuid> --concurrency 50 --seconds 10
+#
+# Workers alternate deposits and withdrawals of the same amount. At the end the
+# balance must have moved by exactly the sum of the accepted postings, anything
+# else is a lost update. Run it against a database nobody else is writing to,
+# it leaves its transactions behind.
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+import app.models
+from app.dependencies import engine
+from app.models.account import Account
+from app.models.transaction import TransactionCreate, TransactionType
+from app.posting import post
+
+
+async def balance(account_uuid: UUID) -> float:
+    async with engine.connect() as conn:
+        statement = select(Account.__table__.c.balance).where(
+            Account.__table__.c.uuid == account_uuid
+        )
+        return (await conn.execute(statement)).scalar_one()
+
+
+async def worker(account_uuid, amount, deadline, latencies, outcome):
+    deposit = TransactionCreate(type=TransactionType.DEPOSIT, amount=amount)
+    withdrawal = TransactionCreate(type=TransactionType.WITHDRAWAL, amount=amount)
+
+    i = 0
+    while time.perf_counter() < deadline:
+        create = deposit if i % 2 == 0 else withdrawal
+        i += 1
+
+        start = time.perf_counter()
+        try:
+            await post(account_uuid, create)
+        except HTTPException:
+            outcome["rejected"] += 1
+            continue
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+        outcome["accepted"] += 1
+        outcome["delta"] += amount if create is deposit else -amount
+
+
+async def main(args):
+    before = await balance(args.account)
+
+    latencies = []
+    outcome = {"accepted": 0, "rejected": 0, "delta": 0}
+    deadline = time.perf_counter() + args.seconds
+    started = time.perf_counter()
+    await asyncio.gather(
+        *[
+            worker(args.account, args.amount, deadline, latencies, outcome)
+            for _ in range(args.concurrency)
+        ]
+    )
+    elapsed = time.perf_counter() - started
+
+    after = await balance(args.account)
+    await engine.dispose()
+
+    latencies.sort()
+    print(f"concurrency       {args.concurrency}")
+    print(f"postings/s        {outcome['accepted'] / elapsed:.0f}")
+    print(f"accepted          {outcome['accepted']}")
+    print(f"rejected          {outcome['rejected']}")
+    print(f"latency p50       {statistics.median(latencies) * 1000:.1f} ms")
+    print(f"latency p99       {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms")
+    print(f"balance moved     {after - before:.2f}")
+    print(f"expected          {outcome['delta']:.2f}")
+
+    if round(after - before - outcome["delta"], 2) != 0:
+        raise SystemExit("lost updates detected")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("account", type=UUID)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--amount", type=float, default=1000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,455 @@
+# Fills an empty, migrated database (alembic upgrade head) with synthetic
+# areas, addresses, branches, users, accounts and transactions, for the load
+# test (benchmarks.load) and for timing queries at production scale:
+#
+#   python -m benchmarks.seed --users 1000000 --transactions 100000000
+#
+# Rows are bulk loaded with COPY, --chunk-size rows at a time. The data only
+# depends on the arguments and --seed: user i is `username(i)` with password
+# --password, its accounts are `account_uuid(i * accounts_per_user + k)`, so
+# the load driver can address them without asking the database. There is one
+# admin, ADMIN_USERNAME, with the same password.
+#
+# Transactions are spread evenly over the --days before today. Each one is a
+# deposit, a withdrawal or a transfer between two accounts, and a withdrawal
+# or transfer that would take an account below its minimum balance is made a
+# deposit instead, so every balance is one the posting engine could have
+# reached. The rollups, balance checkpoints and report counters are rebuilt
+# from them at the end, the counters log the drift they repair.
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, datetime, timedelta
+from uuid import NAMESPACE_URL, UUID, uuid5
+
+import asyncpg
+from sqlalchemy.engine import make_url
+from sqlalchemy.schema import CreateIndex
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app.models
+from app import counters, rollups, statements
+from app.area_index import VERSION_NAME as AREA_VERSION
+from app.branch_cache import VERSION_NAME as BRANCH_VERSION
+from app.config import settings
+from app.dependencies import engine
+from app.models.transaction import Transaction, TransactionType
+from app.models.user import UserRole
+from app.partitions import add_months, month_of, partition_name
+from app.passwords import pwd
+from app.versions import bump_version
+
+
+ADMIN_USERNAME = "bench_admin"
+DEFAULT_USERS = 10_000
+DEFAULT_ACCOUNTS_PER_USER = 2
+DEFAULT_PASSWORD = "benchmark"
+
+NAMESPACE = uuid5(NAMESPACE_URL, "https://oinkbank.local/benchmarks")
+
+MINIMUM_BALANCE = 50_000
+INTEREST = 2.5
+
+TRANSACTION_COLUMNS = [
+    "type",
+    "amount",
+    "status",
+    "details",
+    "account_uuid",
+    "created_at",
+    "updated_at",
+    "balance_change",
+]
+
+
+def _uuid(kind: str, i: int) -> UUID:
+    return uuid5(NAMESPACE, f"{kind}:{i}")
+
+
+def username(i: int) -> str:
+    return f"user{i}"
+
+
+def account_uuid(i: int) -> UUID:
+    return _uuid("account", i)
+
+
+def account_number(i: int) -> str:
+    return f"{i:010d}"
+
+
+def _chunks(rows, size: int):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def _copy(conn, table: str, columns, rows, chunk_size: int) -> int:
+    started = time.perf_counter()
+    count = 0
+    for chunk in _chunks(rows, chunk_size):
+        await conn.copy_records_to_table(table, records=chunk, columns=columns)
+        count += len(chunk)
+        rate = count / (time.perf_counter() - started)
+        print(f"{table:<12} {count:>12} rows {rate:>10.0f} rows/s", end="\r")
+    print()
+
+    return count
+
+
+# Provinces, each with `fanout` cities, districts per city and subdistricts per
+# district. Returns the areas and the (province, city, district, subdistrict)
+# uuids of every subdistrict.
+def areas(provinces: int, fanout: int, created_at: datetime):
+    rows, paths = [], []
+
+    def add(level: int, name: str, parent_uuid, path):
+        uuid = _uuid("area", len(rows))
+        rows.append((uuid, name, level, parent_uuid, created_at, created_at))
+        path = path + (uuid,)
+        if level == 4:
+            paths.append(path)
+            return
+        for i in range(fanout):
+            add(level + 1, f"{name}.{i + 1}", uuid, path)
+
+    for i in range(provinces):
+        add(1, f"Area {i + 1}", None, ())
+
+    return rows, paths
+
+
+def addresses(count: int, paths, rng: random.Random, created_at: datetime):
+    for i in range(count):
+        province, city, district, subdistrict = paths[rng.randrange(len(paths))]
+        yield (
+            _uuid("address", i),
+            f"Jl. Sintetis no. {i + 1}",
+            rng.randrange(1, 20),
+            rng.randrange(1, 20),
+            subdistrict,
+            district,
+            city,
+            province,
+            created_at,
+            created_at,
+        )
+
+
+# The users (admin included) have the first addresses, the branches the ones
+# after them
+def branches(count: int, first_address: int, created_at: datetime):
+    for i in range(count):
+        yield (
+            _uuid("branch", i),
+            f"Branch {i + 1}",
+            "KC" if i == 0 else "KCP",
+            f"+6221{i:08d}",
+            _uuid("address", first_address + i),
+            created_at,
+            created_at,
+        )
+
+
+def users(count: int, password_hash: bytes, created_at: datetime):
+    for i in range(count + 1):
+        admin = i == count
+        yield (
+            _uuid("user", i),
+            ADMIN_USERNAME if admin else username(i),
+            f"{ADMIN_USERNAME if admin else username(i)}@example.com",
+            f"+62{i:012d}",
+            "Benchmark Admin" if admin else f"User {i}",
+            f"{i:016d}",
+            "KTP",
+            UserRole.ADMIN if admin else UserRole.CONSUMER,
+            password_hash,
+            _uuid("address", i),
+            created_at,
+            created_at,
+        )
+
+
+def accounts(count: int, per_user: int, branch_count: int, opening, created_at):
+    for i in range(count):
+        yield (
+            account_uuid(i),
+            account_number(i),
+            opening[i],
+            opening[i],
+            "IDR",
+            MINIMUM_BALANCE,
+            INTEREST,
+            _uuid("user", i // per_user),
+            _uuid("branch", i % branch_count),
+            created_at,
+            created_at,
+            created_at,
+        )
+
+
+# Yields the transaction rows in created_at order, updating `balances` and
+# `activity` (last customer posting) of every account as it goes. `uuids` are
+# the accounts' uuids, hashing them for every row would take longer than the
+# COPY.
+def transactions(count: int, start, end, uuids, balances, activity, rng):
+    account_count = len(uuids)
+    i = 0
+    while i < count:
+        created_at = start + (end - start) * i / count
+        i += 1
+        account = rng.randrange(account_count)
+        amount = float(rng.randrange(10, 1_000) * 1_000)
+        kind = rng.random()
+        available = balances[account] - MINIMUM_BALANCE
+        activity[account] = created_at
+
+        if kind < 0.15 and amount <= available and i < count and account_count > 1:
+            destination = rng.randrange(account_count - 1)
+            destination += destination >= account
+            balances[account] -= amount
+            balances[destination] += amount
+            i += 1
+            yield (
+                TransactionType.TRANSFER,
+                amount,
+                False,
+                f"Transfer to {account_number(destination)}",
+                uuids[account],
+                created_at,
+                created_at,
+                -amount,
+            )
+            yield (
+                TransactionType.TRANSFER_IN,
+                amount,
+                False,
+                f"Transfer from {account_number(account)}",
+                uuids[destination],
+                created_at,
+                created_at,
+                amount,
+            )
+        elif kind < 0.55 and amount <= available:
+            balances[account] -= amount
+            yield (
+                TransactionType.WITHDRAWAL,
+                amount,
+                False,
+                None,
+                uuids[account],
+                created_at,
+                created_at,
+                -amount,
+            )
+        else:
+            balances[account] += amount
+            yield (
+                TransactionType.DEPOSIT,
+                amount,
+                False,
+                None,
+                uuids[account],
+                created_at,
+                created_at,
+                amount,
+            )
+
+
+async def create_partitions(conn, start: date):
+    month, last = month_of(start), month_of(datetime.utcnow().date())
+    while month <= last:
+        await conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(month)} "
+            f'PARTITION OF "transaction" '
+            f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+        )
+        month = add_months(month, 1)
+
+
+# Loads the transactions without their secondary indexes and builds these
+# afterwards, once, rather than updating them row by row
+async def load_transactions(conn, rows, chunk_size: int) -> int:
+    indexes = Transaction.__table__.indexes
+    for index in indexes:
+        await conn.execute(f"DROP INDEX IF EXISTS {index.name}")
+
+    count = await _copy(conn, "transaction", TRANSACTION_COLUMNS, rows, chunk_size)
+
+    for index in indexes:
+        print(f"building {index.name}")
+        await conn.execute(str(CreateIndex(index).compile(dialect=engine.dialect)))
+
+    return count
+
+
+async def set_balances(conn, uuids, balances, activity, chunk_size: int):
+    await conn.execute(
+        "CREATE TEMPORARY TABLE seed_balance "
+        "(uuid uuid PRIMARY KEY, balance float8, last_activity_at timestamp)"
+    )
+    rows = zip(uuids, balances, activity)
+    await _copy(conn, "seed_balance", None, rows, chunk_size)
+    await conn.execute(
+        "UPDATE account SET balance = seed_balance.balance, "
+        "last_activity_at = seed_balance.last_activity_at "
+        "FROM seed_balance WHERE account.uuid = seed_balance.uuid"
+    )
+
+
+async def rebuild_derived():
+    async with AsyncSession(engine) as session:
+        await rollups.rebuild(session)
+        await statements.rebuild(session)
+        await bump_version(session, AREA_VERSION)
+        await bump_version(session, BRANCH_VERSION)
+        await session.commit()
+
+    await counters.reconcile()
+
+
+async def main(args):
+    rng = random.Random(args.seed)
+    today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    start = today - timedelta(days=args.days)
+    created_at = start - timedelta(days=1)
+    account_count = args.users * args.accounts_per_user
+
+    url = make_url(settings.database_uri).set(drivername="postgresql")
+    conn = await asyncpg.connect(url.render_as_string(hide_password=False))
+    try:
+        if await conn.fetchval('SELECT EXISTS (SELECT FROM "user")'):
+            raise SystemExit("The database already has users, seed an empty one")
+
+        area_rows, paths = areas(args.provinces, args.fanout, created_at)
+        await _copy(
+            conn,
+            "area",
+            ["uuid", "name", "level", "parent_uuid", "created_at", "updated_at"],
+            area_rows,
+            args.chunk_size,
+        )
+        await _copy(
+            conn,
+            "address",
+            [
+                "uuid",
+                "address",
+                "rt",
+                "rw",
+                "subdistrict_uuid",
+                "district_uuid",
+                "city_uuid",
+                "province_uuid",
+                "created_at",
+                "updated_at",
+            ],
+            addresses(args.users + 1 + args.branches, paths, rng, created_at),
+            args.chunk_size,
+        )
+        await _copy(
+            conn,
+            "branch",
+            [
+                "uuid",
+                "name",
+                "type",
+                "phone_number",
+                "address_uuid",
+                "created_at",
+                "updated_at",
+            ],
+            branches(args.branches, args.users + 1, created_at),
+            args.chunk_size,
+        )
+        # one hash for everyone, bcrypt would take days at 1M users
+        password_hash = pwd.hash(args.password).encode()
+        await _copy(
+            conn,
+            "user",
+            [
+                "uuid",
+                "username",
+                "email",
+                "phone_number",
+                "full_name",
+                "identity_number",
+                "identity_type",
+                "role",
+                "password_hash",
+                "address_uuid",
+                "created_at",
+                "updated_at",
+            ],
+            users(args.users, password_hash, created_at),
+            args.chunk_size,
+        )
+
+        opening = [
+            float(rng.randrange(100, 10_000) * 1_000) for _ in range(account_count)
+        ]
+        await _copy(
+            conn,
+            "account",
+            [
+                "uuid",
+                "number",
+                "balance",
+                "opening_balance",
+                "currency",
+                "minimum_balance",
+                "interest",
+                "user_uuid",
+                "branch_uuid",
+                "created_at",
+                "updated_at",
+                "last_activity_at",
+            ],
+            accounts(
+                account_count,
+                args.accounts_per_user,
+                args.branches,
+                opening,
+                created_at,
+            ),
+            args.chunk_size,
+        )
+
+        await create_partitions(conn, start.date())
+        uuids = [account_uuid(i) for i in range(account_count)]
+        balances, activity = list(opening), [created_at] * account_count
+        rows = transactions(
+            args.transactions, start, today, uuids, balances, activity, rng
+        )
+        await load_transactions(conn, rows, args.chunk_size)
+        await set_balances(conn, uuids, balances, activity, args.chunk_size)
+
+        print("rebuilding rollups, checkpoints and counters")
+        await rebuild_derived()
+        await conn.execute("ANALYZE")
+    finally:
+        await conn.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS)
+    parser.add_argument(
+        "--accounts-per-user", type=int, default=DEFAULT_ACCOUNTS_PER_USER
+    )
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--branches", type=int, default=50)
+    parser.add_argument("--provinces", type=int, default=34)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    asyncio.run(main(parser.parse_args()))
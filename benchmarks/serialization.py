@@ -0,0 +1,161 @@
+# CPU time and memory per row of the hot listings, the ORM path they used to
+# take against the Core fast path (app.fast_read), database round trip
+# included:
+#
+#   python -m benchmarks.serialization --rows 500 --repeat 20
+#
+# orm:  ORM objects with their relationships loaded, validated against the
+#       response model and encoded the way FastAPI does it for a route
+# fast: one Core SELECT mapped into plain dicts and encoded with orjson (or
+#       the standard library encoder when orjson is not installed)
+#
+# CPU time is process time, so it covers asyncpg decoding and excludes waiting
+# on the database. Memory is the tracemalloc peak of a single page, measured in
+# a separate pass because tracing slows everything down. Point it at a database
+# with at least --rows accounts, users and transactions on one account.
+import argparse
+import asyncio
+import time
+import tracemalloc
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_cloned_field, create_response_field
+from sqlalchemy import select as core_select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app.models
+from app.dependencies import engine
+from app.fast_read import dumps, orjson
+from app.loaders import loader_options
+from app.models.account import Account, AccountRead
+from app.models.page import Page
+from app.models.transaction import Transaction, TransactionRead
+from app.models.user import User, UserRead, UserRole
+from app.pagination import PageParams, paginate
+from app.routers.api.accounts import account_rows
+from app.routers.api.transactions import transaction_rows
+from app.routers.api.users import user_rows
+
+
+def _response_field(read_model):
+    # the same field FastAPI builds for `response_model=Page[read_model]`
+    return create_cloned_field(
+        create_response_field(name="response", type_=Page[read_model])
+    )
+
+
+def endpoints(account_uuid):
+    return [
+        (
+            "accounts",
+            Account,
+            AccountRead,
+            account_rows,
+            [Account.deleted_at == None],
+        ),
+        (
+            "users",
+            User,
+            UserRead,
+            user_rows,
+            [User.role <= UserRole.CONSUMER, User.deleted_at == None],
+        ),
+        (
+            "transactions",
+            Transaction,
+            TransactionRead,
+            transaction_rows,
+            [Transaction.account_uuid == account_uuid, Transaction.deleted_at == None],
+        ),
+    ]
+
+
+def orm_page(model, read_model, where, limit):
+    field = _response_field(read_model)
+    statement = select(model).where(*where).options(*loader_options(model, read_model))
+
+    async def run():
+        async with AsyncSession(engine) as session:
+            page = await paginate(session, statement, model, PageParams(limit=limit))
+            content = await serialize_response(field=field, response_content=page)
+            body = JSONResponse(content).body
+
+        return len(page["items"]), len(body)
+
+    return run
+
+
+def fast_page(model, layout, where, limit):
+    statement = layout.select().where(*where)
+
+    async def run():
+        async with AsyncSession(engine) as session:
+            page = await paginate(session, statement, model, PageParams(limit=limit))
+            body = dumps(layout.read_page(page))
+
+        return len(page["items"]), len(body)
+
+    return run
+
+
+async def measure(run, repeat: int):
+    rows, size = await run()  # warm up the statement caches and the pool
+
+    start = time.process_time()
+    for _ in range(repeat):
+        await run()
+    cpu = (time.process_time() - start) / repeat
+
+    tracemalloc.start()
+    await run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return rows, size, cpu, peak
+
+
+async def main(args):
+    account_uuid = args.account
+    if account_uuid is None:
+        async with engine.connect() as conn:
+            statement = (
+                core_select(Transaction.__table__.c.account_uuid)
+                .order_by(Transaction.__table__.c.created_at.desc())
+                .limit(1)
+            )
+            account_uuid = (await conn.execute(statement)).scalar_one()
+
+    print(f"encoder: {'orjson' if orjson is not None else 'json'}")
+    print(
+        f"{'endpoint':<14}{'path':<6}{'rows':>6}{'bytes/row':>11}"
+        f"{'cpu us/row':>12}{'peak B/row':>12}"
+    )
+    for name, model, read_model, layout, where in endpoints(account_uuid):
+        paths = [
+            ("orm", orm_page(model, read_model, where, args.rows)),
+            ("fast", fast_page(model, layout, where, args.rows)),
+        ]
+        for path, run in paths:
+            rows, size, cpu, peak = await measure(run, args.repeat)
+            rows = max(rows, 1)
+            print(
+                f"{name:<14}{path:<6}{rows:>6}{size / rows:>11.0f}"
+                f"{cpu / rows * 1e6:>12.1f}{peak / rows:>12.0f}"
+            )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500, help="rows per page")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--account",
+        type=UUID,
+        help="account of the transactions listing (default: latest)",
+    )
+    asyncio.run(main(parser.parse_args()))
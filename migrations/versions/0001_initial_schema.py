@@ -0,0 +1,244 @@
+"""initial schema
+
+The tables as the app used to create them at startup, with the indexes it
+created along: primary keys, unique columns and foreign keys declared with
+`index=True`. Every other index is added by later revisions.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 07:27:14.936399
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the uuid server defaults, databases may already provide the function
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF to_regproc('uuid_generate_v4') IS NULL THEN
+                CREATE EXTENSION "uuid-ossp";
+            END IF;
+        END
+        $$
+        """
+    )
+
+    op.create_table(
+        "area",
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(length=128), nullable=False),
+        sa.Column("level", sa.Integer(), nullable=False),
+        sa.Column("parent_uuid", sqlmodel.sql.sqltypes.GUID(), nullable=True),
+        sa.Column(
+            "uuid",
+            sqlmodel.sql.sqltypes.GUID(),
+            server_default=sa.text("uuid_generate_v4()"),
+            nullable=True,
+        ),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("uuid"),
+    )
+    op.create_table(
+        "address",
+        sa.Column("address", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("rt", sa.Integer(), nullable=False),
+        sa.Column("rw", sa.Integer(), nullable=False),
+        sa.Column("subdistrict_uuid", sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column("district_uuid", sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column("city_uuid", sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column("province_uuid", sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column(
+            "uuid",
+            sqlmodel.sql.sqltypes.GUID(),
+            server_default=sa.text("uuid_generate_v4()"),
+            nullable=True,
+        ),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["city_uuid"],
+            ["area.uuid"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["district_uuid"],
+            ["area.uuid"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["province_uuid"],
+            ["area.uuid"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["subdistrict_uuid"],
+            ["area.uuid"],
+        ),
+        sa.PrimaryKeyConstraint("uuid"),
+    )
+    op.create_table(
+        "branch",
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("type", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("phone_number", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("description", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("address_uuid", sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column(
+            "uuid",
+            sqlmodel.sql.sqltypes.GUID(),
+            server_default=sa.text("uuid_generate_v4()"),
+            nullable=True,
+        ),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["address_uuid"],
+            ["address.uuid"],
+        ),
+        sa.PrimaryKeyConstraint("uuid"),
+    )
+    op.create_table(
+        "user",
+        sa.Column("username", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("email", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("phone_number", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("full_name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column(
+            "identity_number", sqlmodel.sql.sqltypes.AutoString(), nullable=False
+        ),
+        sa.Column("identity_type", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("description", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("role", sa.Integer(), server_default="1", nullable=True),
+        sa.Column("password_hash", sa.LargeBinary(), nullable=False),
+        sa.Column("address_uuid", sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column(
+            "uuid",
+            sqlmodel.sql.sqltypes.GUID(),
+            server_default=sa.text("uuid_generate_v4()"),
+            nullable=True,
+        ),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["address_uuid"],
+            ["address.uuid"],
+        ),
+        sa.PrimaryKeyConstraint("uuid"),
+    )
+    op.create_index(op.f("ix_user_email"), "user", ["email"], unique=True)
+    op.create_index(op.f("ix_user_phone_number"), "user", ["phone_number"], unique=True)
+    op.create_index(op.f("ix_user_username"), "user", ["username"], unique=True)
+    op.create_table(
+        "account",
+        sa.Column("number", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("balance", sa.Float(), server_default="0", nullable=False),
+        sa.Column(
+            "currency",
+            sqlmodel.sql.sqltypes.AutoString(),
+            server_default="IDR",
+            nullable=False,
+        ),
+        sa.Column(
+            "minimum_balance", sa.Float(), server_default="50000", nullable=False
+        ),
+        sa.Column("interest", sa.Float(), nullable=False),
+        sa.Column("user_uuid", sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column("branch_uuid", sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column(
+            "uuid",
+            sqlmodel.sql.sqltypes.GUID(),
+            server_default=sa.text("uuid_generate_v4()"),
+            nullable=True,
+        ),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["branch_uuid"],
+            ["branch.uuid"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_uuid"],
+            ["user.uuid"],
+        ),
+        sa.PrimaryKeyConstraint("uuid"),
+    )
+    op.create_index(
+        op.f("ix_account_branch_uuid"), "account", ["branch_uuid"], unique=False
+    )
+    op.create_index(
+        op.f("ix_account_user_uuid"), "account", ["user_uuid"], unique=False
+    )
+    op.create_table(
+        "transaction",
+        sa.Column("type", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=True),
+        sa.Column("status", sa.Boolean(), nullable=True),
+        sa.Column("details", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("account_uuid", sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column(
+            "uuid",
+            sqlmodel.sql.sqltypes.GUID(),
+            server_default=sa.text("uuid_generate_v4()"),
+            nullable=True,
+        ),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["account_uuid"],
+            ["account.uuid"],
+        ),
+        sa.PrimaryKeyConstraint("uuid"),
+    )
+    op.create_index(
+        op.f("ix_transaction_account_uuid"),
+        "transaction",
+        ["account_uuid"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_table("transaction")
+    op.drop_table("account")
+    op.drop_table("user")
+    op.drop_table("branch")
+    op.drop_table("address")
+    op.drop_table("area")
@@ -0,0 +1,100 @@
+"""report counters and rollups
+
+Adds the tables the app keeps its own bookkeeping in: the report counters, the
+daily transaction rollup and the table versions of its caches. Databases the
+app created at startup don't have them yet, so the counters and the rollup are
+filled in from the rows already there.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 07:34:48.206117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "report_counter",
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("shard", sa.Integer(), nullable=False),
+        sa.Column("value", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("name", "shard"),
+    )
+    op.create_table(
+        "table_version",
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("version", sa.Integer(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.create_table(
+        "transaction_rollup",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("branch_uuid", sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column("type", sa.Integer(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["branch_uuid"],
+            ["branch.uuid"],
+        ),
+        sa.PrimaryKeyConstraint("day", "branch_uuid", "type"),
+    )
+
+    # admins (role above 1) aren't counted as users
+    op.execute(
+        """
+        INSERT INTO report_counter (name, shard, value)
+        VALUES
+            (
+                'accounts_count',
+                0,
+                (SELECT count(*) FROM account WHERE deleted_at IS NULL)
+            ),
+            (
+                'users_count',
+                0,
+                (
+                    SELECT count(*) FROM "user"
+                    WHERE role <= 1 AND deleted_at IS NULL
+                )
+            ),
+            (
+                'balance_total',
+                0,
+                (
+                    SELECT coalesce(sum(balance), 0) FROM account
+                    WHERE deleted_at IS NULL
+                )
+            )
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO transaction_rollup (day, branch_uuid, type, count, total)
+        SELECT
+            t.created_at::date,
+            a.branch_uuid,
+            t.type,
+            count(*),
+            coalesce(sum(t.amount), 0)
+        FROM "transaction" t
+        JOIN account a ON a.uuid = t.account_uuid
+        WHERE t.deleted_at IS NULL
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("transaction_rollup")
+    op.drop_table("table_version")
+    op.drop_table("report_counter")
@@ -0,0 +1,147 @@
+"""hot query indexes
+
+Drops the index sqlmodel used to create on every column and adds partial
+indexes for the queries the app actually runs, all of which skip soft deleted
+rows. Both steps are idempotent: databases the app created at startup have
+the per-column indexes and some of the partial ones, new databases have none.
+
+Indexes are built and dropped CONCURRENTLY, outside of a transaction, so the
+tables stay writable while this runs. A unique index fails to build while
+live accounts share a number.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 07:41:02.518330
+
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+# per-column indexes named ix_<table>_<column>
+IMPLICIT_INDEXES = {
+    "account": [
+        "uuid",
+        "number",
+        "balance",
+        "currency",
+        "minimum_balance",
+        "interest",
+        "created_at",
+        "updated_at",
+        "deleted_at",
+    ],
+    "address": [
+        "uuid",
+        "address",
+        "rt",
+        "rw",
+        "subdistrict_uuid",
+        "district_uuid",
+        "city_uuid",
+        "province_uuid",
+        "created_at",
+        "updated_at",
+        "deleted_at",
+    ],
+    "area": [
+        "uuid",
+        "name",
+        "level",
+        "parent_uuid",
+        "created_at",
+        "updated_at",
+        "deleted_at",
+    ],
+    "branch": [
+        "uuid",
+        "name",
+        "type",
+        "phone_number",
+        "description",
+        "address_uuid",
+        "created_at",
+        "updated_at",
+        "deleted_at",
+    ],
+    "report_counter": ["name", "shard", "value"],
+    "table_version": ["name", "version"],
+    "transaction": [
+        "uuid",
+        # served by ix_transaction_account_uuid_created_at_uuid
+        "account_uuid",
+        "type",
+        "amount",
+        "status",
+        "details",
+        "created_at",
+        "updated_at",
+        "deleted_at",
+    ],
+    "transaction_rollup": ["day", "branch_uuid", "type", "count", "total"],
+    "user": [
+        "uuid",
+        "password_hash",
+        "full_name",
+        "identity_number",
+        "identity_type",
+        "description",
+        "role",
+        "address_uuid",
+        "created_at",
+        "updated_at",
+        "deleted_at",
+    ],
+}
+
+# name, table, columns, unique; all on rows WHERE deleted_at IS NULL
+INDEXES = [
+    # keyset pagination of the listings
+    ("ix_user_created_at_uuid", "user", ["created_at", "uuid"], False),
+    ("ix_branch_created_at_uuid", "branch", ["created_at", "uuid"], False),
+    ("ix_account_created_at_uuid", "account", ["created_at", "uuid"], False),
+    # an account's history, exports of all accounts
+    (
+        "ix_transaction_account_uuid_created_at_uuid",
+        "transaction",
+        ["account_uuid", "created_at", "uuid"],
+        False,
+    ),
+    ("ix_transaction_created_at_uuid", "transaction", ["created_at", "uuid"], False),
+    # transfer destinations
+    ("ux_account_number", "account", ["number"], True),
+    # inactive accounts report
+    ("ix_account_updated_at", "account", ["updated_at"], False),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for table, columns in IMPLICIT_INDEXES.items():
+            for column in columns:
+                op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "ix_{table}_{column}"')
+
+        for name, table, columns, unique in INDEXES:
+            op.execute(
+                f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY IF NOT EXISTS "
+                f'"{name}" ON "{table}" ({", ".join(columns)}) '
+                "WHERE deleted_at IS NULL"
+            )
+
+
+# The per-column indexes are not brought back, except the one on a foreign key
+# the initial schema has
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _, _ in reversed(INDEXES):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transaction_account_uuid "
+            'ON "transaction" (account_uuid)'
+        )
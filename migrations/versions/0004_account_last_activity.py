@@ -0,0 +1,65 @@
+"""account last activity
+
+Adds account.last_activity_at, the time of the last customer posting, and
+fills it in from the transaction history: the latest deposit, withdrawal or
+transfer, or the account's creation when it has none. The inactive accounts
+report moves from updated_at to it.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 08:02:37.114806
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "account",
+        sa.Column(
+            "last_activity_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.execute(
+        """
+        UPDATE account
+        SET last_activity_at = coalesce(
+            (
+                SELECT max(created_at)
+                FROM "transaction"
+                WHERE account_uuid = account.uuid
+                    AND type IN (1, 2, 3)
+                    AND deleted_at IS NULL
+            ),
+            created_at
+        )
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_account_updated_at")
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_account_last_activity_at_uuid "
+            "ON account (last_activity_at, uuid) WHERE deleted_at IS NULL"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_account_last_activity_at_uuid")
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_account_updated_at "
+            "ON account (updated_at) WHERE deleted_at IS NULL"
+        )
+
+    op.drop_column("account", "last_activity_at")
@@ -0,0 +1,38 @@
+"""accrual run
+
+Checkpoints of the interest and fee accrual batch, one row per day.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 08:31:50.204417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "accrual_run",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("last_uuid", sqlmodel.sql.sqltypes.GUID(), nullable=True),
+        sa.Column("accounts", sa.Integer(), nullable=False),
+        sa.Column("interest_total", sa.Float(), nullable=False),
+        sa.Column("fee_total", sa.Float(), nullable=False),
+        sa.Column(
+            "started_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("day"),
+    )
+
+
+def downgrade():
+    op.drop_table("accrual_run")
@@ -0,0 +1,64 @@
+"""report jobs
+
+The background report queue and result cache, one row per report job.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 07:43:12.075643
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "report_job",
+        sa.Column("params", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("result", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("report", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column(
+            "uuid",
+            sqlmodel.sql.sqltypes.GUID(),
+            server_default=sa.text("uuid_generate_v4()"),
+            nullable=False,
+        ),
+        sa.Column("params_hash", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("status", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("error", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("uuid"),
+    )
+    op.create_index(
+        "ix_report_job_params_hash_expires_at",
+        "report_job",
+        ["params_hash", "expires_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'done'"),
+    )
+    op.create_index(
+        "ux_report_job_params_hash_pending",
+        "report_job",
+        ["params_hash"],
+        unique=True,
+        postgresql_where=sa.text("status IN ('queued', 'running')"),
+    )
+
+
+def downgrade():
+    op.drop_index("ux_report_job_params_hash_pending", table_name="report_job")
+    op.drop_index("ix_report_job_params_hash_expires_at", table_name="report_job")
+    op.drop_table("report_job")
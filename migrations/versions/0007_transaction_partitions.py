@@ -0,0 +1,147 @@
+"""transaction partitions
+
+Turns transaction into a table partitioned by month of created_at, one
+partition named transaction_YYYY_MM per month. Queries on a date range only
+read the partitions it covers, and old months can be detached and archived
+(app.commands.partitions). Partitions are created from the month of the oldest
+transaction to three months ahead, the app keeps creating the next ones.
+
+The primary key becomes (uuid, created_at): a unique constraint of a
+partitioned table has to include the partition key.
+
+Existing transactions are copied into the new table, it can't be read or
+written while this runs. Downgrading copies back the transactions of the
+attached partitions only.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 07:44:51.302114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = (
+    "type, amount, status, details, account_uuid, uuid, created_at, updated_at, "
+    "deleted_at"
+)
+
+# name, columns; all on rows WHERE deleted_at IS NULL
+INDEXES = [
+    (
+        "ix_transaction_account_uuid_created_at_uuid",
+        ["account_uuid", "created_at", "uuid"],
+    ),
+    ("ix_transaction_created_at_uuid", ["created_at", "uuid"]),
+]
+
+# one partition per month, from the month of the oldest transaction (or the
+# current month, if that is earlier) to three months past the newest one (or
+# past the current month)
+CREATE_PARTITIONS = """
+DO $$
+DECLARE
+    first_day timestamp;
+BEGIN
+    FOR first_day IN
+        SELECT generate_series(
+            date_trunc('month', least(min(created_at), now() AT TIME ZONE 'utc')),
+            date_trunc('month', greatest(max(created_at), now() AT TIME ZONE 'utc'))
+                + interval '3 months',
+            interval '1 month'
+        )
+        FROM transaction_unpartitioned
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF "transaction" FOR VALUES FROM (%L) TO (%L)',
+            to_char(first_day, '"transaction_"YYYY_MM'),
+            first_day,
+            first_day + interval '1 month'
+        );
+    END LOOP;
+END
+$$
+"""
+
+
+def _create_table(*args, **kwargs):
+    op.create_table(
+        "transaction",
+        sa.Column("type", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=True),
+        sa.Column("status", sa.Boolean(), nullable=True),
+        sa.Column("details", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("account_uuid", sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column(
+            "uuid",
+            sqlmodel.sql.sqltypes.GUID(),
+            server_default=sa.text("uuid_generate_v4()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["account_uuid"],
+            ["account.uuid"],
+            name="transaction_account_uuid_fkey",
+        ),
+        *args,
+        **kwargs,
+    )
+
+
+# Moves the current table out of the way, its constraint and index names are
+# taken by the new one
+def _rename_table(name: str):
+    op.rename_table("transaction", name)
+    for constraint in ("pkey", "account_uuid_fkey"):
+        op.execute(
+            f"ALTER TABLE {name} "
+            f"RENAME CONSTRAINT transaction_{constraint} TO {name}_{constraint}"
+        )
+    for index, _ in INDEXES:
+        op.drop_index(index, table_name=name)
+
+
+def _copy_and_drop(name: str):
+    op.execute(f'INSERT INTO "transaction" ({COLUMNS}) SELECT {COLUMNS} FROM {name}')
+    op.drop_table(name)
+
+    for index, columns in INDEXES:
+        op.create_index(
+            index,
+            "transaction",
+            columns,
+            unique=False,
+            postgresql_where=sa.text("deleted_at IS NULL"),
+        )
+    op.execute('ANALYZE "transaction"')
+
+
+def upgrade():
+    _rename_table("transaction_unpartitioned")
+    _create_table(
+        sa.PrimaryKeyConstraint("uuid", "created_at"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.execute(CREATE_PARTITIONS)
+    _copy_and_drop("transaction_unpartitioned")
+
+
+def downgrade():
+    _rename_table("transaction_partitioned")
+    _create_table(sa.PrimaryKeyConstraint("uuid"))
+    _copy_and_drop("transaction_partitioned")
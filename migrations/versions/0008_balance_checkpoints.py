@@ -0,0 +1,61 @@
+"""balance checkpoints
+
+Statements need what every transaction did to its account's balance and what
+the account started with: transaction.balance_change is recorded from now on,
+and the account's opening balance is set to what makes its live transactions
+add up to its current balance. balance_checkpoint holds daily closing
+balances, app.commands.checkpoints builds them for the existing history.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 07:46:20.518702
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("transaction", sa.Column("balance_change", sa.Float(), nullable=True))
+    op.add_column(
+        "account",
+        sa.Column("opening_balance", sa.Float(), server_default="0", nullable=False),
+    )
+    op.create_table(
+        "balance_checkpoint",
+        sa.Column("account_uuid", sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("balance", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["account_uuid"],
+            ["account.uuid"],
+        ),
+        sa.PrimaryKeyConstraint("account_uuid", "day"),
+    )
+
+    # deposits, interest and incoming transfers are money in (app.statements)
+    op.execute(
+        """
+        UPDATE account SET opening_balance = balance - coalesce(
+            (
+                SELECT sum(CASE WHEN type IN (1, 4, 6) THEN amount ELSE -amount END)
+                FROM "transaction"
+                WHERE account_uuid = account.uuid AND deleted_at IS NULL
+            ),
+            0
+        )
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("balance_checkpoint")
+    op.drop_column("account", "opening_balance")
+    op.drop_column("transaction", "balance_change")
@@ -0,0 +1,139 @@
+"""balance change not null
+
+Records balance_change on the transactions posted before 0008, as the
+postings of the time changed the balance: deposits added their amount,
+withdrawals and transfers took it off the source account. Interest and fees
+posted through the API or a bulk upload didn't move the balance, those of the
+accrual batch (app.accrual) did; they are told apart by the details the batch
+writes.
+
+Transfers of the time only wrote the source's row, the destination's balance
+was credited without one: its incoming transfer is added, in its rollup too.
+
+Deleting a transaction used to leave the balance as it was, so the opening
+balances derived from the live transactions already count the deleted ones,
+and are off before them. Statements of those accounts start on the day after
+the last such transaction (account.statements_from), earlier ones are refused.
+
+0008 counted every interest as money in and every fee as money out, the
+opening balances it derived are computed again, and the checkpoints taken
+from them dropped: every worker's checkpoint update builds them again from the
+oldest transaction, or run app.commands.checkpoints.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 11:02:37.148290
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+# to the account that had the number at the time
+INCOMING_TRANSFERS = """
+WITH incoming AS (
+    INSERT INTO "transaction" (
+        account_uuid,
+        type,
+        amount,
+        status,
+        details,
+        created_at,
+        updated_at,
+        balance_change
+    )
+    SELECT
+        destination.uuid,
+        6,
+        t.amount,
+        t.status,
+        'Transfer from ' || source.number,
+        t.created_at,
+        t.created_at,
+        t.amount
+    FROM "transaction" t
+    JOIN account source ON source.uuid = t.account_uuid
+    JOIN LATERAL (
+        SELECT uuid
+        FROM account
+        WHERE number = substr(t.details, length('Transfer to ') + 1)
+            AND created_at <= t.created_at
+            AND (deleted_at IS NULL OR deleted_at > t.created_at)
+        ORDER BY created_at DESC
+        LIMIT 1
+    ) destination ON true
+    WHERE t.type = 3
+        AND t.balance_change IS NULL
+        AND t.details LIKE 'Transfer to %'
+    RETURNING account_uuid, created_at, amount
+)
+INSERT INTO transaction_rollup (day, branch_uuid, type, count, total)
+SELECT i.created_at::date, a.branch_uuid, 6, count(*), sum(i.amount)
+FROM incoming i
+JOIN account a ON a.uuid = i.account_uuid
+GROUP BY 1, 2
+ON CONFLICT (day, branch_uuid, type) DO UPDATE SET
+    count = transaction_rollup.count + excluded.count,
+    total = transaction_rollup.total + excluded.total
+"""
+
+# types: 1 deposit, 2 withdrawal, 3 transfer, 4 interest, 5 fee; incoming
+# transfers (6) always had their balance change recorded
+BACKFILL = r"""
+UPDATE "transaction" SET balance_change = CASE
+    WHEN type = 1 THEN amount
+    WHEN type IN (2, 3) THEN -amount
+    WHEN type = 4 AND details ~ '^Interest \d{4}-\d{2}-\d{2}$' THEN amount
+    WHEN type = 5 AND details ~ '^Monthly fee \d{4}-\d{2}$' THEN -amount
+    ELSE 0
+END
+WHERE balance_change IS NULL
+"""
+
+OPENING_BALANCE = """
+UPDATE account SET opening_balance = balance - coalesce(
+    (
+        SELECT sum(balance_change)
+        FROM "transaction"
+        WHERE account_uuid = account.uuid AND deleted_at IS NULL
+    ),
+    0
+)
+"""
+
+
+# every transaction deleted so far was deleted by the app of the time
+STATEMENTS_FROM = """
+UPDATE account SET statements_from = (
+    SELECT max(created_at)::date + 1
+    FROM "transaction"
+    WHERE account_uuid = account.uuid
+        AND deleted_at IS NOT NULL
+        AND balance_change != 0
+)
+"""
+
+
+def upgrade():
+    op.add_column("account", sa.Column("statements_from", sa.Date(), nullable=True))
+    op.execute(INCOMING_TRANSFERS)
+    op.execute(BACKFILL)
+    op.execute(OPENING_BALANCE)
+    op.execute(STATEMENTS_FROM)
+    op.execute("DELETE FROM balance_checkpoint")
+    op.alter_column(
+        "transaction", "balance_change", existing_type=sa.Float(), nullable=False
+    )
+
+
+def downgrade():
+    op.alter_column(
+        "transaction", "balance_change", existing_type=sa.Float(), nullable=True
+    )
+    op.drop_column("account", "statements_from")
@@ -0,0 +1,256 @@
+-- The schema as the app created it at startup, before migrations: every
+-- column indexed. Loaded by tests/test_migrations.py.
+
+DO $$
+BEGIN
+    IF to_regproc('uuid_generate_v4') IS NULL THEN
+        CREATE EXTENSION "uuid-ossp";
+    END IF;
+END
+$$;
+
+CREATE TABLE account (
+    number character varying NOT NULL,
+    balance double precision DEFAULT '0'::double precision NOT NULL,
+    currency character varying DEFAULT 'IDR'::character varying NOT NULL,
+    minimum_balance double precision DEFAULT '50000'::double precision NOT NULL,
+    interest double precision NOT NULL,
+    user_uuid uuid NOT NULL,
+    branch_uuid uuid NOT NULL,
+    uuid uuid DEFAULT uuid_generate_v4() NOT NULL,
+    created_at timestamp without time zone DEFAULT now() NOT NULL,
+    updated_at timestamp without time zone DEFAULT now() NOT NULL,
+    deleted_at timestamp without time zone
+);
+
+CREATE TABLE address (
+    address character varying NOT NULL,
+    rt integer NOT NULL,
+    rw integer NOT NULL,
+    subdistrict_uuid uuid NOT NULL,
+    district_uuid uuid NOT NULL,
+    city_uuid uuid NOT NULL,
+    province_uuid uuid NOT NULL,
+    uuid uuid DEFAULT uuid_generate_v4() NOT NULL,
+    created_at timestamp without time zone DEFAULT now() NOT NULL,
+    updated_at timestamp without time zone DEFAULT now() NOT NULL,
+    deleted_at timestamp without time zone
+);
+
+CREATE TABLE area (
+    name character varying(128) NOT NULL,
+    level integer NOT NULL,
+    parent_uuid uuid,
+    uuid uuid DEFAULT uuid_generate_v4() NOT NULL,
+    created_at timestamp without time zone DEFAULT now() NOT NULL,
+    updated_at timestamp without time zone DEFAULT now() NOT NULL,
+    deleted_at timestamp without time zone
+);
+
+CREATE TABLE branch (
+    name character varying NOT NULL,
+    type character varying NOT NULL,
+    phone_number character varying NOT NULL,
+    description character varying,
+    address_uuid uuid NOT NULL,
+    uuid uuid DEFAULT uuid_generate_v4() NOT NULL,
+    created_at timestamp without time zone DEFAULT now() NOT NULL,
+    updated_at timestamp without time zone DEFAULT now() NOT NULL,
+    deleted_at timestamp without time zone
+);
+
+CREATE TABLE transaction (
+    type integer NOT NULL,
+    amount double precision,
+    status boolean,
+    details character varying,
+    account_uuid uuid NOT NULL,
+    uuid uuid DEFAULT uuid_generate_v4() NOT NULL,
+    created_at timestamp without time zone DEFAULT now() NOT NULL,
+    updated_at timestamp without time zone DEFAULT now() NOT NULL,
+    deleted_at timestamp without time zone
+);
+
+CREATE TABLE "user" (
+    username character varying NOT NULL,
+    email character varying NOT NULL,
+    phone_number character varying NOT NULL,
+    full_name character varying NOT NULL,
+    identity_number character varying NOT NULL,
+    identity_type character varying NOT NULL,
+    description character varying,
+    role integer DEFAULT 1,
+    password_hash bytea NOT NULL,
+    address_uuid uuid NOT NULL,
+    uuid uuid DEFAULT uuid_generate_v4() NOT NULL,
+    created_at timestamp without time zone DEFAULT now() NOT NULL,
+    updated_at timestamp without time zone DEFAULT now() NOT NULL,
+    deleted_at timestamp without time zone
+);
+
+ALTER TABLE account
+    ADD CONSTRAINT account_pkey PRIMARY KEY (uuid);
+
+ALTER TABLE address
+    ADD CONSTRAINT address_pkey PRIMARY KEY (uuid);
+
+ALTER TABLE area
+    ADD CONSTRAINT area_pkey PRIMARY KEY (uuid);
+
+ALTER TABLE branch
+    ADD CONSTRAINT branch_pkey PRIMARY KEY (uuid);
+
+ALTER TABLE transaction
+    ADD CONSTRAINT transaction_pkey PRIMARY KEY (uuid);
+
+ALTER TABLE "user"
+    ADD CONSTRAINT user_pkey PRIMARY KEY (uuid);
+
+CREATE INDEX ix_account_balance ON account (balance);
+
+CREATE INDEX ix_account_branch_uuid ON account (branch_uuid);
+
+CREATE INDEX ix_account_created_at ON account (created_at);
+
+CREATE INDEX ix_account_currency ON account (currency);
+
+CREATE INDEX ix_account_deleted_at ON account (deleted_at);
+
+CREATE INDEX ix_account_interest ON account (interest);
+
+CREATE INDEX ix_account_minimum_balance ON account (minimum_balance);
+
+CREATE INDEX ix_account_number ON account (number);
+
+CREATE INDEX ix_account_updated_at ON account (updated_at);
+
+CREATE INDEX ix_account_user_uuid ON account (user_uuid);
+
+CREATE INDEX ix_account_uuid ON account (uuid);
+
+CREATE INDEX ix_address_address ON address (address);
+
+CREATE INDEX ix_address_city_uuid ON address (city_uuid);
+
+CREATE INDEX ix_address_created_at ON address (created_at);
+
+CREATE INDEX ix_address_deleted_at ON address (deleted_at);
+
+CREATE INDEX ix_address_district_uuid ON address (district_uuid);
+
+CREATE INDEX ix_address_province_uuid ON address (province_uuid);
+
+CREATE INDEX ix_address_rt ON address (rt);
+
+CREATE INDEX ix_address_rw ON address (rw);
+
+CREATE INDEX ix_address_subdistrict_uuid ON address (subdistrict_uuid);
+
+CREATE INDEX ix_address_updated_at ON address (updated_at);
+
+CREATE INDEX ix_address_uuid ON address (uuid);
+
+CREATE INDEX ix_area_created_at ON area (created_at);
+
+CREATE INDEX ix_area_deleted_at ON area (deleted_at);
+
+CREATE INDEX ix_area_level ON area (level);
+
+CREATE INDEX ix_area_name ON area (name);
+
+CREATE INDEX ix_area_parent_uuid ON area (parent_uuid);
+
+CREATE INDEX ix_area_updated_at ON area (updated_at);
+
+CREATE INDEX ix_area_uuid ON area (uuid);
+
+CREATE INDEX ix_branch_address_uuid ON branch (address_uuid);
+
+CREATE INDEX ix_branch_created_at ON branch (created_at);
+
+CREATE INDEX ix_branch_deleted_at ON branch (deleted_at);
+
+CREATE INDEX ix_branch_description ON branch (description);
+
+CREATE INDEX ix_branch_name ON branch (name);
+
+CREATE INDEX ix_branch_phone_number ON branch (phone_number);
+
+CREATE INDEX ix_branch_type ON branch (type);
+
+CREATE INDEX ix_branch_updated_at ON branch (updated_at);
+
+CREATE INDEX ix_branch_uuid ON branch (uuid);
+
+CREATE INDEX ix_transaction_account_uuid ON transaction (account_uuid);
+
+CREATE INDEX ix_transaction_amount ON transaction (amount);
+
+CREATE INDEX ix_transaction_created_at ON transaction (created_at);
+
+CREATE INDEX ix_transaction_deleted_at ON transaction (deleted_at);
+
+CREATE INDEX ix_transaction_details ON transaction (details);
+
+CREATE INDEX ix_transaction_status ON transaction (status);
+
+CREATE INDEX ix_transaction_type ON transaction (type);
+
+CREATE INDEX ix_transaction_updated_at ON transaction (updated_at);
+
+CREATE INDEX ix_transaction_uuid ON transaction (uuid);
+
+CREATE INDEX ix_user_address_uuid ON "user" (address_uuid);
+
+CREATE INDEX ix_user_created_at ON "user" (created_at);
+
+CREATE INDEX ix_user_deleted_at ON "user" (deleted_at);
+
+CREATE INDEX ix_user_description ON "user" (description);
+
+CREATE UNIQUE INDEX ix_user_email ON "user" (email);
+
+CREATE INDEX ix_user_full_name ON "user" (full_name);
+
+CREATE INDEX ix_user_identity_number ON "user" (identity_number);
+
+CREATE INDEX ix_user_identity_type ON "user" (identity_type);
+
+CREATE INDEX ix_user_password_hash ON "user" (password_hash);
+
+CREATE UNIQUE INDEX ix_user_phone_number ON "user" (phone_number);
+
+CREATE INDEX ix_user_role ON "user" (role);
+
+CREATE INDEX ix_user_updated_at ON "user" (updated_at);
+
+CREATE UNIQUE INDEX ix_user_username ON "user" (username);
+
+CREATE INDEX ix_user_uuid ON "user" (uuid);
+
+ALTER TABLE account
+    ADD CONSTRAINT account_branch_uuid_fkey FOREIGN KEY (branch_uuid) REFERENCES branch(uuid);
+
+ALTER TABLE account
+    ADD CONSTRAINT account_user_uuid_fkey FOREIGN KEY (user_uuid) REFERENCES "user"(uuid);
+
+ALTER TABLE address
+    ADD CONSTRAINT address_city_uuid_fkey FOREIGN KEY (city_uuid) REFERENCES area(uuid);
+
+ALTER TABLE address
+    ADD CONSTRAINT address_district_uuid_fkey FOREIGN KEY (district_uuid) REFERENCES area(uuid);
+
+ALTER TABLE address
+    ADD CONSTRAINT address_province_uuid_fkey FOREIGN KEY (province_uuid) REFERENCES area(uuid);
+
+ALTER TABLE address
+    ADD CONSTRAINT address_subdistrict_uuid_fkey FOREIGN KEY (subdistrict_uuid) REFERENCES area(uuid);
+
+ALTER TABLE branch
+    ADD CONSTRAINT branch_address_uuid_fkey FOREIGN KEY (address_uuid) REFERENCES address(uuid);
+
+ALTER TABLE transaction
+    ADD CONSTRAINT transaction_account_uuid_fkey FOREIGN KEY (account_uuid) REFERENCES account(uuid);
+
+ALTER TABLE "user"
+    ADD CONSTRAINT user_address_uuid_fkey FOREIGN KEY (address_uuid) REFERENCES address(uuid);
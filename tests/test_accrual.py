@@ -0,0 +1,65 @@
+from datetime import date
+
+import numpy
+
+from app.accrual import accrue, run_accrual
+from app.config import settings
+
+
+def test_accrue():
+    interest, fees = accrue(
+        numpy.array([1_000_000.0, 0.0, 100.0, -5.0, 3.0]),
+        numpy.array([3.65, 5, 3.65, 1, 0]),
+        10.0,
+    )
+
+    assert interest.tolist() == [100.0, 0.0, 0.01, 0.0, 0.0]
+    assert fees.tolist() == [10.0, 0.0, 10.0, 0.0, 3.0]
+
+
+def test_run_accrual(run, sql, make_account, balance, assert_consistent, monkeypatch):
+    account = make_account(365_000)
+    sql("UPDATE account SET interest = 3.65 WHERE uuid = :uuid", uuid=account["uuid"])
+    monkeypatch.setattr(settings, "monthly_fee", 1_000)
+    live = sql("SELECT count(*) FROM account WHERE deleted_at IS NULL")[0][0]
+
+    accrual = run(run_accrual, date(2026, 3, 1), 2)
+    assert accrual.accounts == live
+    assert accrual.finished_at is not None
+    assert balance(account) == 365_000 + 36.5 - 1_000
+    postings = sql(
+        'SELECT type, amount, details, balance_change FROM "transaction"'
+        " WHERE account_uuid = :uuid AND type IN (4, 5) ORDER BY type",
+        uuid=account["uuid"],
+    )
+    assert [tuple(posting) for posting in postings] == [
+        (4, 36.5, "Interest 2026-03-01", 36.5),
+        (5, 1_000, "Monthly fee 2026-03", -1_000),
+    ]
+    assert_consistent()
+
+    # a finished day is never posted twice
+    assert run(run_accrual, date(2026, 3, 1), 2).accounts == live
+    assert balance(account) == 365_000 + 36.5 - 1_000
+    assert_consistent()
+
+
+def test_run_accrual_resumes(run, sql, make_account, balance, assert_consistent):
+    accounts = sorted(
+        [make_account(365_000), make_account(365_000)], key=lambda a: a["uuid"]
+    )
+    for account in accounts:
+        sql(
+            "UPDATE account SET interest = 3.65 WHERE uuid = :uuid",
+            uuid=account["uuid"],
+        )
+    # as if a run stopped right after the chunk ending at the first account
+    sql(
+        "INSERT INTO accrual_run (day, last_uuid, accounts, interest_total, fee_total)"
+        " VALUES ('2026-03-02', :uuid, 1, 0, 0)",
+        uuid=accounts[0]["uuid"],
+    )
+
+    run(run_accrual, date(2026, 3, 2))
+    assert [balance(account) for account in accounts] == [365_000, 365_036.5]
+    assert_consistent()
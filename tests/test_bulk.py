@@ -0,0 +1,83 @@
+import json
+
+from app import bulk
+from app.config import settings
+
+
+def upload(client, admin, entries):
+    return client.post(
+        "/transactions/bulk",
+        headers={**admin, "Content-Type": "application/x-ndjson"},
+        data="\n".join(json.dumps(entry) for entry in entries),
+    )
+
+
+def test_bulk_postings(client, admin, make_account, balance, assert_consistent):
+    account = make_account(10_000)
+    other = make_account(minimum_balance=50_000)
+    entries = [
+        dict(account_uuid=account["uuid"], type="deposit", amount=5_000),
+        dict(account_uuid=account["uuid"], type="withdrawal", amount=20_000),
+        dict(account_uuid=account["uuid"], type="withdrawal", amount=15_000),
+        dict(account_uuid=other["uuid"], type="deposit", amount=1_000),
+        dict(account_uuid=other["uuid"], type="interest", amount=7),
+        dict(account_uuid=account["uuid"], type="transfer", amount=1),
+    ]
+
+    response = upload(client, admin, entries)
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["accepted"], report["rejected"], report["complete"]) == (
+        3,
+        3,
+        True,
+    )
+    assert [result["detail"] for result in report["results"]] == [
+        None,
+        "Insufficient funds",
+        None,
+        "Balance too low",
+        None,
+        "type: transfers can't be posted in bulk",
+    ]
+    assert balance(account) == 0
+    assert balance(other) == 0
+    assert_consistent()
+
+
+def test_failed_batch_reports_results_so_far(
+    client, admin, make_account, balance, assert_consistent, monkeypatch
+):
+    account = make_account()
+    copy_transactions = bulk.copy_transactions
+    batches = []
+
+    async def fail_second_batch(session, records, *args):
+        batches.append(records)
+        if len(batches) == 2:
+            raise RuntimeError("connection lost")
+        await copy_transactions(session, records, *args)
+
+    monkeypatch.setattr(settings, "bulk_batch_size", 2)
+    monkeypatch.setattr(bulk, "copy_transactions", fail_second_batch)
+    entries = [
+        dict(account_uuid=account["uuid"], type="deposit", amount=1_000)
+        for _ in range(7)
+    ]
+
+    response = upload(client, admin, entries)
+    assert response.status_code == 500
+    report = response.json()
+    assert (report["accepted"], report["rejected"], report["complete"]) == (
+        2,
+        2,
+        False,
+    )
+    assert [result["detail"] for result in report["results"]] == [
+        None,
+        None,
+        bulk.BATCH_FAILED,
+        bulk.BATCH_FAILED,
+    ]
+    assert balance(account) == 2_000
+    assert_consistent()
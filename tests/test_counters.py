@@ -0,0 +1,74 @@
+import asyncio
+
+from sqlalchemy import func, select, update
+
+from app import posting
+from app.counters import RECONCILE_LOCK, reconcile
+from app.dependencies import engine
+from app.models.account import Account
+from app.models.transaction import TransactionCreate
+
+
+def test_reconcile_corrects_drift(run, sql, make_account, assert_consistent):
+    make_account(10_000)
+    sql(
+        "INSERT INTO report_counter (name, shard, value)"
+        " VALUES ('accounts_count', 3, 5), ('balance_total', 4, -250)"
+        " ON CONFLICT (name, shard)"
+        " DO UPDATE SET value = report_counter.value + excluded.value"
+    )
+
+    drift = run(reconcile)
+    assert drift == {"accounts_count": -5, "users_count": 0, "balance_total": 250}
+    assert_consistent()
+    assert set(run(reconcile).values()) == {0}
+
+
+def test_reconcile_does_not_wait_for_writes(run, make_account):
+    account = make_account(10_000)
+
+    async def reconcile_during_write():
+        async with engine.begin() as conn:
+            await conn.execute(
+                update(Account)
+                .where(Account.uuid == account["uuid"])
+                .values(balance=Account.balance)
+            )
+            return await asyncio.wait_for(reconcile(), 10)
+
+    assert run(reconcile_during_write) is not None
+
+
+def test_reconcile_runs_once_at_a_time(run):
+    async def reconcile_while_locked():
+        async with engine.begin() as conn:
+            await conn.execute(select(func.pg_advisory_xact_lock(RECONCILE_LOCK)))
+            return await reconcile()
+
+    assert run(reconcile_while_locked) is None
+
+
+def test_delete_account_during_posting(
+    client, admin, run, make_account, assert_consistent
+):
+    account = make_account(10_000)
+    deposit = TransactionCreate(type=1, amount=5_000)
+    parameters = posting._parameters(
+        account["uuid"], deposit, delta=5_000, balance_change=5_000
+    )
+
+    async def delete_during_deposit():
+        async with engine.begin() as conn:
+            await conn.execute(posting.balance_posting, parameters)
+            deletion = asyncio.get_running_loop().run_in_executor(
+                None,
+                lambda: client.delete(f"/accounts/{account['uuid']}", headers=admin),
+            )
+            # waits for the deposit, which has the account locked
+            done, _ = await asyncio.wait([deletion], timeout=0.5)
+            assert not done
+
+        return await deletion
+
+    assert run(delete_during_deposit).status_code == 200
+    assert_consistent()
@@ -0,0 +1,21 @@
+import json
+from datetime import date, datetime
+from uuid import UUID
+
+from app.exports import _ndjson_chunk
+from app.fast_read import dumps
+
+UUID_VALUE = UUID("8f0c9a3e-2b51-4c6d-9e7f-1a2b3c4d5e6f")
+
+ENCODED = {
+    "day": "2026-01-02",
+    "at": "2026-01-02T03:04:05",
+    "uuid": "8f0c9a3e-2b51-4c6d-9e7f-1a2b3c4d5e6f",
+}
+
+
+def test_responses_and_exports_encode_alike():
+    row = (date(2026, 1, 2), datetime(2026, 1, 2, 3, 4, 5), UUID_VALUE)
+
+    assert json.loads(dumps(dict(zip(ENCODED, row)))) == ENCODED
+    assert json.loads(_ndjson_chunk(list(ENCODED), [row])) == ENCODED
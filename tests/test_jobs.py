@@ -0,0 +1,70 @@
+import time
+from datetime import date, datetime, timedelta
+
+from app import jobs
+from app.models.job import JobStatus, ReportJob
+
+
+def wait_done(client, admin, uuid):
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        report_job = client.get(f"/reports/jobs/{uuid}", headers=admin).json()
+        if report_job["status"] in ("done", "failed"):
+            return report_job
+        time.sleep(0.05)
+
+    raise AssertionError(f"Report job {uuid} still {report_job['status']}")
+
+
+def test_report_job(client, admin, make_account):
+    make_account(10_000)
+    create = dict(
+        report="transactions",
+        params=dict(start_date=str(date.today()), end_date=str(date.today())),
+    )
+
+    response = client.post("/reports/jobs", headers=admin, json=create)
+    assert response.status_code == 202
+    uuid = response.json()["uuid"]
+    # an identical request joins the pending job, or reuses its result
+    response = client.post("/reports/jobs", headers=admin, json=create)
+    assert response.json()["uuid"] == uuid
+
+    assert wait_done(client, admin, uuid)["status"] == "done"
+    response = client.get(f"/reports/jobs/{uuid}/result", headers=admin)
+    synchronous = client.get(
+        "/reports/transactions", headers=admin, params=create["params"]
+    )
+    assert response.json() == synchronous.json()
+    response = client.post("/reports/jobs", headers=admin, json=create)
+    assert response.json()["uuid"] == uuid
+
+
+def test_report_job_invalid_params(client, admin):
+    response = client.post(
+        "/reports/jobs",
+        headers=admin,
+        json=dict(report="transactions", params=dict(start_date="yesterday")),
+    )
+    assert response.status_code == 422
+
+
+def test_finish_after_losing_the_job(run, sql):
+    claimed = datetime.utcnow() - timedelta(days=1)
+    # claimed by a worker that stalled, put back by sweep() and claimed anew
+    uuid = sql(
+        "INSERT INTO report_job (report, params, params_hash, status, started_at)"
+        " VALUES ('ACCOUNTS_USERS', '{}', :digest, 'running', now())"
+        " RETURNING uuid",
+        digest=jobs.params_hash("accounts_users", {"stalled": True}),
+    )[0].uuid
+    stalled = ReportJob(uuid=uuid, started_at=claimed)
+
+    async def finish():
+        return await jobs._finish(stalled, status=JobStatus.DONE, result={})
+
+    assert run(finish) is False
+    report_job = sql(
+        "SELECT status, result FROM report_job WHERE uuid = :uuid", uuid=uuid
+    )
+    assert tuple(report_job[0]) == ("running", None)
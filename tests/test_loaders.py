@@ -0,0 +1,48 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.dependencies import engine
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+# A listing loads every relationship it returns along with the page, the number
+# of statements doesn't grow with the page size. The branch listing also reads
+# the versions of its cache (app.branch_cache).
+@pytest.mark.parametrize(
+    "path, expected", [("/accounts", 1), ("/users", 1), ("/branches", 2)]
+)
+def test_listing_statements(client, admin, address, make_account, path, expected):
+    for number in range(5):
+        make_account()
+        response = client.post(
+            "/branches",
+            headers=admin,
+            json=dict(
+                name=f"KCP {number}", type="KCP", phone_number="0222", address=address
+            ),
+        )
+        assert response.status_code == 200
+    # authenticated once, the principal is cached
+    client.get("/users/me", headers=admin)
+
+    for limit in (1, 5):
+        with count_statements() as statements:
+            response = client.get(path, headers=admin, params=dict(limit=limit))
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == limit
+        assert len(statements) == expected, statements
@@ -0,0 +1,165 @@
+import asyncio
+from pathlib import Path
+
+import asyncpg
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.engine import make_url
+from sqlmodel import SQLModel
+
+from app.config import settings
+
+
+ROOT = Path(__file__).parent.parent
+
+TABLES = list(SQLModel.metadata.tables)
+
+SCHEMA = {
+    "columns": "SELECT table_name, column_name, data_type, is_nullable,"
+    " column_default FROM information_schema.columns"
+    " WHERE table_schema = 'public' AND table_name = ANY($1)",
+    "indexes": "SELECT tablename, indexname, indexdef FROM pg_indexes"
+    " WHERE schemaname = 'public' AND tablename = ANY($1)",
+    "constraints": "SELECT c.relname, conname, pg_get_constraintdef(k.oid)"
+    " FROM pg_constraint k JOIN pg_class c ON c.oid = k.conrelid"
+    " WHERE c.relnamespace = 'public'::regnamespace AND c.relname = ANY($1)",
+}
+
+# what an app that created its tables at startup left behind: three accounts,
+# one of them deleted. The first made a deposit, a withdrawal, a transfer to
+# the third, which got no row of its own, and a deposit deleted since, which
+# stayed in its balance.
+LEGACY_DATA = """
+INSERT INTO area (uuid, name, level)
+VALUES ('00000000-0000-0000-0000-000000000001', 'Jawa Barat', 1);
+INSERT INTO address (uuid, address, rt, rw, subdistrict_uuid, district_uuid,
+    city_uuid, province_uuid)
+SELECT '00000000-0000-0000-0000-000000000002', 'Jl. Dago 1', 1, 2,
+    uuid, uuid, uuid, uuid
+FROM area;
+INSERT INTO "user" (uuid, username, email, phone_number, full_name,
+    identity_number, identity_type, password_hash, address_uuid)
+SELECT '00000000-0000-0000-0000-000000000003', 'legacy', 'legacy@example.com',
+    '0811', 'Legacy', '3273000000000001', 'KTP', '\\x00', uuid
+FROM address;
+INSERT INTO branch (uuid, name, type, phone_number, address_uuid)
+SELECT '00000000-0000-0000-0000-000000000004', 'Dago', 'KC', '0221', uuid
+FROM address;
+INSERT INTO account (uuid, number, balance, interest, user_uuid, branch_uuid,
+    created_at, deleted_at)
+VALUES
+    ('00000000-0000-0000-0000-000000000005', '1001', 100, 1.5,
+     '00000000-0000-0000-0000-000000000003',
+     '00000000-0000-0000-0000-000000000004', '2024-04-01', NULL),
+    ('00000000-0000-0000-0000-000000000006', '1002', 10, 1.5,
+     '00000000-0000-0000-0000-000000000003',
+     '00000000-0000-0000-0000-000000000004', '2024-04-01', now()),
+    ('00000000-0000-0000-0000-000000000007', '1003', 20, 1.5,
+     '00000000-0000-0000-0000-000000000003',
+     '00000000-0000-0000-0000-000000000004', '2024-04-01', NULL);
+INSERT INTO "transaction" (account_uuid, type, amount, details, created_at,
+    deleted_at)
+VALUES
+    ('00000000-0000-0000-0000-000000000005', 1, 100, 'Deposit', '2024-05-01',
+     NULL),
+    ('00000000-0000-0000-0000-000000000005', 2, 30, 'Withdrawal', '2024-05-02',
+     NULL),
+    ('00000000-0000-0000-0000-000000000005', 3, 20, 'Transfer to 1003',
+     '2024-05-03', NULL),
+    ('00000000-0000-0000-0000-000000000005', 1, 50, 'Deposit', '2024-05-04',
+     '2024-05-05');
+"""
+
+
+async def _call(database: str, method: str, *args):
+    url = make_url(settings.database_uri)
+    conn = await asyncpg.connect(
+        host=url.host,
+        port=url.port,
+        user=url.username,
+        password=url.password,
+        database=database,
+    )
+    try:
+        return await getattr(conn, method)(*args)
+    finally:
+        await conn.close()
+
+
+# execute() runs statements, fetch() returns rows
+def execute(database: str, statements: str):
+    asyncio.run(_call(database, "execute", statements))
+
+
+def fetch(database: str, query: str, *args):
+    return asyncio.run(_call(database, "fetch", query, *args))
+
+
+def schema(database: str) -> dict:
+    return {
+        name: {tuple(row) for row in fetch(database, query, TABLES)}
+        for name, query in SCHEMA.items()
+    }
+
+
+# A database the app created at startup is stamped with the initial schema and
+# upgraded, and ends up like a new one
+def test_upgrade_legacy_database(database, monkeypatch):
+    migrated = make_url(settings.database_uri).database
+    legacy = f"{migrated}_legacy"
+    execute("postgres", f'DROP DATABASE IF EXISTS "{legacy}" WITH (FORCE)')
+    execute("postgres", f'CREATE DATABASE "{legacy}"')
+    execute(legacy, (ROOT / "tests" / "legacy_schema.sql").read_text())
+    execute(legacy, LEGACY_DATA)
+
+    monkeypatch.setattr(
+        settings,
+        "database_uri",
+        str(make_url(settings.database_uri).set(database=legacy)),
+    )
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    command.stamp(config, "0001")
+    command.upgrade(config, "head")
+
+    try:
+        assert schema(legacy) == schema(migrated)
+
+        counters = fetch(
+            legacy, "SELECT name, value FROM report_counter WHERE shard = 0"
+        )
+        assert dict(map(tuple, counters)) == {
+            "accounts_count": 2,
+            "users_count": 1,
+            "balance_total": 120,
+        }
+        rollups = fetch(
+            legacy,
+            "SELECT day::text, type, count, total FROM transaction_rollup"
+            " ORDER BY day, type",
+        )
+        assert list(map(tuple, rollups)) == [
+            ("2024-05-01", 1, 1, 100),
+            ("2024-05-02", 2, 1, 30),
+            ("2024-05-03", 3, 1, 20),
+            ("2024-05-03", 6, 1, 20),
+        ]
+        incoming = fetch(
+            legacy,
+            'SELECT details, balance_change FROM "transaction"'
+            " WHERE account_uuid = '00000000-0000-0000-0000-000000000007'",
+        )
+        assert list(map(tuple, incoming)) == [("Transfer from 1001", 20)]
+        accounts = fetch(
+            legacy,
+            "SELECT number, opening_balance, statements_from::text FROM account"
+            " WHERE deleted_at IS NULL ORDER BY number",
+        )
+        # the deleted deposit is in the first account's opening balance, its
+        # statements can only start after it
+        assert list(map(tuple, accounts)) == [
+            ("1001", 50, "2024-05-05"),
+            ("1003", 0, None),
+        ]
+    finally:
+        execute("postgres", f'DROP DATABASE "{legacy}" WITH (FORCE)')
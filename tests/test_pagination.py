@@ -0,0 +1,104 @@
+import json
+from base64 import urlsafe_b64encode
+from datetime import date, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+
+# Follows next_cursor to the end -> (uuids in the order served, number of pages)
+def walk(client, headers, path, **params):
+    uuids, pages, cursor = [], 0, None
+    while True:
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(path, headers=headers, params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        uuids += [item["uuid"] for item in page["items"]]
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return uuids, pages
+
+
+def test_accounts_pages(client, admin, sql, make_account):
+    for _ in range(3):
+        make_account()
+    expected = [
+        str(row.uuid)
+        for row in sql(
+            "SELECT uuid FROM account WHERE deleted_at IS NULL"
+            " ORDER BY created_at, uuid"
+        )
+    ]
+
+    uuids, pages = walk(client, admin, "/accounts", limit=len(expected) // 3)
+    assert uuids == expected
+    assert pages >= 3
+
+
+# Twelve transactions on four days of this month, three at the same time on
+# each, so pages end between rows sharing created_at
+@pytest.fixture
+def history(sql, make_account):
+    account = make_account()
+    first = date.today().replace(day=1)
+    for number in range(12):
+        sql(
+            'INSERT INTO "transaction" (uuid, account_uuid, type, amount, status,'
+            " details, created_at, updated_at, balance_change)"
+            " VALUES (:uuid, :account, 1, 0, false, 'Deposit', :at, :at, 0)",
+            uuid=uuid4(),
+            account=account["uuid"],
+            at=datetime.combine(
+                first + timedelta(days=number // 3), datetime.min.time()
+            ),
+        )
+    yield account, first
+
+    # left out of the rollups, they must not outlive the test
+    sql('DELETE FROM "transaction" WHERE account_uuid = :uuid', uuid=account["uuid"])
+
+
+@pytest.mark.parametrize("days, limit", [(0, 4), (2, 2)])
+def test_transactions_pages(client, admin, sql, history, days, limit):
+    account, first = history
+    start = first + timedelta(days=days)
+    expected = [
+        str(row.uuid)
+        for row in sql(
+            'SELECT uuid FROM "transaction"'
+            " WHERE account_uuid = :uuid AND created_at >= :start"
+            " ORDER BY created_at, uuid",
+            uuid=account["uuid"],
+            start=datetime.combine(start, datetime.min.time()),
+        )
+    ]
+    assert len(expected) == 12 - 3 * days
+
+    params = dict(limit=limit)
+    if days:
+        params["start_date"] = start
+    uuids, pages = walk(
+        client, admin, f"/accounts/{account['uuid']}/transactions", **params
+    )
+    assert uuids == expected
+    assert pages == 3
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        urlsafe_b64encode(json.dumps(["yesterday", str(uuid4())]).encode()).decode(),
+        urlsafe_b64encode(json.dumps({"created_at": "2026-01-01"}).encode()).decode(),
+    ],
+)
+def test_tampered_cursor(client, admin, make_account, cursor):
+    account = make_account(1_000)
+
+    for path in ("/accounts", f"/accounts/{account['uuid']}/transactions"):
+        response = client.get(path, headers=admin, params=dict(cursor=cursor))
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
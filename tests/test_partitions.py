@@ -0,0 +1,79 @@
+from datetime import date, datetime
+
+import pytest
+
+from app.partitions import (
+    add_months,
+    create_partitions,
+    detach_partitions,
+    month_of,
+    partition_name,
+)
+
+
+def attached(sql):
+    rows = sql(
+        "SELECT inhrelid::regclass::text FROM pg_inherits"
+        " WHERE inhparent = '\"transaction\"'::regclass"
+    )
+
+    return {row[0] for row in rows}
+
+
+def test_create_partitions(run, sql):
+    current = month_of(datetime.utcnow().date())
+    months = [add_months(current, months) for months in range(6)]
+
+    run(create_partitions, 5)
+    assert {partition_name(month) for month in months} <= attached(sql)
+    assert run(create_partitions, 5) == []
+
+
+def test_detach_partitions(client, admin, run, sql, make_account, assert_consistent):
+    account = make_account(10_000)
+    transactions = f"/accounts/{account['uuid']}/transactions"
+    sql(
+        'CREATE TABLE transaction_2025_01 PARTITION OF "transaction"'
+        " FOR VALUES FROM ('2025-01-01') TO ('2025-02-01')"
+    )
+    # interest posted by hand in an old month, with its rollup
+    sql(
+        'INSERT INTO "transaction" (type, amount, status, account_uuid, created_at,'
+        "   updated_at, balance_change)"
+        " VALUES (4, 7, true, :uuid, '2025-01-15', '2025-01-15', 0)",
+        uuid=account["uuid"],
+    )
+    sql(
+        "INSERT INTO transaction_rollup (day, branch_uuid, type, count, total)"
+        " SELECT '2025-01-15', branch_uuid, 4, 1, 7 FROM account WHERE uuid = :uuid",
+        uuid=account["uuid"],
+    )
+    assert_consistent()
+
+    history = client.get(transactions, headers=admin).json()["items"]
+    assert len(history) == 2
+    old = client.get(
+        transactions, headers=admin, params=dict(end_date="2025-12-31")
+    ).json()["items"]
+    assert [item["created_at"][:10] for item in old] == ["2025-01-15"]
+    params = dict(start_date="2025-01-01", end_date=str(date.today()))
+    report = client.get("/reports/transactions", headers=admin, params=params).json()
+
+    try:
+        with pytest.raises(ValueError):
+            run(detach_partitions, add_months(date.today(), 1))
+
+        assert run(detach_partitions, date(2025, 2, 1)) == [date(2025, 1, 1)]
+        assert "transaction_2025_01" not in attached(sql)
+        assert sql("SELECT count(*) FROM transaction_2025_01")[0][0] == 1
+
+        # gone from the history, still counted by the reports
+        history = client.get(transactions, headers=admin).json()["items"]
+        assert len(history) == 1
+        response = client.get("/reports/transactions", headers=admin, params=params)
+        assert response.json() == report
+    finally:
+        sql(
+            'ALTER TABLE "transaction" ATTACH PARTITION transaction_2025_01'
+            " FOR VALUES FROM ('2025-01-01') TO ('2025-02-01')"
+        )
@@ -0,0 +1,182 @@
+import asyncio
+from uuid import UUID, uuid4
+
+import pytest
+
+from app import posting
+from app.models.transaction import TransactionCreate
+
+
+def post(client, admin, account, **body):
+    return client.post(
+        f"/accounts/{account['uuid']}/transactions", headers=admin, json=body
+    )
+
+
+def transfer(client, admin, account, destination, amount):
+    return post(
+        client,
+        admin,
+        account,
+        type=3,
+        amount=amount,
+        transfer=dict(account_number=destination["number"]),
+    )
+
+
+def test_deposit_and_withdrawal(
+    client, admin, make_account, balance, assert_consistent
+):
+    account = make_account(10_000)
+
+    response = post(client, admin, account, type=2, amount=4_000, details="ATM")
+    assert response.status_code == 200
+    posted = response.json()
+    assert (posted["type"], posted["amount"], posted["details"]) == (2, 4_000, "ATM")
+    assert balance(account) == 6_000
+    assert_consistent()
+
+
+def test_insufficient_funds(client, admin, make_account, balance, assert_consistent):
+    account = make_account(10_000)
+
+    response = post(client, admin, account, type=2, amount=10_001)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Insufficient funds"
+    assert balance(account) == 10_000
+    assert_consistent()
+
+
+def test_minimum_balance(client, admin, make_account, balance, assert_consistent):
+    account = make_account(minimum_balance=50_000)
+
+    response = post(client, admin, account, type=1, amount=49_999)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Balance too low"
+    assert post(client, admin, account, type=1, amount=60_000).status_code == 200
+    response = post(client, admin, account, type=2, amount=10_001)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Insufficient funds"
+    assert post(client, admin, account, type=2, amount=10_000).status_code == 200
+    assert balance(account) == 50_000
+    assert_consistent()
+
+
+def test_interest_and_fee_leave_balance(
+    client, admin, make_account, balance, assert_consistent
+):
+    account = make_account(10_000)
+
+    assert post(client, admin, account, type=4, amount=15).status_code == 200
+    assert post(client, admin, account, type=5, amount=50_000).status_code == 200
+    assert balance(account) == 10_000
+    assert_consistent()
+
+
+def test_unknown_account(client, admin):
+    response = post(client, admin, {"uuid": uuid4()}, type=1, amount=1_000)
+    assert response.status_code == 404
+
+
+def test_transfer(client, admin, make_account, balance, assert_consistent):
+    account = make_account(10_000)
+    destination = make_account(minimum_balance=50_000)
+
+    response = transfer(client, admin, account, destination, 3_000)
+    assert response.status_code == 200
+    assert response.json()["details"] == f"Transfer to {destination['number']}"
+    assert (balance(account), balance(destination)) == (7_000, 3_000)
+
+    history = client.get(
+        f"/accounts/{destination['uuid']}/transactions", headers=admin
+    ).json()["items"]
+    assert [(item["type"], item["details"]) for item in history] == [
+        (6, f"Transfer from {account['number']}")
+    ]
+    assert_consistent()
+
+
+def test_transfer_insufficient_funds(
+    client, admin, make_account, balance, assert_consistent
+):
+    account = make_account(10_000)
+    destination = make_account()
+
+    response = transfer(client, admin, account, destination, 10_001)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Insufficient funds"
+    assert (balance(account), balance(destination)) == (10_000, 0)
+    assert_consistent()
+
+
+def test_transfer_to_self(client, admin, make_account, balance, assert_consistent):
+    account = make_account(10_000)
+
+    response = transfer(client, admin, account, account, 1_000)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cannot transfer to the same account"
+    assert balance(account) == 10_000
+    assert_consistent()
+
+
+def test_transfer_to_unknown_account(client, admin, make_account):
+    account = make_account(10_000)
+
+    response = transfer(client, admin, account, {"number": "no such number"}, 1)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Transfer destination not found"
+
+
+def test_incoming_transfer_not_posted(client, admin, make_account):
+    response = post(client, admin, make_account(), type=6, amount=1_000)
+    assert response.status_code == 400
+
+
+def test_concurrent_transfers(run, make_account, balance, assert_consistent):
+    first, second = make_account(100_000), make_account(100_000)
+
+    # opposite transfers between the same accounts, all at once
+    async def transfers():
+        await asyncio.gather(
+            *[
+                posting.post(
+                    UUID(source["uuid"]),
+                    TransactionCreate(
+                        type=3,
+                        amount=1_000,
+                        transfer=dict(account_number=destination["number"]),
+                    ),
+                )
+                for source, destination in [(first, second), (second, first)] * 10
+            ]
+        )
+
+    run(transfers)
+    assert (balance(first), balance(second)) == (100_000, 100_000)
+    assert_consistent()
+
+
+def test_posting_outcomes(client, admin, make_account):
+    prometheus_client = pytest.importorskip("prometheus_client")
+
+    def count(type, outcome):
+        value = prometheus_client.REGISTRY.get_sample_value(
+            "oinkbank_postings_total", {"type": type, "outcome": outcome}
+        )
+        return value or 0
+
+    account = make_account()
+    outcomes = [
+        (dict(type=1, amount=1_000), "DEPOSIT", "posted"),
+        (dict(type=2, amount=5_000), "WITHDRAWAL", "insufficient_funds"),
+        (dict(type=6, amount=1_000), "TRANSFER_IN", "incoming_transfer"),
+        (
+            dict(type=3, amount=1, transfer=dict(account_number="no such number")),
+            "TRANSFER",
+            "destination_not_found",
+        ),
+    ]
+    for body, type, outcome in outcomes:
+        before = count(type, outcome)
+        post(client, admin, account, **body)
+        assert count(type, outcome) == before + 1
@@ -0,0 +1,164 @@
+from datetime import date, datetime, timedelta
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.accrual import run_accrual
+from app.dependencies import engine
+from app.partitions import add_months, month_of, partition_name
+from app.statements import take_checkpoints, update_checkpoints
+
+
+def test_closing_balance_matches_balance(
+    client, admin, run, make_account, balance, assert_consistent
+):
+    account = make_account(100_000)
+    destination = make_account()
+    transactions = f"/accounts/{account['uuid']}/transactions"
+
+    deposit = client.post(transactions, headers=admin, json=dict(type=1, amount=5_000))
+    assert deposit.status_code == 200
+    transfer = client.post(
+        transactions,
+        headers=admin,
+        json=dict(
+            type=3, amount=20_000, transfer=dict(account_number=destination["number"])
+        ),
+    )
+    assert transfer.status_code == 200
+    run(run_accrual, date.today() - timedelta(days=1))
+    before = balance(account)
+    response = client.delete(f"{transactions}/{deposit.json()['uuid']}", headers=admin)
+    assert response.status_code == 200
+    assert balance(account) == before - 5_000
+
+    for statement_of in (account, destination):
+        response = client.get(
+            f"/accounts/{statement_of['uuid']}/statement",
+            headers=admin,
+            params={"from": date.today() - timedelta(days=1)},
+        )
+        assert response.status_code == 200
+        assert response.json()["closing_balance"] == balance(statement_of)
+
+    assert_consistent()
+
+
+def test_statements_from(client, admin, sql, make_account):
+    account = make_account(10_000)
+    # set by the migration on accounts the app used to delete from
+    sql(
+        "UPDATE account SET statements_from = :day WHERE uuid = :uuid",
+        day=date.today(),
+        uuid=account["uuid"],
+    )
+    statement = f"/accounts/{account['uuid']}/statement"
+
+    response = client.get(
+        statement, headers=admin, params={"from": date.today() - timedelta(days=1)}
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == (
+        f"Statements of this account start on {date.today()}"
+    )
+    response = client.get(statement, headers=admin, params={"from": date.today()})
+    assert response.status_code == 200
+    assert response.json()["closing_balance"] == 10_000
+
+
+# Moves a transaction posted today to the start of `day`, in the rollup too, as
+# if it had been posted then
+def backdate(sql, account, transaction, day):
+    month = month_of(day)
+    sql(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)}"
+        ' PARTITION OF "transaction"'
+        f" FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+    )
+    sql(
+        'UPDATE "transaction" SET created_at = :at, updated_at = :at'
+        " WHERE uuid = :uuid",
+        at=datetime.combine(day, datetime.min.time()),
+        uuid=transaction["uuid"],
+    )
+    for rollup_day, sign in [(date.today(), -1), (day, 1)]:
+        sql(
+            "INSERT INTO transaction_rollup (day, branch_uuid, type, count, total)"
+            " VALUES (:day, :branch, :type, :count, :total)"
+            " ON CONFLICT (day, branch_uuid, type) DO UPDATE SET"
+            "   count = transaction_rollup.count + excluded.count,"
+            "   total = transaction_rollup.total + excluded.total",
+            day=rollup_day,
+            branch=account["branch"]["uuid"],
+            type=transaction["type"],
+            count=sign,
+            total=sign * transaction["amount"],
+        )
+
+
+async def _take_checkpoints(since: date, until: date):
+    async with AsyncSession(engine) as session:
+        await take_checkpoints(session, since, until)
+        await session.commit()
+
+
+def test_checkpoints(client, admin, run, sql, make_account, balance, assert_consistent):
+    account = make_account()
+    transactions = f"/accounts/{account['uuid']}/transactions"
+
+    def post(type, amount):
+        response = client.post(
+            transactions, headers=admin, json=dict(type=type, amount=amount)
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    def delete(transaction):
+        response = client.delete(f"{transactions}/{transaction['uuid']}", headers=admin)
+        assert response.status_code == 200
+
+    today = date.today()
+    days = [today - timedelta(days=2), today - timedelta(days=1), today]
+    history = [post(1, 10_000), post(2, 3_000), post(1, 5_000)]
+    for transaction, day in zip(history, [days[0], days[0], days[1]]):
+        backdate(sql, account, transaction, day)
+    run(_take_checkpoints, days[0], days[1])
+    # takes the latest checkpointed day again
+    run(update_checkpoints)
+
+    # a deletion before the checkpoints, postings and a deletion after them
+    delete(history[1])
+    post(1, 2_000)
+    delete(post(2, 1_000))
+    assert balance(account) == 17_000
+
+    def recomputed(before: date):
+        return sql(
+            "SELECT a.opening_balance + coalesce(sum(t.balance_change)"
+            "   FILTER (WHERE t.created_at < :before AND t.deleted_at IS NULL), 0)"
+            ' FROM account a LEFT JOIN "transaction" t ON t.account_uuid = a.uuid'
+            " WHERE a.uuid = :uuid GROUP BY a.uuid",
+            before=datetime.combine(before, datetime.min.time()),
+            uuid=account["uuid"],
+        )[0][0]
+
+    checkpoints = sql(
+        "SELECT day, balance FROM balance_checkpoint WHERE account_uuid = :uuid"
+        " ORDER BY day",
+        uuid=account["uuid"],
+    )
+    assert [tuple(row) for row in checkpoints] == [
+        (day, recomputed(day + timedelta(days=1))) for day in days[:2]
+    ]
+    for day in days:
+        response = client.get(
+            f"/accounts/{account['uuid']}/statement",
+            headers=admin,
+            params={"from": day},
+        )
+        assert response.status_code == 200
+        statement = response.json()
+        assert statement["opening_balance"] == recomputed(day)
+        assert statement["closing_balance"] == recomputed(today + timedelta(days=1))
+        assert statement["closing_balance"] == balance(account)
+
+    assert_consistent()
@@ -0,0 +1,60 @@
+def test_delete_reverses_balance(
+    client, admin, make_account, balance, assert_consistent
+):
+    account = make_account(100_000)
+    transactions = f"/accounts/{account['uuid']}/transactions"
+    withdrawal = client.post(
+        transactions, headers=admin, json=dict(type=2, amount=30_000)
+    ).json()
+
+    response = client.delete(f"{transactions}/{withdrawal['uuid']}", headers=admin)
+    assert response.status_code == 200
+    assert balance(account) == 100_000
+    assert_consistent()
+
+    response = client.delete(f"{transactions}/{withdrawal['uuid']}", headers=admin)
+    assert response.status_code == 404
+    assert balance(account) == 100_000
+
+
+def test_delete_keeps_minimum_balance(client, admin, make_account, balance):
+    account = make_account(minimum_balance=50_000)
+    transactions = f"/accounts/{account['uuid']}/transactions"
+    deposit = client.post(
+        transactions, headers=admin, json=dict(type=1, amount=60_000)
+    ).json()
+    client.post(transactions, headers=admin, json=dict(type=2, amount=5_000))
+
+    response = client.delete(f"{transactions}/{deposit['uuid']}", headers=admin)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Insufficient funds"
+    assert balance(account) == 55_000
+    response = client.get(f"{transactions}/{deposit['uuid']}", headers=admin)
+    assert response.status_code == 200
+
+
+def test_delete_refuses_transfers(
+    client, admin, make_account, balance, sql, assert_consistent
+):
+    source, destination = make_account(100_000), make_account()
+    transfer = client.post(
+        f"/accounts/{source['uuid']}/transactions",
+        headers=admin,
+        json=dict(
+            type=3, amount=40_000, transfer=dict(account_number=destination["number"])
+        ),
+    ).json()
+    incoming = sql(
+        'SELECT uuid FROM "transaction" WHERE account_uuid = :uuid AND type = 6',
+        uuid=destination["uuid"],
+    )[0].uuid
+
+    for account, uuid in [(source, transfer["uuid"]), (destination, incoming)]:
+        response = client.delete(
+            f"/accounts/{account['uuid']}/transactions/{uuid}", headers=admin
+        )
+        assert response.status_code == 409
+        assert response.json()["detail"] == "Transfers cannot be deleted"
+
+    assert (balance(source), balance(destination)) == (60_000, 40_000)
+    assert_consistent()